@@ -26,6 +26,7 @@ command = [
     # "--hidden-import=services.azure",
     # "--collect-binaries=azure.cognitiveservices.speech",
     # "--hidden-import=services.kokoro",
+    # "--hidden-import=services.kokoro_onnx",
     # "--collect-data=language_tags",
     # "--collect-data=espeakng_loader",
     # "--collect-data=misaki",
@@ -0,0 +1,324 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from settings import settings
+from utils import from_data_dir
+
+_logger = logging.getLogger(__name__)
+_save: Callable[[str, Callable[[str], None], Path], Path | None] | None = None
+_extension: str = "wav"
+_engine_report: str | None = None
+
+
+@dataclass
+class RenderResult:
+    source: Path
+    output: Path | None
+    seconds: float
+    audio_seconds: float
+    status: str
+    engine_report: str | None = None
+    """Speedup and memory savings of the worker's quantized engine, if quantized."""
+
+
+def _init_worker(
+    service_value: str, voice: str | None, ssml: bool, sample: str | None, threads: int
+):
+    """Create the warm service used by every render in a worker process.
+
+    Args:
+        service_value (str): The value of the Services entry to use.
+        voice (str | None): The voice to use. Defaults to the voice saved in settings.
+        ssml (bool): Whether the inputs are SSML.
+        sample (str | None): The sample voice file to clone, if cloning.
+        threads (int): The number of threads local engines on auto threads run on.
+    """
+    global _save, _extension, _engine_report
+
+    from services.clone_service import CloneService
+    from services.ssml_service import SsmlService
+    from services.tts_service import Services, TtsService
+
+    # Local engines left on auto threads use the worker's share of the cores, so workers
+    # do not oversubscribe them.
+    TtsService.auto_threads = threads
+    TtsService.switch(Services(service_value))
+    service = TtsService.get_service()
+
+    _extension = service.file_extension
+    report = getattr(service, "quantization_report", None)
+    _engine_report = report.describe() if report is not None else None
+
+    if ssml:
+        assert isinstance(service, SsmlService), "Service should support SSML."
+        _save = service.save_ssml_to_file
+    elif sample is not None:
+        assert isinstance(service, CloneService), "Service should support cloning."
+        service.voice = CloneService.CLONE_VOICE
+        service.sample_voice = Path(sample)
+        _save = service.save_clone_to_file
+    else:
+        if voice is not None:
+            service.voice = voice
+
+        _save = service.save_text_to_file
+
+
+def _render(source: Path, output: Path) -> RenderResult:
+    """Render one input file with the worker's service.
+
+    Args:
+        source (Path): The text file to render.
+        output (Path): The audio file to write, without the extension of the service.
+
+    Returns:
+        RenderResult: The outcome and timing of the render.
+    """
+    import soundfile
+
+    assert _save is not None, "Worker should be initialised."
+    messages: list[str] = []
+    start = time.perf_counter()
+
+    try:
+        text = source.read_text(encoding="utf-8").strip()
+    except (OSError, UnicodeDecodeError) as e:
+        return RenderResult(source, None, 0, 0, f"Reading failed. {e}")
+
+    saved = _save(
+        text, messages.append, output.with_name(f"{output.name}.{_extension}")
+    )
+    seconds = time.perf_counter() - start
+
+    if saved is None:
+        return RenderResult(source, None, seconds, 0, messages[-1] if messages else "")
+
+    return RenderResult(
+        source,
+        saved,
+        seconds,
+        soundfile.info(str(saved)).duration,
+        "Saved.",
+        _engine_report,
+    )
+
+
+def _collect_inputs(paths: list[Path], pattern: str):
+    """Expand directories into the files matching a pattern, and name their outputs.
+
+    Files found in a directory are named by their path relative to it, so files with the
+    same name in different subdirectories get different outputs. Files given directly are
+    named by their stem.
+
+    Args:
+        paths (list[Path]): Files and directories given on the command line.
+        pattern (str): Glob pattern for files inside directories.
+
+    Returns:
+        list[tuple[Path, Path]]: The input files and their output names without extension,
+            in a stable order.
+    """
+    inputs: list[tuple[Path, Path]] = []
+
+    for path in paths:
+        if path.is_dir():
+            inputs.extend(
+                (file, file.relative_to(path).with_suffix(""))
+                for file in sorted(p for p in path.glob(pattern) if p.is_file())
+            )
+        else:
+            inputs.append((path, Path(path.stem)))
+
+    return inputs
+
+
+def _find_collision(inputs: list[tuple[Path, Path]]):
+    """Find two inputs that would be saved to the same output.
+
+    Args:
+        inputs (list[tuple[Path, Path]]): The input files and their output names.
+
+    Returns:
+        tuple[Path, Path, Path] | None: The two inputs and their output name, or None if
+            every output name is unique.
+    """
+    sources: dict[Path, Path] = {}
+
+    for source, name in inputs:
+        if name in sources:
+            return sources[name], source, name
+
+        sources[name] = source
+
+    return None
+
+
+def synth(argv: list[str]):
+    """Render text files to audio without the GUI, in parallel over worker processes.
+
+    Args:
+        argv (list[str]): Command line arguments after the synth command.
+
+    Returns:
+        int: The process exit code.
+    """
+    from services.clone_service import CloneService
+    from services.ssml_service import SsmlService
+    from services.tts_service import Services, TtsService
+
+    parser = argparse.ArgumentParser(
+        prog="vocalscript synth",
+        description="Render text files to audio files without the GUI.",
+    )
+    parser.add_argument(
+        "inputs", nargs="+", type=Path, help="Text files or directories of text files."
+    )
+    parser.add_argument(
+        "-s",
+        "--service",
+        choices=[service.value for service in Services],
+        default=None,
+        help="Service to use. Defaults to the service saved in settings.",
+    )
+    parser.add_argument(
+        "-v",
+        "--voice",
+        default=None,
+        help="Voice to use. Defaults to the voice saved in settings.",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--ssml", action="store_true", help="Treat inputs as SSML.")
+    mode.add_argument("--clone", metavar="SAMPLE", help="Sample voice file to clone.")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=None,
+        help="Output directory. Defaults to the saved folder in the data directory.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes, each holding its own engine.",
+    )
+    parser.add_argument(
+        "-p",
+        "--pattern",
+        default="*.txt",
+        help="Glob pattern for files inside input directories.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.service is None:
+        try:
+            args.service = Services(settings.value("service")).value
+        except ValueError:
+            args.service = TtsService.DEFAULT_SERVICE.value
+
+    service_class = TtsService.get_service_class(Services(args.service))
+    name = service_class.type().name.replace("_", " ").capitalize()
+
+    if args.ssml and not issubclass(service_class, SsmlService):
+        print(f"{name} does not support SSML.", file=sys.stderr)
+        return 2
+
+    if args.clone is not None and not issubclass(service_class, CloneService):
+        print(f"{name} does not support cloning.", file=sys.stderr)
+        return 2
+
+    inputs = _collect_inputs(args.inputs, args.pattern)
+
+    if not inputs:
+        print("No input files found.", file=sys.stderr)
+        return 1
+
+    collision = _find_collision(inputs)
+
+    if collision is not None:
+        first, second, name = collision
+        print(
+            f"{first} and {second} would both be saved as {name}. "
+            "Render them separately or rename one of them.",
+            file=sys.stderr,
+        )
+        return 2
+
+    try:
+        output_dir: Path = args.output or from_data_dir("saved")
+
+        for folder in {(output_dir / name).parent for _, name in inputs}:
+            folder.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        print(f"Creating output directory failed. {e}", file=sys.stderr)
+        return 1
+
+    jobs = max(1, min(args.jobs, len(inputs)))
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    _logger.info(
+        "Batch synthesis. Service: %s, files: %d, jobs: %d",
+        args.service,
+        len(inputs),
+        jobs,
+    )
+    results: list[RenderResult] = []
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(args.service, args.voice, args.ssml, args.clone, threads),
+    ) as executor:
+        futures = {
+            executor.submit(_render, source, output_dir / name): source
+            for source, name in inputs
+        }
+
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                _logger.error("Rendering failed", exc_info=True)
+                result = RenderResult(futures[future], None, 0, 0, f"Failed. {e}")
+
+            results.append(result)
+            rtf = (
+                f"{result.seconds / result.audio_seconds:.3f}"
+                if result.audio_seconds
+                else "-"
+            )
+            print(
+                f"{result.source}: {result.status} "
+                f"{result.seconds:.2f}s synthesis, {result.audio_seconds:.2f}s audio, "
+                f"RTF {rtf}"
+            )
+
+    wall = time.perf_counter() - start
+    synthesis = sum(result.seconds for result in results)
+    audio = sum(result.audio_seconds for result in results)
+    failed = sum(result.output is None for result in results)
+    print(
+        f"Rendered {len(results) - failed}/{len(results)} files "
+        f"({audio:.2f}s audio) in {wall:.2f}s with {jobs} workers."
+    )
+
+    if audio:
+        print(
+            f"Real-time factor: {synthesis / audio:.3f} per worker, "
+            f"{wall / audio:.3f} overall."
+        )
+
+    for report in sorted({r.engine_report for r in results if r.engine_report}):
+        print(f"Quantized engine: {report}.")
+
+    return 1 if failed else 0
@@ -4,3 +4,11 @@ class SynthesisException(Exception):
 
 class ServiceCreationException(Exception):
     """Error during service creation."""
+
+
+class EncodingException(Exception):
+    """Error during audio encoding."""
+
+
+class SynthesisCancelledException(SynthesisException):
+    """Synthesis stopped on request."""
@@ -1,4 +1,8 @@
-from PySide6.QtWidgets import QApplication
+import time
+
+started = time.perf_counter()
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
 
 QApplication.setApplicationName("vocalscript")
 QApplication.setOrganizationName("vocalscript")
@@ -26,10 +30,52 @@ from std_logger import StderrToLogger  # noqa: E402
 if is_compiled():
     sys.stderr = StderrToLogger()
 
-from widgets.main_window import MainWindow  # noqa: E402
 
-app = QApplication(sys.argv)
-main_window = MainWindow()
-main_window.show()
-main_window.on_settings_accept()
-sys.exit(app.exec())
+def main(argv: list[str]):
+    """Run the batch command, or the application until its window is closed.
+
+    Args:
+        argv (list[str]): The command line arguments, starting with the program name.
+
+    Returns:
+        int: The exit code.
+    """
+    if len(argv) > 1 and argv[1] == "synth":
+        from cli import synth
+
+        return synth(argv[2:])
+
+    from startup_trace import StartupTrace
+
+    trace = StartupTrace.from_settings(started)
+
+    from PySide6.QtCore import QTimer
+
+    from widgets.main_window import MainWindow
+
+    trace.mark("Imported main window")
+    app = QApplication(argv)
+
+    def shutdown_playback():
+        # The playback engine is imported on first playback, so it may never have started.
+        playback_engine = sys.modules.get("services.playback_engine")
+
+        if playback_engine is not None:
+            playback_engine.PlaybackEngine.shutdown()
+
+    _ = app.aboutToQuit.connect(shutdown_playback)
+    main_window = MainWindow()
+    trace.mark("Created main window")
+    main_window.show()
+    # Runs once the event loop has processed the window's show and paint events.
+    QTimer.singleShot(0, trace.finish)
+    main_window.on_settings_accept()
+    return app.exec()
+
+
+if __name__ == "__main__":
+    import multiprocessing
+
+    # Worker processes of the batch command re-import this module, so only run the app here.
+    multiprocessing.freeze_support()
+    sys.exit(main(sys.argv))
@@ -0,0 +1,151 @@
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy
+
+from exceptions import EncodingException
+from settings import settings
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    name: str
+    extension: str
+    format: str
+    subtypes: dict[str, str]
+    """Libsndfile subtype for each sample format."""
+    compressible: bool
+
+
+class AudioEncoder:
+    """Encoder stage shared by the save path of every service."""
+
+    FORMATS: dict[str, AudioFormat] = {
+        "wav": AudioFormat(
+            "WAV", "wav", "WAV", {"int16": "PCM_16", "float32": "FLOAT"}, False
+        ),
+        "flac": AudioFormat(
+            "FLAC", "flac", "FLAC", {"int16": "PCM_16", "float32": "PCM_24"}, True
+        ),
+        "vorbis": AudioFormat(
+            "Ogg Vorbis", "ogg", "OGG", {"int16": "VORBIS", "float32": "VORBIS"}, True
+        ),
+        "opus": AudioFormat(
+            "Ogg Opus", "opus", "OGG", {"int16": "OPUS", "float32": "OPUS"}, True
+        ),
+        "mp3": AudioFormat(
+            "MP3",
+            "mp3",
+            "MP3",
+            {"int16": "MPEG_LAYER_III", "float32": "MPEG_LAYER_III"},
+            True,
+        ),
+    }
+    SAMPLE_FORMATS: tuple[str, ...] = ("int16", "float32")
+    FORMAT_KEY: str = "save/format"
+    COMPRESSION_KEY: str = "save/compression"
+    SAMPLE_FORMAT_KEY: str = "save/sample_format"
+    DEFAULT_FORMAT: str = "wav"
+    DEFAULT_COMPRESSION: int = 50
+    DEFAULT_SAMPLE_FORMAT: str = "int16"
+
+    def __init__(self, format_name: str, compression: int, sample_format: str):
+        """Initialise the encoder.
+
+        Args:
+            format_name (str): Name of the container and codec, from FORMATS.
+            compression (int): Compression level from 0 (largest, best quality) to 100
+                (smallest). Ignored by uncompressed formats.
+            sample_format (str): Sample format of lossless formats, from SAMPLE_FORMATS.
+        """
+        if format_name not in self.FORMATS:
+            _logger.error(
+                "Invalid save format %r. Using default %s.",
+                format_name,
+                self.DEFAULT_FORMAT,
+            )
+            format_name = self.DEFAULT_FORMAT
+
+        if sample_format not in self.SAMPLE_FORMATS:
+            _logger.error(
+                "Invalid sample format %r. Using default %s.",
+                sample_format,
+                self.DEFAULT_SAMPLE_FORMAT,
+            )
+            sample_format = self.DEFAULT_SAMPLE_FORMAT
+
+        self.format_name: str = format_name
+        self.compression: int = min(max(compression, 0), 100)
+        self.sample_format: str = sample_format
+
+    @classmethod
+    def from_settings(cls):
+        """Create an encoder from the saved settings.
+
+        Returns:
+            AudioEncoder: The encoder.
+        """
+        try:
+            compression = int(
+                settings.value(cls.COMPRESSION_KEY, cls.DEFAULT_COMPRESSION)
+            )
+        except ValueError:
+            compression = cls.DEFAULT_COMPRESSION
+
+        return cls(
+            str(settings.value(cls.FORMAT_KEY, cls.DEFAULT_FORMAT)),
+            compression,
+            str(settings.value(cls.SAMPLE_FORMAT_KEY, cls.DEFAULT_SAMPLE_FORMAT)),
+        )
+
+    @property
+    def extension(self):
+        """The file extension of the encoded files."""
+        return self.FORMATS[self.format_name].extension
+
+    def write(self, file: Path, samples: numpy.ndarray, sample_rate: int):
+        """Encode mono samples to a new file.
+
+        Args:
+            file (Path): The file to create.
+            samples (numpy.ndarray): Mono float32 samples in [-1, 1] or int16 samples.
+            sample_rate (int): The sample rate of the samples.
+
+        Raises:
+            EncodingException: If the samples cannot be encoded in the format.
+            FileExistsError: If a file already exists at the target path.
+            IsADirectoryError: If the target path is a directory.
+            PermissionError: If lacking permissions to create or write the file.
+            OSError: For other filesystem errors.
+        """
+        # Loading libsndfile is deferred to the first save to keep startup fast.
+        import soundfile
+
+        audio_format = self.FORMATS[self.format_name]
+        _logger.info(
+            "Encoding file. File: %s, format: %s, compression: %d, sample format: %s",
+            file.name,
+            self.format_name,
+            self.compression,
+            self.sample_format,
+        )
+
+        try:
+            with file.open("xb") as f:
+                soundfile.write(
+                    f,
+                    samples,
+                    sample_rate,
+                    format=audio_format.format,
+                    subtype=audio_format.subtypes[self.sample_format],
+                    compression_level=(
+                        self.compression / 100 if audio_format.compressible else None
+                    ),
+                )
+        except (soundfile.LibsndfileError, ValueError, TypeError) as e:
+            _logger.error("Encoding failed", exc_info=True)
+            file.unlink(missing_ok=True)
+            raise EncodingException(f"Encoding to {audio_format.name} failed") from e
@@ -1,33 +1,101 @@
+import hashlib
+import io
 import logging
+import queue
 import re
+import threading
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import override
+from typing import Iterator, override
+
+import numpy
+import soundfile
 
 from azure.cognitiveservices.speech import (
+    AudioDataStream,
     CancellationReason,
     PropertyId,
+    ResultReason,
     SpeechConfig,
     SpeechSynthesisCancellationDetails,
+    SpeechSynthesisOutputFormat,
     SpeechSynthesisResult,
     SpeechSynthesizer,
+    StreamStatus,
     SynthesisVoicesResult,
     VoiceInfo,
 )
 from azure.cognitiveservices.speech.diagnostics.logging import EventLogger
 
 from exceptions import ServiceCreationException, SynthesisException
+from services.cancellation import CancellationToken
+from services.pcm_buffer import PcmBuffer
 from services.ssml_service import SsmlService
-from services.tts_service import Services, Setting
+from services.tts_service import InputMode, Services, Setting
+from services.voice_catalog import VoiceCatalog
+from settings import settings
 
 _logger = logging.getLogger(__name__)
+SSML_NAMESPACES: dict[str, str] = {
+    "": "http://www.w3.org/2001/10/synthesis",
+    "mstts": "http://www.w3.org/2001/mstts",
+}
+
+# Registered once for the process, so split SSML documents keep their namespace prefixes.
+for prefix, uri in SSML_NAMESPACES.items():
+    ElementTree.register_namespace(prefix, uri)
+
+
+@dataclass
+class OutputFormat:
+    format: SpeechSynthesisOutputFormat
+    sample_rate: int
+    encoding: str | None
+    """Name of the encoding in AudioEncoder.FORMATS, or None for raw PCM."""
+
+
+class Azure(SsmlService[bytes]):
+    OUTPUT_FORMATS: dict[str, OutputFormat] = {
+        "pcm-24khz": OutputFormat(
+            SpeechSynthesisOutputFormat.Raw24Khz16BitMonoPcm, 24000, None
+        ),
+        "pcm-16khz": OutputFormat(
+            SpeechSynthesisOutputFormat.Raw16Khz16BitMonoPcm, 16000, None
+        ),
+        "pcm-8khz": OutputFormat(
+            SpeechSynthesisOutputFormat.Raw8Khz16BitMonoPcm, 8000, None
+        ),
+        "mp3-24khz-48kbit": OutputFormat(
+            SpeechSynthesisOutputFormat.Audio24Khz48KBitRateMonoMp3, 24000, "mp3"
+        ),
+        "mp3-24khz-96kbit": OutputFormat(
+            SpeechSynthesisOutputFormat.Audio24Khz96KBitRateMonoMp3, 24000, "mp3"
+        ),
+        "opus-24khz": OutputFormat(
+            SpeechSynthesisOutputFormat.Ogg24Khz16BitMonoOpus, 24000, "opus"
+        ),
+        "opus-16khz": OutputFormat(
+            SpeechSynthesisOutputFormat.Ogg16Khz16BitMonoOpus, 16000, "opus"
+        ),
+    }
+    DEFAULT_OUTPUT_FORMAT: str = "pcm-24khz"
+    FIRST_SEGMENT_LENGTH: int = 300
+    STREAM_BUFFER_SIZE: int = 4800
+    VOICE_LIST_TTL_KEY: str = "azure/voice_list_ttl_h"
+    DEFAULT_CONCURRENCY: int = 4
+    MAX_CONCURRENT_JOBS: int = 4
+    DEFAULT_SEGMENT_LENGTH: int = 2000
 
-
-class Azure(SsmlService[SpeechSynthesisResult]):
     def __init__(
         self,
         voice: str,
         key: str,
         endpoint: str,
+        concurrency: str,
+        segment_length: str,
+        output_format: str,
     ):
         """Initialize Azure TTS service.
 
@@ -35,17 +103,35 @@ class Azure(SsmlService[SpeechSynthesisResult]):
             voice (str): Synthesis voice.
             key (str): Azure subscription key.
             endpoint (str): Azure service endpoint URL.
+            concurrency (str): Maximum number of segments synthesised at the same time.
+            segment_length (str): Maximum length in characters of a segment of long input.
+            output_format (str): Name of the audio format Azure returns, from OUTPUT_FORMATS.
 
         Raises:
             ServiceCreationException: If the service creation fails.
         """
         super().__init__()
+        self._catalogs: dict[str, VoiceCatalog] = {}
+        self._pool: queue.SimpleQueue[SpeechSynthesizer] = queue.SimpleQueue()
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock: threading.Lock = threading.Lock()
+        self.concurrency = concurrency
+        self.segment_length = segment_length
+        self.output_format: OutputFormat = self.OUTPUT_FORMATS.get(
+            output_format.strip(), self.OUTPUT_FORMATS[self.DEFAULT_OUTPUT_FORMAT]
+        )
+
+        if output_format.strip() not in self.OUTPUT_FORMATS:
+            _logger.error(
+                "Invalid output format %r. Using default %s. Valid formats: %s",
+                output_format,
+                self.DEFAULT_OUTPUT_FORMAT,
+                ", ".join(self.OUTPUT_FORMATS),
+            )
 
         try:
-            speech_config = SpeechConfig(subscription=key, endpoint=endpoint)
-            speech_config.speech_synthesis_voice_name = voice
-            self.speech_synthesizer: SpeechSynthesizer = SpeechSynthesizer(
-                speech_config=speech_config, audio_config=None
+            self.speech_synthesizer: SpeechSynthesizer = self._create_synthesizer(
+                voice, key, endpoint, self.output_format
             )
         except Exception as e:
             _logger.error("Creating azure service failed", exc_info=True)
@@ -68,8 +154,24 @@ class Azure(SsmlService[SpeechSynthesisResult]):
     @override
     def setting_fields(cls):
         return [
-            Setting("key", f"{cls.type().value}/key", " "),
-            Setting("endpoint", f"{cls.type().value}/endpoint", " "),
+            Setting("key", f"{cls.type().value}/key", " ", False),
+            Setting("endpoint", f"{cls.type().value}/endpoint", " ", False),
+            Setting(
+                "concurrency",
+                f"{cls.type().value}/concurrency",
+                str(cls.DEFAULT_CONCURRENCY),
+                False,
+            ),
+            Setting(
+                "segment_length",
+                f"{cls.type().value}/segment_length",
+                str(cls.DEFAULT_SEGMENT_LENGTH),
+            ),
+            Setting(
+                "output_format",
+                f"{cls.type().value}/output_format",
+                cls.DEFAULT_OUTPUT_FORMAT,
+            ),
         ]
 
     @classmethod
@@ -77,6 +179,49 @@ class Azure(SsmlService[SpeechSynthesisResult]):
     def _default_voice(cls):
         return ""
 
+    @classmethod
+    def _create_synthesizer(
+        cls, voice: str, key: str, endpoint: str, output_format: OutputFormat
+    ):
+        """Create a synthesizer for a voice, key, endpoint and output format.
+
+        Args:
+            voice (str): Synthesis voice.
+            key (str): Azure subscription key.
+            endpoint (str): Azure service endpoint URL.
+            output_format (OutputFormat): The audio format Azure returns.
+
+        Returns:
+            SpeechSynthesizer: The synthesizer.
+        """
+        speech_config = SpeechConfig(subscription=key, endpoint=endpoint)
+        speech_config.speech_synthesis_voice_name = voice
+        speech_config.set_speech_synthesis_output_format(output_format.format)
+        return SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+
+    @classmethod
+    def _parse_positive_int(cls, value: str | int, default: int, name: str):
+        """Parse a positive integer setting, falling back to a default.
+
+        Args:
+            value (str | int): The value of the setting.
+            default (int): The value used if the setting is not a positive integer.
+            name (str): The name of the setting, for logging.
+
+        Returns:
+            int: The parsed value.
+        """
+        try:
+            parsed = int(value)
+        except ValueError:
+            parsed = 0
+
+        if parsed < 1:
+            _logger.error("Invalid %s %r. Using default %d.", name, value, default)
+            return default
+
+        return parsed
+
     @classmethod
     def _has_error(
         cls,
@@ -115,6 +260,7 @@ class Azure(SsmlService[SpeechSynthesisResult]):
         self.speech_synthesizer.properties.set_property(
             PropertyId.SpeechServiceConnection_Key, value
         )
+        self._pool = queue.SimpleQueue()
 
     @property
     def endpoint(self) -> str:
@@ -129,6 +275,34 @@ class Azure(SsmlService[SpeechSynthesisResult]):
         self.speech_synthesizer.properties.set_property(
             PropertyId.SpeechServiceConnection_Endpoint, value
         )
+        self._pool = queue.SimpleQueue()
+
+    @property
+    def concurrency(self) -> int:
+        """Maximum number of segments synthesised at the same time."""
+        return self._concurrency
+
+    @concurrency.setter
+    def concurrency(self, value: str | int):
+        self._concurrency: int = self._parse_positive_int(
+            value, self.DEFAULT_CONCURRENCY, "concurrency"
+        )
+
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    @property
+    def segment_length(self) -> int:
+        """Maximum length in characters of a segment of long input."""
+        return self._segment_length
+
+    @segment_length.setter
+    def segment_length(self, value: str | int):
+        self._segment_length: int = self._parse_positive_int(
+            value, self.DEFAULT_SEGMENT_LENGTH, "segment length"
+        )
 
     @property
     @override
@@ -144,16 +318,16 @@ class Azure(SsmlService[SpeechSynthesisResult]):
             PropertyId.SpeechServiceConnection_SynthVoice, voice
         )
 
-    def _format_voices(self, voices: list[VoiceInfo]):
-        """Format a list of Azure VoiceInfo into display tuples.
+    def _describe_voices(self, voices: list[VoiceInfo]):
+        """Describe a list of Azure VoiceInfo for the voice catalog.
 
         Args:
             voices (list[VoiceInfo]): The retrieved list of Azure VoiceInfo objects.
 
         Returns:
-            list[tuple[str, str]]: List of tuples (formatted display name, voice short name).
+            list[dict[str, str]]: The short name, formatted display name, locale and gender of each voice.
         """
-        formatted_voices: list[tuple[str, str]] = []
+        described_voices: list[dict[str, str]] = []
         for voice in voices:
             name_split = voice.short_name.split("-")
             formated_name = " ".join(
@@ -162,46 +336,518 @@ class Azure(SsmlService[SpeechSynthesisResult]):
                     name_split[2],
                 )
             )
-            formatted_voices.append(
-                (
-                    f"{formated_name} ({voice.locale}) ({voice.gender.name})",
-                    voice.short_name,
-                )
+            described_voices.append(
+                {
+                    "name": voice.short_name,
+                    "display": f"{formated_name} ({voice.locale}) ({voice.gender.name})",
+                    "locale": voice.locale,
+                    "gender": voice.gender.name,
+                }
+            )
+        return described_voices
+
+    def _fetch_voices(self):
+        """Retrieve the voices available at the endpoint.
+
+        Returns:
+            list[dict[str, str]]: The described voices.
+
+        Raises:
+            SynthesisException: If the voices could not be retrieved.
+        """
+        _logger.info("Getting voices")
+        voices_result = self.speech_synthesizer.get_voices_async().get()
+
+        if (
+            not isinstance(voices_result, SynthesisVoicesResult)
+            or voices_result.reason != ResultReason.VoicesListRetrieved
+        ):
+            _logger.error(
+                "Getting voices failed. Error details: %s",
+                getattr(voices_result, "error_details", ""),
             )
-        return formatted_voices
+            raise SynthesisException("Getting voices failed")
+
+        voices = self._describe_voices(voices_result.voices)
+        _logger.info("%d voices retrieved", len(voices))
+        return voices
+
+    def _get_catalog(self):
+        """Get the voice catalog of the current endpoint, creating it on first use.
+
+        Returns:
+            VoiceCatalog: The voice catalog of the endpoint.
+        """
+        endpoint = self.endpoint.strip()
+        catalog = self._catalogs.get(endpoint)
+
+        if catalog is None:
+            catalog = VoiceCatalog(
+                f"azure_{hashlib.sha256(endpoint.encode()).hexdigest()[:16]}",
+                float(settings.value(self.VOICE_LIST_TTL_KEY, 24)) * 60 * 60,
+                self._fetch_voices,
+                lambda voices: self._voices_refreshed(self._format_voices(voices)),
+            )
+            self._catalogs[endpoint] = catalog
+
+        return catalog
+
+    @classmethod
+    def _format_voices(cls, voices: list[dict[str, str]]):
+        """Format catalog voices into display tuples.
+
+        Args:
+            voices (list[dict[str, str]]): The voices from the voice catalog.
+
+        Returns:
+            list[tuple[str, str]]: List of tuples (formatted display name, voice short name).
+        """
+        return [(voice["display"], voice["name"]) for voice in voices]
 
     @property
     @override
     def voices(self):
-        _logger.info("Getting voices")
-        voices: list[tuple[str, str]] = []
+        if not self._has_information():
+            return []
 
-        if self._has_information():
-            voices_result = self.speech_synthesizer.get_voices_async().get()
+        try:
+            return self._format_voices(self._get_catalog().get(wait_if_missing=True))
+        except SynthesisException:
+            return []
 
-            if isinstance(voices_result, SynthesisVoicesResult):
-                voices = self._format_voices(voices_result.voices)
+    @override
+    def refresh_voices(self):
+        if not self._has_information():
+            return []
 
-            _logger.info("%d voices retrieved", len(voices))
-            return voices
-        else:
-            return voices
+        return self._format_voices(self._get_catalog().refresh())
+
+    @property
+    @override
+    def sample_rate(self):
+        return self.output_format.sample_rate
+
+    @property
+    @override
+    def language(self):
+        return self.voice.split("-")[0].lower() or None
+
+    @property
+    @override
+    def max_concurrent_jobs(self):
+        return self.MAX_CONCURRENT_JOBS
+
+    @property
+    @override
+    def render_segment_length(self):
+        # Keep every checkpointed segment large enough to be synthesised concurrently.
+        return self.segment_length * self.concurrency
+
+    def _open_stream(self, result: SpeechSynthesisResult) -> AudioDataStream:
+        """Open the output stream of a started synthesis.
+
+        Args:
+            result (SpeechSynthesisResult): The result returned once synthesis has started.
+
+        Returns:
+            AudioDataStream: The stream the synthesised audio is read from.
+        """
+        return AudioDataStream(result)
+
+    def _acquire_synthesizer(self):
+        """Take a synthesizer for the current voice from the pool, creating one if it is empty.
+
+        Every synthesis runs on its own synthesizer, so stopping one does not stop the others.
+
+        Returns:
+            tuple[queue.SimpleQueue[SpeechSynthesizer], SpeechSynthesizer]: The pool to return
+                the synthesizer to once done, and the synthesizer.
+        """
+        pool = self._pool
+
+        try:
+            synthesizer = pool.get_nowait()
+        except queue.Empty:
+            synthesizer = self._create_synthesizer(
+                self.voice, self.key, self.endpoint, self.output_format
+            )
+
+        synthesizer.properties.set_property(
+            PropertyId.SpeechServiceConnection_SynthVoice, self.voice
+        )
+        return pool, synthesizer
+
+    def _get_executor(self):
+        """Get the executor rendering segments concurrently, creating it if needed.
+
+        Returns:
+            ThreadPoolExecutor: The executor, with one worker less than the concurrency.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency - 1,
+                    thread_name_prefix="azure-segment",
+                )
+
+            return self._executor
+
+    def _stream_synthesis(
+        self, segment: str, ssml: bool, cancel: CancellationToken
+    ) -> Iterator[bytes]:
+        """Start a synthesis and yield its audio as soon as Azure emits it.
+
+        Synthesis runs on a synthesizer from the pool, and is stopped if the stream is closed
+        before it completes or once cancelled.
+
+        Args:
+            segment (str): The text or SSML segment.
+            ssml (bool): Whether the segment is SSML.
+            cancel (CancellationToken): Stops the synthesis once cancelled.
+
+        Yields:
+            bytes: The next chunk of PCM audio.
+
+        Raises:
+            SynthesisCancelledException: If synthesis was cancelled.
+            SynthesisException: If synthesis failed or was canceled by the service.
+        """
+        cancel.raise_if_cancelled()
+        pool, synthesizer = self._acquire_synthesizer()
+        result = (
+            synthesizer.start_speaking_ssml_async(segment)
+            if ssml
+            else synthesizer.start_speaking_text_async(segment)
+        ).get()
+        unregister = cancel.on_cancel(synthesizer.stop_speaking_async)
+
+        try:
+            cancel.raise_if_cancelled()
+
+            if result.reason == ResultReason.Canceled:
+                self._has_error(result.cancellation_details)
+
+            stream = self._open_stream(result)
+            buffer = bytes(self.STREAM_BUFFER_SIZE)
+            completed = False
+
+            try:
+                while (filled := stream.read_data(buffer)) > 0:
+                    cancel.raise_if_cancelled()
+                    # The stream writes into the buffer in place, so each chunk is copied
+                    # before the next read overwrites it.
+                    yield bytes(memoryview(buffer)[:filled])
+
+                completed = True
+            finally:
+                if not completed:
+                    _logger.info("Stopping unfinished synthesis")
+                    # Wait until it has stopped, so the next synthesis on it starts cleanly.
+                    _ = synthesizer.stop_speaking_async().get()
+        finally:
+            unregister()
+            pool.put(synthesizer)
+
+        cancel.raise_if_cancelled()
+
+        if stream.status == StreamStatus.Canceled:
+            self._has_error(stream.cancellation_details)
+
+    def _render_segment(self, segment: str, ssml: bool, cancel: CancellationToken):
+        """Synthesise a segment completely on a synthesizer from the pool.
+
+        Args:
+            segment (str): The text or SSML segment.
+            ssml (bool): Whether the segment is SSML.
+            cancel (CancellationToken): Stops the synthesis once cancelled.
+
+        Returns:
+            bytes: The synthesised PCM audio.
+
+        Raises:
+            SynthesisCancelledException: If synthesis was cancelled.
+            SynthesisException: If synthesis failed or was canceled by the service.
+        """
+        cancel.raise_if_cancelled()
+        pool, synthesizer = self._acquire_synthesizer()
+        unregister = cancel.on_cancel(synthesizer.stop_speaking_async)
+
+        try:
+            result = (
+                synthesizer.speak_ssml_async(segment)
+                if ssml
+                else synthesizer.speak_text_async(segment)
+            ).get()
+            cancel.raise_if_cancelled()
+            self._has_error(result.cancellation_details)
+            return result.audio_data
+        finally:
+            unregister()
+            pool.put(synthesizer)
+
+    def _stream_segments(
+        self, segments: list[str], ssml: bool, cancel: CancellationToken
+    ) -> Iterator[bytes]:
+        """Synthesise segments concurrently and yield their audio in order.
+
+        The first segment is streamed while the others are rendered over a bounded pool of
+        synthesizers. Encoded formats cannot be decoded from arbitrary parts of a stream, so
+        with them every segment is rendered completely and yielded as one chunk.
+
+        Args:
+            segments (list[str]): The text or SSML segments, in order.
+            ssml (bool): Whether the segments are SSML.
+            cancel (CancellationToken): Stops every segment once cancelled.
+
+        Yields:
+            bytes: The next chunk of PCM audio.
+
+        Raises:
+            SynthesisCancelledException: If synthesis was cancelled.
+            SynthesisException: If synthesis of any segment failed or was canceled by the service.
+        """
+        if not segments:
+            return
+
+        encoded = self.output_format.encoding is not None
+
+        if self.concurrency == 1 or len(segments) == 1:
+            for segment in segments:
+                if encoded:
+                    yield self._render_segment(segment, ssml, cancel)
+                else:
+                    yield from self._stream_synthesis(segment, ssml, cancel)
+
+            return
+
+        executor = self._get_executor()
+        _logger.info(
+            "Synthesising %d segments. Concurrency: %d", len(segments), self.concurrency
+        )
+        futures: list[Future[bytes]] = [
+            executor.submit(self._render_segment, segment, ssml, cancel)
+            for segment in segments[1:]
+        ]
+
+        try:
+            if encoded:
+                yield self._render_segment(segments[0], ssml, cancel)
+            else:
+                yield from self._stream_synthesis(segments[0], ssml, cancel)
+
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                _ = future.cancel()
+
+    @classmethod
+    def _local_name(cls, element: ElementTree.Element):
+        """Returns the tag of an element without its namespace."""
+        return element.tag.rsplit("}", 1)[-1]
+
+    @classmethod
+    def _text_length(cls, element: ElementTree.Element):
+        """Returns the length of the text content of an element, including its tail."""
+        return len("".join(element.itertext())) + len(element.tail or "")
+
+    @classmethod
+    def _split_ssml(cls, ssml: str, max_length: int) -> list[str]:
+        """Split an SSML document into documents of at most a maximum text length.
+
+        Splits happen only between paragraphs and sentences of a voice element, and between
+        sentences of a paragraph that is too long on its own. Each segment keeps the attributes
+        of the speak, voice and paragraph elements it came from. Documents that cannot be
+        parsed, or that have content outside voice elements, are not split.
+
+        Args:
+            ssml (str): The SSML document.
+            max_length (int): The maximum text length of a segment in characters.
+
+        Returns:
+            list[str]: The SSML segments, in order.
+        """
+        try:
+            root = ElementTree.fromstring(ssml)
+        except ElementTree.ParseError:
+            return [ssml]
+
+        if (
+            cls._local_name(root) != "speak"
+            or (root.text or "").strip()
+            or any(
+                cls._local_name(child) != "voice" or (child.tail or "").strip()
+                for child in root
+            )
+        ):
+            return [ssml]
+
+        def copy_empty(element: ElementTree.Element):
+            return ElementTree.Element(element.tag, element.attrib)
+
+        segments: list[ElementTree.Element] = []
+
+        for voice in root:
+            # Units are runs of content that are never split, with their text length.
+            units: list[tuple[list[ElementTree.Element], str, int]] = []
+            leading = voice.text or ""
+            inline: list[ElementTree.Element] = []
+            inline_length = len(leading.strip())
+
+            def flush_inline():
+                nonlocal leading, inline, inline_length
+
+                if inline or leading.strip():
+                    units.append((inline, leading, inline_length))
+
+                leading, inline, inline_length = "", [], 0
+
+            for child in voice:
+                name = cls._local_name(child)
+
+                if name not in ("p", "s"):
+                    inline.append(child)
+                    inline_length += cls._text_length(child)
+                    continue
+
+                flush_inline()
+
+                if name == "p" and cls._text_length(child) > max_length:
+                    part = copy_empty(child)
+                    part.text = child.text
+
+                    for sentence in child:
+                        if len(part) and (
+                            cls._text_length(part) + cls._text_length(sentence)
+                            > max_length
+                        ):
+                            units.append(([part], "", cls._text_length(part)))
+                            part = copy_empty(child)
+
+                        part.append(sentence)
+
+                    part.tail = child.tail
+                    units.append(([part], "", cls._text_length(part)))
+                else:
+                    units.append(([child], "", cls._text_length(child)))
+
+            flush_inline()
+            current: ElementTree.Element | None = None
+            current_length = 0
+
+            for elements, text, length in units:
+                if current is None or (
+                    current_length and current_length + length > max_length
+                ):
+                    current = copy_empty(voice)
+                    current.text = ""
+                    current_length = 0
+                    segments.append(current)
+
+                if text:
+                    if len(current):
+                        current[-1].tail = (current[-1].tail or "") + text
+                    else:
+                        current.text = (current.text or "") + text
+
+                current.extend(elements)
+                current_length += length
+
+        if len(segments) <= 1:
+            return [ssml]
+
+        documents: list[str] = []
+
+        for segment in segments:
+            speak = copy_empty(root)
+            speak.append(segment)
+            documents.append(ElementTree.tostring(speak, encoding="unicode"))
+
+        return documents
 
     @override
-    def _synthesise_text_implementation(self, text: str):
-        result = self.speech_synthesizer.speak_text(text)
-        self._has_error(result.cancellation_details)
-        return result
+    def _stream_text_implementation(
+        self, text: str, cancel: CancellationToken
+    ) -> Iterator[bytes]:
+        segments = list(self._split_sentences(text, self.segment_length))
+
+        # Encoded segments play only once complete, so keep the first one short.
+        if (
+            self.output_format.encoding is not None
+            and segments
+            and len(segments[0]) > self.FIRST_SEGMENT_LENGTH
+        ):
+            first, *rest = self._split_sentences(segments[0], self.FIRST_SEGMENT_LENGTH)
+            segments[:1] = [first, " ".join(rest)] if rest else [first]
+
+        return self._stream_segments(segments, False, cancel)
 
     @override
-    def _save_implementation(self, file: Path, data: SpeechSynthesisResult):
-        _logger.info("Saving file. File: %s", file.name)
-        with file.open("xb") as f:
-            _ = f.write(data.audio_data)
+    def _join_chunks(self, chunks: list[bytes]):
+        return b"".join(chunks)
 
     @override
-    def _get_wav_bytes(self, data: SpeechSynthesisResult):
-        return data.audio_data
+    def _get_samples(self, data: bytes):
+        return self._get_pcm(data).samples
+
+    @override
+    def _get_encoded_bytes(self, data: bytes, format_name: str):
+        return data if self.output_format.encoding == format_name else None
+
+    @classmethod
+    def _split_ogg_links(cls, data: bytes):
+        """Split chained Ogg streams into the individual streams.
+
+        Segments rendered separately are separate Ogg streams, which are concatenated when
+        joined.
+
+        Args:
+            data (bytes): One or more concatenated Ogg streams.
+
+        Returns:
+            list[bytes]: The individual Ogg streams.
+        """
+        links: list[bytes] = []
+        start = 0
+        position = 0
+
+        while position + 27 <= len(data) and data[position : position + 4] == b"OggS":
+            beginning_of_stream = data[position + 5] & 0x02
+            segments = data[position + 26]
+            lacing = data[position + 27 : position + 27 + segments]
+
+            if beginning_of_stream and position > start:
+                links.append(data[start:position])
+                start = position
+
+            position += 27 + segments + sum(lacing)
+
+        links.append(data[start:])
+        return links
+
+    @override
+    def _get_pcm(self, data: bytes):
+        encoding = self.output_format.encoding
+
+        if encoding is None:
+            return PcmBuffer.from_bytes(data)
+
+        parts = self._split_ogg_links(data) if encoding == "opus" else [data]
+        decoded = [
+            soundfile.read(io.BytesIO(part), dtype="int16")[0].reshape(-1)
+            for part in parts
+        ]
+        return PcmBuffer(
+            decoded[0] if len(decoded) == 1 else numpy.concatenate(decoded)
+        )
+
+    @override
+    def _to_bytes(self, data: bytes):
+        return data
+
+    @override
+    def _from_bytes(self, data: bytes):
+        return data
 
     @override
     def _has_information(self):
@@ -218,7 +864,16 @@ class Azure(SsmlService[SpeechSynthesisResult]):
             return False
 
     @override
-    def _synthesise_ssml_implementation(self, ssml: str):
-        result = self.speech_synthesizer.speak_ssml(ssml)
-        self._has_error(result.cancellation_details)
-        return result
+    def _segment_input(self, input_str: str, mode: InputMode):
+        if mode == InputMode.SSML:
+            return self._split_ssml(input_str, self.render_segment_length)
+
+        return super()._segment_input(input_str, mode)
+
+    @override
+    def _stream_ssml_implementation(
+        self, ssml: str, cancel: CancellationToken
+    ) -> Iterator[bytes]:
+        return self._stream_segments(
+            self._split_ssml(ssml, self.segment_length), True, cancel
+        )
@@ -0,0 +1,76 @@
+import logging
+import threading
+from typing import Callable
+
+from exceptions import SynthesisCancelledException
+
+_logger = logging.getLogger(__name__)
+
+
+class CancellationToken:
+    """Flag shared between the caller of a synthesis and the engine running it.
+
+    Engines check the token at every chunk boundary and abandon the rest of the work once it
+    is cancelled. Callbacks let engines interrupt work that does not reach a boundary on its own,
+    such as a remote synthesis.
+    """
+
+    def __init__(self):
+        self._lock: threading.Lock = threading.Lock()
+        self._cancelled: threading.Event = threading.Event()
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def cancelled(self):
+        """Whether cancellation has been requested."""
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Request cancellation and run the registered callbacks once."""
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+
+            self._cancelled.set()
+            callbacks = list(self._callbacks)
+            self._callbacks.clear()
+
+        _logger.info("Cancelling synthesis")
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                _logger.error("Cancellation callback failed", exc_info=True)
+
+    def raise_if_cancelled(self):
+        """Raise if cancellation has been requested.
+
+        Raises:
+            SynthesisCancelledException: If cancellation has been requested.
+        """
+        if self._cancelled.is_set():
+            raise SynthesisCancelledException("Stopped")
+
+    def on_cancel(self, callback: Callable[[], None]):
+        """Register a callback run on cancellation, or immediately if already cancelled.
+
+        Args:
+            callback (Callable[[], None]): The callback, run on the cancelling thread.
+
+        Returns:
+            Callable[[], None]: Unregisters the callback.
+        """
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._callbacks.append(callback)
+
+                def unregister():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+
+                return unregister
+
+        callback()
+        return lambda: None
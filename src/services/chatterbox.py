@@ -1,37 +1,66 @@
-import io
 import logging
-import re
 from pathlib import Path
-from typing import Callable, override
+from typing import Callable, Iterator, override
 
-import soundfile
 import torch
-from chatterbox.tts import ChatterboxTTS
+from chatterbox.tts import ChatterboxTTS, Conditionals
 from torch import Tensor
 
 from exceptions import ServiceCreationException, SynthesisException
 from services.clone_service import CloneService
+from services.cancellation import CancellationToken
+from services.compilation import Bucketing, GraphCompiler
+from services.pcm_buffer import PcmBuffer
+from services.quantization import DynamicQuantizer
+from services.torch_tuning import TorchTuning
 from services.tts_service import Services, Setting
+from utils import file_hash, from_data_dir
 
 _logger = logging.getLogger(__name__)
 
 
-class Chatterbox(CloneService[Tensor]):
+class Chatterbox(TorchTuning, CloneService[Tensor]):
     """
     Chatterbox TTS service.
     """
 
-    def __init__(self, voice: str, sample_voice: str):
+    SEGMENT_LENGTH: int = 300
+
+    def __init__(
+        self,
+        voice: str,
+        sample_voice: str,
+        intra_op_threads: str,
+        inter_op_threads: str,
+        cpu_affinity: str,
+        inference_mode: str,
+        bf16_autocast: str,
+        quantize: str,
+        compile_graphs: str,
+    ):
         """Initialises the Chatterbox TTS service with a voice and a sample voice file.
 
         Args:
             voice (str): The voice to be used for synthesis.
             sample_voice (str): The path to the sample voice file used for cloning.
+            intra_op_threads (str): Threads one operation runs on, or auto.
+            inter_op_threads (str): Threads independent operations run on, or auto.
+            cpu_affinity (str): The cores synthesis runs on, such as 0-3,6, or empty for all.
+            inference_mode (str): Whether to disable autograd tracking during synthesis.
+            bf16_autocast (str): Whether to run eligible operations in bfloat16.
+            quantize (str): Whether to quantize the T3 transformer to int8.
+            compile_graphs (str): Whether to compile the T3 transformer and the flow
+                matching estimator.
 
         Raises:
             ServiceCreationException: If there is an error during service creation.
         """
         super().__init__(sample_voice)
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.cpu_affinity = cpu_affinity
+        self.inference_mode = inference_mode
+        self.bf16_autocast = bf16_autocast
 
         try:
             self._chatterbox: ChatterboxTTS = ChatterboxTTS.from_pretrained("cpu")
@@ -39,8 +68,52 @@ class Chatterbox(CloneService[Tensor]):
             _logger.error("Creating chatterbox service failed", exc_info=True)
             raise ServiceCreationException("Check log") from e
 
+        assert self._chatterbox.conds is not None, "Default voice should be loaded."
+        self._default_conditionals: Conditionals = self._chatterbox.conds
+        self._clone_conditionals: dict[str, Conditionals] = {}
+
         self.voice = voice
 
+        try:
+            self._quantize(
+                quantize,
+                DynamicQuantizer("chatterbox_t3", "chatterbox-tts", ["tfmr"]),
+                self._chatterbox.t3,
+                lambda: list(
+                    self._stream_text_implementation(
+                        self.WARM_UP_TEXT, CancellationToken()
+                    )
+                ),
+            )
+        except Exception as e:
+            _logger.error("Quantizing chatterbox model failed", exc_info=True)
+            raise ServiceCreationException("Check log") from e
+
+        try:
+            # The transformer decodes with a growing cache, so its shapes stay dynamic.
+            # The estimator masks padded frames, so x, mask, mu and cond are bucketed.
+            self._compile(
+                compile_graphs,
+                GraphCompiler("chatterbox_t3"),
+                self._chatterbox.t3,
+                ["tfmr"],
+                {},
+            )
+            self._compile(
+                compile_graphs,
+                GraphCompiler("chatterbox_s3gen"),
+                self._chatterbox.s3gen,
+                [],
+                {
+                    "flow.decoder.estimator": Bucketing(
+                        {0: -1, 1: -1, 2: -1, 5: -1}, -1
+                    )
+                },
+            )
+        except Exception as e:
+            _logger.error("Compiling chatterbox model failed", exc_info=True)
+            raise ServiceCreationException("Check log") from e
+
     @classmethod
     @override
     def type(cls):
@@ -49,7 +122,7 @@ class Chatterbox(CloneService[Tensor]):
     @classmethod
     @override
     def setting_fields(cls) -> list[Setting]:
-        return []
+        return cls.tuning_fields(cls.type())
 
     @classmethod
     @override
@@ -71,61 +144,151 @@ class Chatterbox(CloneService[Tensor]):
     def voices(self) -> list[tuple[str, str]]:
         return [(self._default_voice().capitalize(), self._default_voice())]
 
-    def _create_audio(self, text: str, function: Callable[[str], Tensor]):
-        sentences = re.split(r"(?<=[.?!])\s+", text.strip())
-        chunks: list[Tensor] = []
-        current = ""
+    @property
+    @override
+    def sample_rate(self):
+        return self._chatterbox.sr
+
+    @property
+    @override
+    def needs_warm_up(self):
+        return True
+
+    @property
+    @override
+    def language(self):
+        return "en"
+
+    def _get_clone_conditionals(self):
+        """Get the speaker conditionals of the sample voice.
+
+        Conditionals are computed once per sample voice content and persisted in the data
+        directory, so the sample voice is only embedded the first time it is used.
+
+        Returns:
+            Conditionals: The conditionals of the sample voice.
+
+        Raises:
+            Exception: If the sample voice cannot be read or embedded.
+        """
+        sample_hash = file_hash(self.sample_voice)
+        conditionals = self._clone_conditionals.get(sample_hash)
+
+        if conditionals is not None:
+            return conditionals
+
+        file = None
 
         try:
-            for sent in sentences:
-                if current and len(current) + 1 + len(sent) > 300:
-                    chunks.append(function(current))
-                    current = sent
-                    continue
+            folder = from_data_dir("chatterbox_conditionals")
+            folder.mkdir(exist_ok=True)
+            file = folder / f"{sample_hash}.pt"
+        except OSError as e:
+            _logger.error(
+                "Creating conditionals directory failed. Error: %s",
+                e.strerror,
+                exc_info=e,
+            )
+
+        if file is not None and file.is_file():
+            try:
+                conditionals = Conditionals.load(file, map_location="cpu")
+                _logger.info("Loaded sample voice conditionals. File: %s", file.name)
+            except Exception:
+                _logger.error("Loading conditionals failed. Recomputing.", exc_info=True)
+
+        if conditionals is None:
+            _logger.info("Computing sample voice conditionals")
+
+            with self._tuned():
+                self._chatterbox.prepare_conditionals(str(self.sample_voice))
+
+            conditionals = self._chatterbox.conds
+            assert conditionals is not None, "Conditionals should be prepared."
+
+            if file is not None:
+                try:
+                    conditionals.save(file)
+                except OSError as e:
+                    _logger.error(
+                        "Saving conditionals failed. Error: %s",
+                        e.strerror,
+                        exc_info=e,
+                    )
+
+        self._clone_conditionals[sample_hash] = conditionals
+        return conditionals
+
+    def _stream_audio(
+        self,
+        text: str,
+        get_conditionals: Callable[[], Conditionals],
+        cancel: CancellationToken,
+    ) -> Iterator[Tensor]:
+        """Synthesise text in chunks of sentences, yielding the audio of each chunk.
+
+        Args:
+            text (str): The text to be converted to speech.
+            get_conditionals (Callable[[], Conditionals]): Gets the conditionals of the voice.
+            cancel (CancellationToken): Checked before each chunk is generated.
 
-                current = sent if not current else f"{current} {sent}"
+        Yields:
+            Tensor: The audio of the next chunk.
 
-            if current:
-                chunks.append(function(current))
+        Raises:
+            SynthesisCancelledException: If synthesis was cancelled.
+            SynthesisException: If there is an error during synthesis.
+        """
+        try:
+            conditionals = get_conditionals()
+
+            for chunk in self._split_sentences(text, self.SEGMENT_LENGTH):
+                cancel.raise_if_cancelled()
+                self._chatterbox.conds = conditionals
+
+                with self._tuned():
+                    audio = self._chatterbox.generate(chunk)
+
+                yield audio.squeeze(0)
+        except SynthesisException:
+            raise
         except Exception as e:
             _logger.error("Synthesis failed", exc_info=True)
             raise SynthesisException("Check log") from e
 
+    @override
+    def _stream_text_implementation(self, text: str, cancel: CancellationToken):
+        return self._stream_audio(text, lambda: self._default_conditionals, cancel)
+
+    @override
+    def _join_chunks(self, chunks: list[Tensor]):
         return torch.cat(chunks)
 
     @override
-    def _synthesise_text_implementation(self, text: str):
-        return self._create_audio(
-            text,
-            lambda current: ChatterboxTTS.from_pretrained("cpu")
-            .generate(current)
-            .squeeze(0),
-        )
+    def _get_samples(self, data: Tensor):
+        return data.detach().to(torch.float32).cpu().numpy()
+
+    @override
+    def _get_pcm(self, data: Tensor):
+        return PcmBuffer.from_float(self._get_samples(data))
 
     @override
-    def _save_implementation(self, file: Path, data: Tensor):
-        soundfile.write(file, data, self._chatterbox.sr)
+    def _to_bytes(self, data: Tensor):
+        return data.to(torch.float32).contiguous().numpy().tobytes()
 
     @override
-    def _get_wav_bytes(self, data: Tensor):
-        buffer = io.BytesIO()
-        soundfile.write(buffer, data, self._chatterbox.sr, format="wav")
-        return buffer.getvalue()
+    def _from_bytes(self, data: bytes):
+        return torch.frombuffer(bytearray(data), dtype=torch.float32)
 
     @override
     def _has_information(self):
         return True
 
     @override
-    def _synthesise_clone_implementation(self, text: str):
+    def _stream_clone_implementation(self, text: str, cancel: CancellationToken):
         if not self.sample_voice.is_file():
             msg = "Sample voice path does not exist or point to a file"
             _logger.error("Synthesis failed. %s", msg)
             raise SynthesisException(msg)
 
-        return self._create_audio(
-            text,
-            lambda chunk: self._chatterbox.generate(
-                chunk, audio_prompt_path=self._sample_voice
-            ).squeeze(0),
-        )
+        return self._stream_audio(text, self._get_clone_conditionals, cancel)
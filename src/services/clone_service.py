@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Callable, TypeVar
+from typing import Callable, Iterator, TypeVar, override
 
-from services.tts_service import TtsService
+from services.cancellation import CancellationToken
+from services.tts_service import InputMode, TtsService
+from utils import file_hash
 
 T = TypeVar("T")
 
@@ -33,35 +35,106 @@ class CloneService(TtsService[T], ABC):
         return self._sample_voice
 
     @sample_voice.setter
-    def sample_voice(self, value: Path):
-        self._sample_voice: Path = value
+    def sample_voice(self, value: Path | str):
+        self._sample_voice: Path = Path(value)
+
+    @override
+    def _cache_identity(self, mode: InputMode):
+        identity = super()._cache_identity(mode)
+
+        if mode == InputMode.CLONE and self.sample_voice.is_file():
+            identity.append(file_hash(self.sample_voice))
+
+        return identity
 
     @abstractmethod
-    def _synthesise_clone_implementation(self, text: str) -> T:
+    def _stream_clone_implementation(
+        self, text: str, cancel: CancellationToken
+    ) -> Iterator[T]:
+        """Synthesises text to audio data chunk by chunk using a sample voice.
+
+        Args:
+            text (str): The text to be converted to speech.
+            cancel (CancellationToken): Checked before each chunk is synthesised.
+
+        Yields:
+            T: The next chunk of audio data, in playback order.
+
+        Raises:
+            SynthesisCancelledException: If synthesis was cancelled.
+            SynthesisException: If there is an error during synthesis.
+        """
+        pass
+
+    def _synthesise_clone_implementation(
+        self, text: str, cancel: CancellationToken
+    ) -> T:
         """Synthesises text to audio data using a sample voice.
 
+        Args:
+            text (str): The text to be converted to speech.
+            cancel (CancellationToken): Checked before each chunk is synthesised.
+
         Returns:
             data: The audio data synthesised from the text using the sample voice.
 
         Raises:
+            SynthesisCancelledException: If synthesis was cancelled.
             SynthesisException: If there is an error during synthesis.
         """
-        pass
-
-    def save_clone_to_file(self, text: str, show_status: Callable[[str], None]):
+        return self._collect_stream(self._stream_clone_implementation(text, cancel))
+
+    @override
+    def _synthesiser(self, mode: InputMode):
+        if mode == InputMode.CLONE:
+            return self._synthesise_clone_implementation
+
+        return super()._synthesiser(mode)
+
+    def save_clone_to_file(
+        self,
+        text: str,
+        show_status: Callable[[str], None],
+        file: Path | None = None,
+        cancel: CancellationToken | None = None,
+    ):
         """Saves the audio synthesised with the sample voice to a file.
 
         Args:
             text (str): The text to be converted to speech.
             show_status (Callable[[str], None]): A callback function to show status updates.
-        """
-        self._synth_and_save(text, self._synthesise_clone_implementation, show_status)
+            file (Path | None): The file to save to. Defaults to a timestamped file in the saved folder.
+            cancel (CancellationToken | None): Stops synthesis at the next chunk once cancelled.
 
-    def play_clone(self, text: str, show_status: Callable[[str], None]):
+        Returns:
+            Path | None: The saved file, or None if synthesis or saving failed.
+        """
+        return self._synth_and_save(
+            text,
+            self._synthesise_clone_implementation,
+            InputMode.CLONE,
+            show_status,
+            file,
+            cancel,
+        )
+
+    def play_clone(
+        self,
+        text: str,
+        show_status: Callable[[str], None],
+        cancel: CancellationToken | None = None,
+    ):
         """Plays the audio synthesised with the sample voice.
 
         Args:
             text (str): The text to be converted to speech.
             show_status (Callable[[str], None]): A callback function to show status updates.
+            cancel (CancellationToken | None): Stops playback and synthesis once cancelled.
         """
-        self._synth_and_play(text, self._synthesise_clone_implementation, show_status)
+        self._synth_and_play(
+            text,
+            self._stream_clone_implementation,
+            InputMode.CLONE,
+            show_status,
+            cancel,
+        )
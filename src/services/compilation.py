@@ -0,0 +1,218 @@
+import logging
+import math
+import os
+import shutil
+from dataclasses import dataclass
+
+import torch
+from torch import Tensor, nn
+from torch.nn import functional
+
+from utils import from_data_dir
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Bucketing:
+    """How the inputs of a module are padded to a bucket length.
+
+    Only suitable for modules whose output at the unpadded positions does not depend on the
+    padding, such as modules taking a mask of the valid positions.
+    """
+
+    inputs: dict[int | str, int]
+    """The dimension to pad of each padded argument, by position or keyword."""
+    output_dim: int
+    """The dimension of the output to cut back to the input length."""
+
+
+class BucketedModule(nn.Module):
+    """Pads the inputs of a compiled module to bucket lengths.
+
+    The module is then compiled once per bucket instead of once per input length. Bucket
+    lengths grow in quarter steps of the power of two below the length, so padding adds at most
+    a quarter of the work. Attributes not found on the wrapper are read from the module.
+    """
+
+    MIN_BUCKET: int = 16
+
+    def __init__(self, module: nn.Module, bucketing: Bucketing):
+        """Initialise the wrapper.
+
+        Args:
+            module (nn.Module): The compiled module.
+            bucketing (Bucketing): How its inputs are padded.
+        """
+        super().__init__()
+        self.module: nn.Module = module
+        self._bucketing: Bucketing = bucketing
+
+    def __getattr__(self, name: str):
+        try:
+            return super().__getattr__(name)
+        except AttributeError:
+            if name == "module":
+                raise
+
+            return getattr(self.module, name)
+
+    @classmethod
+    def bucket(cls, length: int):
+        """Round a length up to its bucket length.
+
+        Args:
+            length (int): The length.
+
+        Returns:
+            int: The bucket length.
+        """
+        if length <= cls.MIN_BUCKET:
+            return cls.MIN_BUCKET
+
+        step = max(cls.MIN_BUCKET, 2 ** (length.bit_length() - 1) // 4)
+        return math.ceil(length / step) * step
+
+    @classmethod
+    def _pad(cls, tensor: Tensor, dim: int, length: int):
+        """Pad a tensor with zeros along a dimension.
+
+        Args:
+            tensor (Tensor): The tensor.
+            dim (int): The dimension to pad.
+            length (int): The length to pad to.
+
+        Returns:
+            Tensor: The padded tensor.
+        """
+        dim %= tensor.dim()
+        padding = [0, 0] * (tensor.dim() - dim - 1) + [0, length - tensor.shape[dim]]
+        return functional.pad(tensor, padding)
+
+    def forward(self, *args: object, **kwargs: object):
+        inputs: dict[int | str, object] = {**dict(enumerate(args)), **kwargs}
+        length: int | None = None
+
+        for key, dim in self._bucketing.inputs.items():
+            value = inputs.get(key)
+
+            if isinstance(value, Tensor):
+                if length is None:
+                    length = value.shape[dim]
+
+                inputs[key] = self._pad(value, dim, self.bucket(length))
+
+        output = self.module(
+            *(inputs[index] for index in range(len(args))),
+            **{key: value for key, value in inputs.items() if isinstance(key, str)},
+        )
+
+        if length is None:
+            return output
+
+        return output.narrow(self._bucketing.output_dim, 0, length)
+
+
+class GraphCompiler:
+    """Compiles submodules of a model with torch.compile.
+
+    Compiled kernels are cached in the data directory, keyed by the torch version, so their
+    compilation runs once per machine instead of once per launch. Only tracing the model runs
+    on every launch. Submodules with masked inputs are compiled for bucket lengths of their
+    inputs, and the others with dynamic shapes, so new input lengths do not recompile them.
+    If compiling part of a model fails, that part runs uncompiled.
+    """
+
+    FOLDER: str = "compiled"
+    RECOMPILE_LIMIT: int = 64
+    """Compiled variants kept per submodule, enough for every bucket length."""
+    COMPILERS: tuple[str, ...] = ("g++", "clang++", "cl")
+
+    def __init__(self, name: str):
+        """Initialise the compiler.
+
+        Args:
+            name (str): Name of the model, for logging.
+        """
+        self.name: str = name
+
+    @classmethod
+    def is_supported(cls):
+        """Whether torch can compile for the CPU here.
+
+        Returns:
+            bool: True if torch.compile is supported and a C++ compiler is installed.
+        """
+        import torch._dynamo
+
+        return bool(torch._dynamo.is_dynamo_supported()) and any(
+            shutil.which(compiler) for compiler in cls.COMPILERS
+        )
+
+    @classmethod
+    def _configure(cls):
+        """Point the compile cache to the data directory and make failures fall back.
+
+        Raises:
+            OSError: If creating the cache folder fails.
+        """
+        import torch._dynamo
+        import torch._inductor.config
+
+        folder = from_data_dir(cls.FOLDER) / f"torch-{torch.__version__}"
+        folder.mkdir(parents=True, exist_ok=True)
+        # The environment wins, so the cache can still be moved elsewhere.
+        _ = os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(folder))
+        torch._inductor.config.fx_graph_cache = True
+        torch._dynamo.config.suppress_errors = True
+
+        for limit in ("recompile_limit", "cache_size_limit"):
+            if hasattr(torch._dynamo.config, limit):
+                setattr(torch._dynamo.config, limit, cls.RECOMPILE_LIMIT)
+
+    def apply(
+        self,
+        model: nn.Module,
+        dynamic: list[str],
+        bucketed: dict[str, Bucketing],
+    ):
+        """Compile submodules of a model in place. They are compiled on their first call.
+
+        Args:
+            model (nn.Module): The model.
+            dynamic (list[str]): Paths of the submodules to compile with dynamic shapes.
+            bucketed (dict[str, Bucketing]): How to pad the inputs of the submodules to compile
+                for bucket lengths, by submodule path.
+
+        Returns:
+            bool: True if the submodules will be compiled.
+        """
+        if not self.is_supported():
+            _logger.error("Compiling is not supported here. Running uncompiled.")
+            return False
+
+        try:
+            self._configure()
+        except OSError as e:
+            _logger.error(
+                "Creating compile cache directory failed. Error: %s",
+                e.strerror,
+                exc_info=e,
+            )
+
+        for path in dynamic:
+            model.get_submodule(path).compile(dynamic=True)
+
+        for path, bucketing in bucketed.items():
+            module = model.get_submodule(path)
+            module.compile(dynamic=False)
+            parent, _, name = path.rpartition(".")
+            wrapper = BucketedModule(module, bucketing)
+            setattr(model.get_submodule(parent), name, wrapper)
+
+        _logger.info(
+            "Compiling model on first use. Model: %s, modules: %s",
+            self.name,
+            ", ".join([*dynamic, *bucketed]),
+        )
+        return True
@@ -0,0 +1,157 @@
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from utils import resident_memory
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    engine: object
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class EngineRegistry:
+    """Registry of loaded engines that are reused across service switches.
+
+    Engines are keyed by their class and the construction arguments that cannot be changed on a
+    live instance. Arguments exposed as settable properties are re-applied in place when they
+    change. Engines other than the active one are unloaded once idle for longer than the idle
+    timeout, or least recently used first while resident memory exceeds the memory budget.
+    """
+
+    def __init__(self, idle_timeout: float, memory_budget: int):
+        """Initialise the registry and start sweeping idle engines.
+
+        Args:
+            idle_timeout (float): Seconds an inactive engine is kept loaded. Disabled if 0 or less.
+            memory_budget (int): Resident memory in bytes above which inactive engines are
+                unloaded. Disabled if 0 or less.
+        """
+        self._lock: threading.Lock = threading.Lock()
+        self._engines: OrderedDict[tuple[object, ...], _Entry] = OrderedDict()
+        self._active: tuple[object, ...] | None = None
+        self._idle_timeout: float = idle_timeout
+        self._memory_budget: int = memory_budget
+
+        if self._idle_timeout > 0:
+            threading.Thread(target=self._sweep_periodically, daemon=True).start()
+
+    @classmethod
+    def _settable(cls, engine_class: type, name: str):
+        """Return whether an argument can be re-applied to a live instance of a class.
+
+        Args:
+            engine_class (type): The engine class.
+            name (str): The name of the construction argument.
+
+        Returns:
+            bool: True if the class exposes the argument as a property with a setter.
+        """
+        attribute = getattr(engine_class, name, None)
+        return isinstance(attribute, property) and attribute.fset is not None
+
+    def acquire(self, engine_class: type, args: dict[str, str]) -> object:
+        """Return a live engine for the arguments, reusing a loaded one when possible.
+
+        Args:
+            engine_class (type): The engine class, constructed with the argument values in order.
+            args (dict[str, str]): Construction arguments keyed by name.
+
+        Returns:
+            object: The engine, which becomes the active engine.
+
+        Raises:
+            ServiceCreationException: If a new engine has to be created and its creation fails.
+        """
+        key = (
+            engine_class,
+            *(
+                (name, value)
+                for name, value in args.items()
+                if not self._settable(engine_class, name)
+            ),
+        )
+
+        with self._lock:
+            entry = self._engines.get(key)
+
+        if entry is None:
+            _logger.info("Loading engine. Engine: %s", engine_class.__name__)
+            entry = _Entry(engine_class(*args.values()))
+        else:
+            _logger.info("Reusing loaded engine. Engine: %s", engine_class.__name__)
+
+            for name, value in args.items():
+                if self._settable(engine_class, name) and str(
+                    getattr(entry.engine, name)
+                ) != value:
+                    _logger.info("Re-applying engine setting. Setting: %s", name)
+                    setattr(entry.engine, name, value)
+
+        with self._lock:
+            entry.last_used = time.monotonic()
+            self._engines[key] = entry
+            self._engines.move_to_end(key)
+            previous = self._engines.get(self._active) if self._active else None
+
+            if previous is not None:
+                previous.last_used = entry.last_used
+
+            self._active = key
+
+        self.sweep()
+        return entry.engine
+
+    def sweep(self):
+        """Unload inactive engines that have been idle too long or exceed the memory budget."""
+        with self._lock:
+            now = time.monotonic()
+            idle = [
+                key
+                for key, entry in self._engines.items()
+                if key != self._active
+                and self._idle_timeout > 0
+                and now - entry.last_used > self._idle_timeout
+            ]
+
+            for key in idle:
+                self._unload(key, "idle")
+
+            if self._memory_budget <= 0:
+                return
+
+            rss = resident_memory()
+
+            while rss is not None and rss > self._memory_budget:
+                key = next((k for k in self._engines if k != self._active), None)
+
+                if key is None:
+                    break
+
+                self._unload(key, "memory budget exceeded")
+                rss = resident_memory()
+
+    def _unload(self, key: tuple[object, ...], reason: str):
+        """Drop the registry's reference to an engine and collect it.
+
+        Args:
+            key (tuple[object, ...]): The key of the engine.
+            reason (str): Why the engine is unloaded, for logging.
+        """
+        name = type(self._engines.pop(key).engine).__name__
+        _ = gc.collect()
+        _logger.info("Unloaded engine. Engine: %s, reason: %s", name, reason)
+
+    def _sweep_periodically(self):
+        """Sweep idle engines at a fraction of the idle timeout, for the life of the process."""
+        interval = max(self._idle_timeout / 4, 1)
+
+        while True:
+            time.sleep(interval)
+            self.sweep()
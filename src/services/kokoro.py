@@ -1,32 +1,93 @@
-import io
 import logging
-from pathlib import Path
-from typing import override
+from typing import Iterator, override
 
-import soundfile
-import torch
-from huggingface_hub import snapshot_download
-from kokoro import KPipeline
-from kokoro.pipeline import LANG_CODES
-from torch import FloatTensor, Tensor
+from kokoro import KModel, KPipeline
+from torch import Tensor
 
-from exceptions import SynthesisException
-from services.tts_service import Services, Setting, TtsService
+from exceptions import ServiceCreationException, SynthesisException
+from services.cancellation import CancellationToken
+from services.compilation import Bucketing, GraphCompiler
+from services.kokoro_voices import KokoroVoices
+from services.quantization import DynamicQuantizer
+from services.torch_tuning import TorchTuning
+from services.tts_service import Services, Setting
 
 _logger = logging.getLogger(__name__)
 
 
-class Kokoro(TtsService[Tensor]):
-    SAMPLE_RATE: int = 24000
-
-    def __init__(self, voice: str):
+class Kokoro(TorchTuning, KokoroVoices):
+    def __init__(
+        self,
+        voice: str,
+        intra_op_threads: str,
+        inter_op_threads: str,
+        cpu_affinity: str,
+        inference_mode: str,
+        bf16_autocast: str,
+        quantize: str,
+        compile_graphs: str,
+    ):
         """Initialize the Kokoro TTS service.
 
         Args:
             voice (str): The voice to use for synthesis. Defaults to "af_heart".
+            intra_op_threads (str): Threads one operation runs on, or auto.
+            inter_op_threads (str): Threads independent operations run on, or auto.
+            cpu_affinity (str): The cores synthesis runs on, such as 0-3,6, or empty for all.
+            inference_mode (str): Whether to disable autograd tracking during synthesis.
+            bf16_autocast (str): Whether to run eligible operations in bfloat16.
+            quantize (str): Whether to quantize the linear layers of the model to int8.
+            compile_graphs (str): Whether to compile the text encoder and the vocoder.
+
+        Raises:
+            ServiceCreationException: If there is an error during service creation.
         """
         super().__init__()
-        self.voice = voice
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.cpu_affinity = cpu_affinity
+        self.inference_mode = inference_mode
+        self.bf16_autocast = bf16_autocast
+
+        try:
+            self._model: KModel = KModel(repo_id=self.REPO_ID).eval()
+        except Exception as e:
+            _logger.error("Creating kokoro service failed", exc_info=True)
+            raise ServiceCreationException("Check log") from e
+
+        self._init_voices(voice)
+
+        try:
+            # The vocoder stays float to keep the audio quality.
+            self._quantize(
+                quantize,
+                DynamicQuantizer(
+                    "kokoro", "kokoro", ["bert", "bert_encoder", "predictor"]
+                ),
+                self._model,
+                lambda: list(
+                    self._stream_text_implementation(
+                        self.WARM_UP_TEXT, CancellationToken()
+                    )
+                ),
+            )
+        except Exception as e:
+            _logger.error("Quantizing kokoro model failed", exc_info=True)
+            raise ServiceCreationException("Check log") from e
+
+        try:
+            # The text encoder masks padded tokens, so its input is bucketed. The
+            # vocoder input length depends on predicted durations, so it stays dynamic.
+            self._compile(
+                compile_graphs,
+                GraphCompiler("kokoro"),
+                self._model,
+                ["decoder"],
+                {"bert": Bucketing({0: 1, "attention_mask": 1}, 1)},
+            )
+        except Exception as e:
+            _logger.error("Compiling kokoro model failed", exc_info=True)
+            raise ServiceCreationException("Check log") from e
 
     @classmethod
     @override
@@ -36,76 +97,33 @@ class Kokoro(TtsService[Tensor]):
     @classmethod
     @override
     def setting_fields(cls) -> list[Setting]:
-        return []
+        return cls.tuning_fields(cls.type())
 
-    @classmethod
     @override
-    def _default_voice(cls):
-        return "af_heart"
+    def _create_pipeline(self, lang_code: str):
+        # Pipelines share the service model.
+        return KPipeline(lang_code, repo_id=self.REPO_ID, model=self._model)
 
-    @property
     @override
-    def voices(self):
-        remote_voice_folder = "voices"
-        voice_dir = (
-            Path(
-                snapshot_download(
-                    "hexgrad/Kokoro-82M", allow_patterns=f"{remote_voice_folder}/*.pt"
-                )
-            )
-            / remote_voice_folder
-        )
-        voices: list[tuple[str, str]] = []
-
-        for voice in [file.stem for file in voice_dir.glob("*.pt")]:
-            voice_parts = voice.split("_")
-            name = voice_parts[1].capitalize()
-            locale_key = voice_parts[0][0]
-            locale = (
-                LANG_CODES.get(locale_key) if locale_key in LANG_CODES else "unknown"
-            )
-            gender = "Male" if voice_parts[0][1] == "m" else "Female"
-            voices.append((f"{name} ({locale}) ({gender})", voice))
-
-        return voices
+    def _stream_text_implementation(
+        self, text: str, cancel: CancellationToken
+    ) -> Iterator[Tensor]:
+        try:
+            pipeline, pack = self._loaded_voice.result()
+            cancel.raise_if_cancelled()
 
-    @property
-    @override
-    def voice(self):
-        return self._voice
+            # Chunks are synthesised lazily, so stopping here skips the rest.
+            for segment in self._split_sentences(text, self.SEGMENT_LENGTH):
+                results = pipeline(segment, pack, split_pattern=None)
 
-    @voice.setter
-    @override
-    def voice(self, voice: str):
-        self._voice: str = voice
-        self.pipeline: KPipeline = KPipeline(self._voice[0])
+                for _, _, audio in self._tuned_iter(results):
+                    # Autocast may return bfloat16 audio, which is converted on output.
+                    if isinstance(audio, Tensor):
+                        yield audio
 
-    @override
-    def _synthesise_text_implementation(self, text: str) -> Tensor:
-        try:
-            generator = self.pipeline(text, self.voice)
+                    cancel.raise_if_cancelled()
+        except SynthesisException:
+            raise
         except Exception as e:
             _logger.error("Synthesis failed", exc_info=True)
             raise SynthesisException("Check log") from e
-
-        chunks: list[Tensor] = []
-
-        for _, _, audio in list(generator):
-            if isinstance(audio, FloatTensor):
-                chunks.append(audio)
-
-        return torch.cat(chunks)
-
-    @override
-    def _save_implementation(self, file: Path, data: Tensor):
-        soundfile.write(file, data, self.SAMPLE_RATE)
-
-    @override
-    def _get_wav_bytes(self, data: Tensor):
-        buffer = io.BytesIO()
-        soundfile.write(buffer, data, self.SAMPLE_RATE, format="wav")
-        return buffer.getvalue()
-
-    @override
-    def _has_information(self):
-        return True
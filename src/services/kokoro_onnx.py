@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import os
+from importlib import metadata
+from pathlib import Path
+from typing import Iterator, override
+
+import numpy
+import onnxruntime
+import torch
+from huggingface_hub import hf_hub_download
+from kokoro import KModel, KPipeline
+from torch import Tensor
+
+from exceptions import ServiceCreationException, SynthesisException
+from services.cancellation import CancellationToken
+from services.kokoro_voices import KokoroVoices
+from services.tts_service import Services, Setting, TtsService
+from utils import from_data_dir, parse_threads
+
+_logger = logging.getLogger(__name__)
+
+
+class KokoroOnnx(KokoroVoices):
+    """Kokoro with the acoustic model run by ONNX Runtime on the CPU instead of torch.
+
+    Text is converted to phonemes and voice packs are loaded by Kokoro pipelines as in the torch
+    service, but the pipelines hold no model and the torch tuning settings do not apply. The
+    model is exported to ONNX once, cached in the data directory keyed by the kokoro and torch
+    versions, and the torch model is released after the export, so only the ONNX Runtime
+    session stays in memory.
+    """
+
+    FOLDER: str = "onnx"
+    OPSET: int = 17
+    STYLE_SIZE: int = 256
+
+    def __init__(self, voice: str, threads: str):
+        """Initialize the Kokoro ONNX service.
+
+        Args:
+            voice (str): The voice to use for synthesis. Defaults to "af_heart".
+            threads (str): Threads the model runs on, or auto.
+
+        Raises:
+            ServiceCreationException: If there is an error during service creation.
+        """
+        super().__init__()
+
+        try:
+            self._vocab: dict[str, int] = self._load_vocab()
+            self._session: onnxruntime.InferenceSession = self._create_session(
+                self._export(),
+                parse_threads(threads, "threads") or TtsService.auto_threads,
+            )
+        except Exception as e:
+            _logger.error("Creating kokoro onnx service failed", exc_info=True)
+            raise ServiceCreationException("Check log") from e
+
+        self._init_voices(voice)
+
+    @classmethod
+    @override
+    def type(cls):
+        return Services.KOKORO_ONNX
+
+    @classmethod
+    @override
+    def setting_fields(cls) -> list[Setting]:
+        return [Setting("threads", f"{cls.type().value}/threads", "auto", False)]
+
+    @classmethod
+    def _load_vocab(cls):
+        """Read the phoneme vocabulary from the model config.
+
+        Returns:
+            dict[str, int]: The token id of each phoneme.
+        """
+        config = hf_hub_download(cls.REPO_ID, "config.json")
+
+        with open(config, encoding="utf-8") as f:
+            return json.load(f)["vocab"]
+
+    @classmethod
+    def _model_file(cls):
+        """Return the cache file of the exported model.
+
+        Returns:
+            Path: The file, named by a hash of the versions the model was exported with.
+
+        Raises:
+            OSError: If creating the cache folder fails.
+        """
+        versions: list[str] = []
+
+        for package in ("kokoro", "torch"):
+            try:
+                versions.append(metadata.version(package))
+            except metadata.PackageNotFoundError:
+                versions.append("unknown")
+
+        identity = "\0".join([cls.REPO_ID, *versions, str(cls.OPSET)])
+        key = hashlib.sha256(identity.encode()).hexdigest()[:16]
+        folder = from_data_dir(cls.FOLDER)
+        folder.mkdir(exist_ok=True)
+        return folder / f"kokoro-{key}.onnx"
+
+    @classmethod
+    def _export(cls):
+        """Export the torch model to ONNX, unless it has been exported already.
+
+        Returns:
+            Path: The exported model.
+        """
+        file = cls._model_file()
+
+        if file.is_file():
+            return file
+
+        from kokoro.model import KModelForONNX
+
+        _logger.info("Exporting kokoro model to ONNX. File: %s", file)
+        # Complex tensors cannot be exported, so the vocoder uses its real-valued STFT.
+        model = KModelForONNX(
+            KModel(repo_id=cls.REPO_ID, disable_complex=True).eval()
+        ).eval()
+        temp = file.with_name(f"{file.name}.tmp")
+
+        try:
+            with torch.no_grad():
+                torch.onnx.export(
+                    model,
+                    (
+                        torch.randint(1, 100, (1, 48)),
+                        torch.randn(1, cls.STYLE_SIZE),
+                        torch.ones(1),
+                    ),
+                    str(temp),
+                    input_names=["input_ids", "style", "speed"],
+                    output_names=["waveform", "duration"],
+                    dynamic_axes={
+                        "input_ids": {1: "tokens"},
+                        "waveform": {0: "samples"},
+                        "duration": {0: "tokens"},
+                    },
+                    opset_version=cls.OPSET,
+                    dynamo=False,
+                )
+            _ = temp.replace(file)
+        finally:
+            temp.unlink(missing_ok=True)
+
+        _logger.info("Exported kokoro model to ONNX")
+        return file
+
+    @classmethod
+    def _create_session(cls, file: Path, threads: int | None):
+        """Load an exported model into an ONNX Runtime session on the CPU.
+
+        Args:
+            file (Path): The exported model.
+            threads (int | None): Threads the model runs on, or None for every core but one.
+
+        Returns:
+            onnxruntime.InferenceSession: The session.
+        """
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads or max(1, (os.cpu_count() or 1) - 1)
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        _logger.info("Loading ONNX model. Threads: %d", options.intra_op_num_threads)
+        return onnxruntime.InferenceSession(
+            str(file), options, providers=["CPUExecutionProvider"]
+        )
+
+    @override
+    def _create_pipeline(self, lang_code: str):
+        return KPipeline(lang_code, repo_id=self.REPO_ID, model=False)
+
+    def _infer(self, phonemes: str, pack: Tensor):
+        """Synthesise the audio of phonemes with the ONNX model.
+
+        Args:
+            phonemes (str): The phonemes, at most the model context long.
+            pack (Tensor): The voice pack, holding a style for each phoneme count.
+
+        Returns:
+            Tensor: The audio.
+        """
+        ids = [0, *(self._vocab[p] for p in phonemes if p in self._vocab), 0]
+        waveform, _ = self._session.run(
+            None,
+            {
+                "input_ids": numpy.array([ids], dtype=numpy.int64),
+                "style": pack[len(phonemes) - 1].to(torch.float32).numpy(),
+                "speed": numpy.ones(1, dtype=numpy.float32),
+            },
+        )
+        return torch.from_numpy(waveform)
+
+    @override
+    def _stream_text_implementation(
+        self, text: str, cancel: CancellationToken
+    ) -> Iterator[Tensor]:
+        try:
+            pipeline, pack = self._loaded_voice.result()
+            cancel.raise_if_cancelled()
+
+            for segment in self._split_sentences(text, self.SEGMENT_LENGTH):
+                for _, phonemes, _ in pipeline(segment, pack, split_pattern=None):
+                    if phonemes:
+                        yield self._infer(phonemes, pack)
+
+                    cancel.raise_if_cancelled()
+        except SynthesisException:
+            raise
+        except Exception as e:
+            _logger.error("Synthesis failed", exc_info=True)
+            raise SynthesisException("Check log") from e
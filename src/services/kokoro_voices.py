@@ -0,0 +1,224 @@
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import override
+
+import torch
+from huggingface_hub import snapshot_download
+from kokoro import KPipeline
+from kokoro.pipeline import LANG_CODES
+from torch import Tensor
+
+from services.pcm_buffer import PcmBuffer
+from services.tts_service import TtsService
+from services.voice_catalog import VoiceCatalog
+from utils import file_hash
+
+_logger = logging.getLogger(__name__)
+
+
+class KokoroVoices(TtsService[Tensor], ABC):
+    """Voices, pipelines and audio handling shared by the Kokoro services.
+
+    Text is converted to phonemes by a Kokoro pipeline per language, and voice packs are loaded
+    in the background when the voice changes. Subclasses provide the model the pipelines run,
+    and call _init_voices once it can be used.
+    """
+
+    SAMPLE_RATE: int = 24000
+    REPO_ID: str = "hexgrad/Kokoro-82M"
+    CATALOG_MAX_AGE: float = 7 * 24 * 60 * 60
+    SEGMENT_LENGTH: int = 400
+    LANGUAGES: dict[str, str] = {
+        "a": "en",
+        "b": "en",
+        "e": "es",
+        "f": "fr",
+        "h": "hi",
+        "i": "it",
+        "j": "ja",
+        "p": "pt",
+        "z": "zh",
+    }
+    """ISO 639-1 codes of the languages, by the first letter of the voice names."""
+
+    def _init_voices(self, voice: str):
+        """Set up the voice catalog and the background loading of pipelines and voice packs.
+
+        Args:
+            voice (str): The voice to use for synthesis.
+        """
+        self._catalog: VoiceCatalog = VoiceCatalog(
+            "kokoro",
+            self.CATALOG_MAX_AGE,
+            self._fetch_voices,
+            lambda voices: self._voices_refreshed(self._format_voices(voices)),
+        )
+        self._pipelines: dict[str, KPipeline] = {}
+        self._voice_packs: dict[str, Tensor] = {}
+        self._loader: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="kokoro-loader"
+        )
+        self.voice = voice
+
+    @classmethod
+    @override
+    def _default_voice(cls):
+        return "af_heart"
+
+    def _fetch_voices(self):
+        """Download the voice packs and describe them for the voice catalog.
+
+        Returns:
+            list[dict[str, str]]: The name, display name, locale, gender, file path and file hash of each voice.
+        """
+        remote_voice_folder = "voices"
+        voice_dir = (
+            Path(
+                snapshot_download(
+                    self.REPO_ID, allow_patterns=f"{remote_voice_folder}/*.pt"
+                )
+            )
+            / remote_voice_folder
+        )
+        voices: list[dict[str, str]] = []
+
+        for file in sorted(voice_dir.glob("*.pt")):
+            voice = file.stem
+            voice_parts = voice.split("_")
+            name = voice_parts[1].capitalize()
+            locale_key = voice_parts[0][0]
+            locale = (
+                LANG_CODES.get(locale_key) if locale_key in LANG_CODES else "unknown"
+            )
+            gender = "Male" if voice_parts[0][1] == "m" else "Female"
+            voices.append(
+                {
+                    "name": voice,
+                    "display": f"{name} ({locale}) ({gender})",
+                    "locale": locale,
+                    "gender": gender,
+                    "path": str(file),
+                    "hash": file_hash(file),
+                }
+            )
+
+        return voices
+
+    @classmethod
+    def _format_voices(cls, voices: list[dict[str, str]]):
+        """Format catalog voices into display tuples.
+
+        Args:
+            voices (list[dict[str, str]]): The voices from the voice catalog.
+
+        Returns:
+            list[tuple[str, str]]: List of tuples (display name, voice name).
+        """
+        return [(voice["display"], voice["name"]) for voice in voices]
+
+    @property
+    @override
+    def voices(self):
+        return self._format_voices(self._catalog.get(wait_if_missing=True))
+
+    @override
+    def refresh_voices(self):
+        return self._format_voices(self._catalog.refresh())
+
+    @property
+    @override
+    def voice(self):
+        return self._voice
+
+    @voice.setter
+    @override
+    def voice(self, voice: str):
+        self._voice: str = voice
+        self._loaded_voice: Future[tuple[KPipeline, Tensor]] = self._loader.submit(
+            self._load_voice, voice
+        )
+
+    def _load_voice(self, voice: str):
+        """Get the pipeline for the language of a voice and the voice pack, loading them if needed.
+
+        Pipelines are cached per language code. Voice packs are cached per voice.
+
+        Args:
+            voice (str): The voice to load.
+
+        Returns:
+            tuple[KPipeline, Tensor]: The pipeline and the voice pack.
+        """
+        lang_code = voice[0]
+        pipeline = self._pipelines.get(lang_code)
+
+        if pipeline is None:
+            _logger.info("Loading pipeline. Language code: %s", lang_code)
+            pipeline = self._create_pipeline(lang_code)
+            self._pipelines[lang_code] = pipeline
+
+        pack = self._voice_packs.get(voice)
+
+        if pack is None:
+            _logger.info("Loading voice pack. Voice: %s", voice)
+            entry = self._catalog.find(voice)
+            path = Path(entry["path"]) if entry else None
+            pack = pipeline.load_voice(
+                str(path) if path is not None and path.is_file() else voice
+            )
+            self._voice_packs[voice] = pack
+
+        return pipeline, pack
+
+    @abstractmethod
+    def _create_pipeline(self, lang_code: str) -> KPipeline:
+        """Create the pipeline of a language.
+
+        Args:
+            lang_code (str): The Kokoro language code.
+
+        Returns:
+            KPipeline: The pipeline.
+        """
+        pass
+
+    @property
+    @override
+    def sample_rate(self):
+        return self.SAMPLE_RATE
+
+    @property
+    @override
+    def needs_warm_up(self):
+        return True
+
+    @property
+    @override
+    def language(self):
+        return self.LANGUAGES.get(self.voice[:1])
+
+    @override
+    def _join_chunks(self, chunks: list[Tensor]):
+        return torch.cat(chunks)
+
+    @override
+    def _get_samples(self, data: Tensor):
+        return data.detach().to(torch.float32).cpu().numpy()
+
+    @override
+    def _get_pcm(self, data: Tensor):
+        return PcmBuffer.from_float(self._get_samples(data))
+
+    @override
+    def _to_bytes(self, data: Tensor):
+        return data.to(torch.float32).contiguous().numpy().tobytes()
+
+    @override
+    def _from_bytes(self, data: bytes):
+        return torch.frombuffer(bytearray(data), dtype=torch.float32)
+
+    @override
+    def _has_information(self):
+        return True
@@ -0,0 +1,79 @@
+import numpy
+
+SAMPLE_MAX: int = 32767
+
+
+class PcmBuffer:
+    """Int16 mono PCM audio exposed through the buffer protocol.
+
+    The samples are held in a single NumPy array. Playback and writers read it through
+    memoryviews, so queued audio is not copied. Playback only copies each slice that fits in
+    the audio output buffer as it writes it.
+    """
+
+    def __init__(self, samples: numpy.ndarray):
+        """Wrap int16 samples without copying them.
+
+        Args:
+            samples (numpy.ndarray): One-dimensional, C-contiguous int16 samples.
+        """
+        assert samples.dtype == numpy.int16, "Samples should be int16."
+        assert samples.ndim == 1, "Samples should be mono."
+        assert samples.flags.c_contiguous, "Samples should be contiguous."
+        self._samples: numpy.ndarray = samples
+
+    @classmethod
+    def from_float(cls, samples: numpy.ndarray):
+        """Convert float samples in [-1, 1] to int16 in one vectorised pass.
+
+        Each call allocates a new array. Chunks cannot share one, since playback may still be
+        reading queued chunks while later ones are converted.
+
+        Args:
+            samples (numpy.ndarray): One-dimensional float samples. Values outside [-1, 1] are
+                clipped.
+
+        Returns:
+            PcmBuffer: The converted samples.
+        """
+        samples = samples.reshape(-1)
+        out = numpy.empty(len(samples), dtype=numpy.int16)
+
+        if len(samples) and (samples.max() > 1 or samples.min() < -1):
+            samples = numpy.clip(samples, -1, 1)
+
+        _ = numpy.multiply(samples, SAMPLE_MAX, out=out, casting="unsafe")
+        return cls(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes | bytearray | memoryview):
+        """Wrap raw int16 little-endian PCM without copying it.
+
+        Args:
+            data (bytes | bytearray | memoryview): The PCM data.
+
+        Returns:
+            PcmBuffer: The samples, sharing memory with data.
+        """
+        return cls(numpy.frombuffer(data, dtype="<i2").astype(numpy.int16, copy=False))
+
+    @property
+    def samples(self):
+        """The int16 samples, sharing memory with the buffer."""
+        return self._samples
+
+    @property
+    def nbytes(self):
+        """The size of the audio in bytes."""
+        return self._samples.nbytes
+
+    def __len__(self):
+        return len(self._samples)
+
+    def memoryview(self):
+        """Return a byte view of the samples.
+
+        Returns:
+            memoryview: A flat, read-only unsigned byte view sharing memory with the buffer.
+        """
+        return memoryview(self._samples).cast("B").toreadonly()
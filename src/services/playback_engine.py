@@ -0,0 +1,399 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable
+
+from PySide6.QtCore import (
+    QIODevice,
+    QMetaObject,
+    QObject,
+    QThread,
+    QTimer,
+    Qt,
+    Signal,
+    Slot,
+)
+
+from services.pcm_buffer import PcmBuffer
+from settings import settings
+
+if TYPE_CHECKING:
+    from PySide6.QtMultimedia import QAudioSink
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Utterance:
+    """Audio queued on the playback engine, with the outcome of playing it."""
+
+    sample_rate: int
+    chunks: "queue.Queue[PcmBuffer | Exception | None]"
+    """Queue of int16 mono PCM chunks. An exception aborts the utterance and None ends it."""
+    on_start: Callable[[], None]
+    """Called from the engine thread when the first audio of the utterance is written."""
+    created: float = field(default_factory=time.perf_counter)
+    started: bool = False
+    end: int | None = None
+    """Byte position in the audio output after the last byte of the utterance, once known."""
+    error: Exception | None = None
+    playback_error: str | None = None
+    stopped: bool = False
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def wait(self):
+        """Block until the utterance has been played, stopped or has failed."""
+        _ = self.done.wait()
+
+
+class PlaybackEngine(QObject):
+    """Long-lived raw PCM audio output shared by every service.
+
+    The engine owns a QAudioSink in push mode on its own thread. Utterances are played in the
+    order they are queued, back to back on the same output when their sample rates match, so
+    consecutive utterances play without gaps. The output is only reopened when the sample rate
+    or the buffer size changes. QtMultimedia is imported when audio is first played, so it does
+    not slow down startup.
+    """
+
+    BUFFER_KEY: str = "playback/buffer_ms"
+    DEFAULT_BUFFER_MS: int = 100
+    FEED_INTERVAL_MS: int = 10
+    _instance: "PlaybackEngine | None" = None
+    _instance_lock: threading.Lock = threading.Lock()
+    _wake: Signal = Signal()
+
+    def __init__(self):
+        """Initialise the engine and start its thread."""
+        super().__init__()
+        self._lock: threading.Lock = threading.Lock()
+        self._queue: deque[Utterance] = deque()
+        self._stop_requested: bool = False
+        self._timer: QTimer | None = None
+        self._sink: "QAudioSink | None" = None
+        self._device: QIODevice | None = None
+        self._sample_rate: int = 0
+        self._buffer_ms: int = 0
+        self._written: int = 0
+        self._current: Utterance | None = None
+        self._playing: list[Utterance] = []
+        self._pending: memoryview = memoryview(b"")
+
+        self._thread: QThread = QThread()
+        _ = self.moveToThread(self._thread)
+        _ = self._thread.started.connect(self._start)
+        _ = self._wake.connect(self._on_wake)
+        self._thread.start()
+
+    @classmethod
+    def instance(cls) -> "PlaybackEngine":
+        """Return the playback engine, starting it on first use.
+
+        Returns:
+            PlaybackEngine: The shared playback engine.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = PlaybackEngine()
+
+            return cls._instance
+
+    @classmethod
+    def shutdown(cls):
+        """Stop playback, close the audio output and stop the engine thread, if started."""
+        with cls._instance_lock:
+            engine = cls._instance
+            cls._instance = None
+
+        if engine is None:
+            return
+
+        engine.stop()
+        _ = QMetaObject.invokeMethod(
+            engine, "_close", Qt.ConnectionType.BlockingQueuedConnection
+        )
+        engine._thread.quit()
+        _ = engine._thread.wait()
+
+    @classmethod
+    def buffer_ms(cls):
+        """The saved audio output buffer length in milliseconds.
+
+        Returns:
+            int: The buffer length. Shorter buffers start sooner but may underrun.
+        """
+        try:
+            value = int(settings.value(cls.BUFFER_KEY, cls.DEFAULT_BUFFER_MS))
+        except ValueError:
+            _logger.error("Invalid playback buffer. Using default.")
+            value = cls.DEFAULT_BUFFER_MS
+
+        return max(value, cls.FEED_INTERVAL_MS)
+
+    def play(
+        self,
+        sample_rate: int,
+        chunks: "queue.Queue[PcmBuffer | Exception | None]",
+        on_start: Callable[[], None],
+    ):
+        """Queue audio to be played after the utterances already queued.
+
+        Args:
+            sample_rate (int): The sample rate of the audio.
+            chunks (queue.Queue[PcmBuffer | Exception | None]): Queue of int16 mono PCM
+                chunks. An exception aborts the utterance and None marks its end.
+            on_start (Callable[[], None]): Called when the utterance starts playing.
+
+        Returns:
+            Utterance: The queued utterance, to wait for its outcome.
+        """
+        utterance = Utterance(sample_rate, chunks, on_start)
+
+        with self._lock:
+            self._queue.append(utterance)
+
+        self._wake.emit()
+        return utterance
+
+    def stop(self):
+        """Stop the playing utterance and discard every queued one."""
+        _logger.info("Stopping playback")
+
+        with self._lock:
+            self._stop_requested = True
+
+        self._wake.emit()
+
+    @Slot()
+    def _start(self):
+        """Create the feed timer on the engine thread."""
+        self._timer = QTimer(self)
+        _ = self._timer.timeout.connect(self._feed)
+
+    @Slot()
+    def _on_wake(self):
+        """Resume feeding after utterances were queued or a stop was requested."""
+        if self._timer is not None and not self._timer.isActive():
+            self._timer.start(self.FEED_INTERVAL_MS)
+
+        self._feed()
+
+    def _open(self, sample_rate: int):
+        """Open the audio output for a sample rate, closing the previous one.
+
+        Args:
+            sample_rate (int): The sample rate of the audio to play.
+
+        Returns:
+            bool: Whether the audio output was opened.
+        """
+        from PySide6.QtMultimedia import QAudioFormat, QAudioSink
+
+        self._close()
+        audio_format = QAudioFormat()
+        audio_format.setSampleRate(sample_rate)
+        audio_format.setChannelCount(1)
+        audio_format.setSampleFormat(QAudioFormat.SampleFormat.Int16)
+
+        self._buffer_ms = self.buffer_ms()
+        sink = QAudioSink(audio_format, self)
+        sink.setBufferSize(sample_rate * 2 * self._buffer_ms // 1000)
+        device = sink.start()
+
+        if device is None:
+            _logger.error("Playback failed. Failed to open audio output.")
+            sink.deleteLater()
+            return False
+
+        _logger.info(
+            "Opened audio output. Sample rate: %d, buffer: %dms, %d bytes",
+            sample_rate,
+            self._buffer_ms,
+            sink.bufferSize(),
+        )
+        self._sink = sink
+        self._device = device
+        self._sample_rate = sample_rate
+        self._written = 0
+        return True
+
+    @Slot()
+    def _close(self):
+        """Close the audio output, discarding any buffered audio."""
+        if self._sink is None:
+            return
+
+        self._sink.stop()
+        self._sink.deleteLater()
+        self._sink = None
+        self._device = None
+        self._sample_rate = 0
+
+    def _finish(self, utterance: Utterance):
+        """Mark an utterance as done and wake its waiter.
+
+        Args:
+            utterance (Utterance): The utterance.
+        """
+        if utterance in self._playing:
+            self._playing.remove(utterance)
+
+        utterance.done.set()
+
+    def _stop_all(self):
+        """Stop every written, playing and queued utterance."""
+        with self._lock:
+            self._stop_requested = False
+            stopped = [*self._playing, *self._queue]
+            self._queue.clear()
+
+        self._close()
+        self._current = None
+        self._pending = memoryview(b"")
+
+        for utterance in stopped:
+            utterance.stopped = True
+            self._finish(utterance)
+
+    def _fail_all(self, error: str):
+        """Fail the utterances written to the audio output after a playback error.
+
+        Args:
+            error (str): The name of the playback error.
+        """
+        _logger.error("Playback failed. Error: %s", error)
+
+        for utterance in list(self._playing):
+            utterance.playback_error = error
+            self._finish(utterance)
+
+        self._close()
+        self._current = None
+        self._pending = memoryview(b"")
+
+    def _finish_played(self):
+        """Finish the utterances whose last byte has been played."""
+        if self._sink is None:
+            return
+
+        from PySide6.QtMultimedia import QAudio
+
+        idle = self._sink.state() == QAudio.State.IdleState and not self._pending
+        processed = self._sink.processedUSecs() * self._sample_rate * 2 // 1_000_000
+
+        for utterance in list(self._playing):
+            if utterance.end is not None and (idle or processed >= utterance.end):
+                self._finish(utterance)
+
+    def _next(self):
+        """Start writing the next queued utterance, opening the audio output if needed.
+
+        Returns:
+            bool: Whether there is an utterance to write.
+        """
+        with self._lock:
+            utterance = self._queue[0] if self._queue else None
+
+        if utterance is None:
+            return False
+
+        if (
+            self._sink is None
+            or utterance.sample_rate != self._sample_rate
+            or self.buffer_ms() != self._buffer_ms
+        ):
+            if self._playing:
+                # Let the audio in the current format finish before switching.
+                return False
+
+            if not self._open(utterance.sample_rate):
+                with self._lock:
+                    _ = self._queue.popleft()
+
+                utterance.playback_error = "OpenError"
+                self._finish(utterance)
+                return self._next()
+
+        with self._lock:
+            _ = self._queue.popleft()
+
+        self._current = utterance
+        self._playing.append(utterance)
+        return True
+
+    @Slot()
+    def _feed(self):
+        """Write queued audio while the audio output has room for it."""
+        with self._lock:
+            stop_requested = self._stop_requested
+
+        if stop_requested:
+            self._stop_all()
+
+        self._finish_played()
+
+        while True:
+            if self._current is None and not self._next():
+                break
+
+            current = self._current
+            assert current is not None, "An utterance should be written."
+            assert self._sink is not None and self._device is not None
+
+            if not self._pending:
+                try:
+                    item = current.chunks.get_nowait()
+                except queue.Empty:
+                    break
+
+                if item is None or isinstance(item, Exception):
+                    current.error = item
+                    current.end = self._written
+                    self._current = None
+                else:
+                    self._pending = item.memoryview()
+
+                continue
+
+            free = self._sink.bytesFree()
+
+            if free <= 0:
+                break
+
+            # PySide6 does not accept memoryviews here, so only the part that fits in the
+            # output buffer is copied.
+            written = self._device.write(self._pending[:free].tobytes())
+
+            if written <= 0:
+                break
+
+            self._pending = self._pending[written:]
+            self._written += written
+
+            if not current.started:
+                current.started = True
+                _logger.info(
+                    "Playing audio. Time to first audio: %.3fs",
+                    time.perf_counter() - current.created,
+                )
+                current.on_start()
+
+        if self._sink is not None:
+            from PySide6.QtMultimedia import QAudio
+
+            if self._sink.error() not in (
+                QAudio.Error.NoError,
+                QAudio.Error.UnderrunError,
+            ):
+                self._fail_all(self._sink.error().name)
+
+        self._finish_played()
+
+        with self._lock:
+            idle = self._current is None and not self._playing and not self._queue
+
+        if idle and self._timer is not None:
+            self._timer.stop()
@@ -0,0 +1,255 @@
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Callable
+
+import torch
+from torch import Tensor, nn
+from torch.ao.nn.quantized import dynamic as nnqd
+from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic
+
+from utils import from_data_dir
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QuantizationReport:
+    """Weight size and synthesis time of a model before and after quantization."""
+
+    float_bytes: int
+    quantized_bytes: int
+    float_seconds: float
+    """Seconds a warm synthesis of the probe text took with the float model."""
+    quantized_seconds: float
+
+    @property
+    def speedup(self):
+        """How many times faster the quantized model synthesises than the float model."""
+        if not self.quantized_seconds:
+            return 0
+
+        return self.float_seconds / self.quantized_seconds
+
+    def describe(self):
+        """Summarise the report.
+
+        Returns:
+            str: The speedup and memory savings.
+        """
+        saved = 1 - self.quantized_bytes / self.float_bytes if self.float_bytes else 0
+        return (
+            f"int8 quantization {self.speedup:.2f}x faster than float, "
+            f"weights {self.float_bytes / 2**20:.1f} MB -> "
+            f"{self.quantized_bytes / 2**20:.1f} MB ({saved:.0%} smaller)"
+        )
+
+
+class DynamicQuantizer:
+    """Applies dynamic int8 quantization to the linear layers of submodules of a model.
+
+    The quantized submodules are cached in the data directory, keyed by the package and torch
+    versions, so the conversion and the float benchmark run once per machine. The cache holds
+    pickled modules written by this class, which are only loaded from the data directory.
+    """
+
+    FOLDER: str = "quantized"
+
+    def __init__(self, name: str, package: str, submodules: list[str]):
+        """Initialise the quantizer.
+
+        Args:
+            name (str): Name of the model, for the cache and logging.
+            package (str): The distribution providing the model classes.
+            submodules (list[str]): Names of the child modules whose linear layers to quantize.
+        """
+        self.name: str = name
+        self.submodules: list[str] = submodules
+
+        try:
+            version = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            version = "unknown"
+
+        identity = "\0".join([name, package, version, torch.__version__, *submodules])
+        self._key: str = hashlib.sha256(identity.encode()).hexdigest()[:16]
+
+    @classmethod
+    def is_supported(cls):
+        """Whether torch has a quantized engine for this CPU.
+
+        Returns:
+            bool: True if dynamic quantization can run.
+        """
+        return any(
+            engine != "none" for engine in torch.backends.quantized.supported_engines
+        )
+
+    @classmethod
+    def _weight_bytes(cls, value: object) -> int:
+        """Count the bytes of tensors in a state dict value, including packed weights.
+
+        Args:
+            value (object): A tensor, or a tuple or list of them.
+
+        Returns:
+            int: The bytes.
+        """
+        if isinstance(value, Tensor):
+            return value.numel() * value.element_size()
+
+        if isinstance(value, (tuple, list)):
+            return sum(cls._weight_bytes(item) for item in value)
+
+        return 0
+
+    def _size(self, model: nn.Module):
+        """Count the weight bytes of the submodules.
+
+        Args:
+            model (nn.Module): The model.
+
+        Returns:
+            int: The bytes.
+        """
+        return sum(
+            self._weight_bytes(value)
+            for name in self.submodules
+            for value in getattr(model, name).state_dict().values()
+        )
+
+    @classmethod
+    def _time(cls, probe: Callable[[], object]):
+        """Time a warm run of a probe synthesis.
+
+        Args:
+            probe (Callable[[], object]): Synthesises the probe text.
+
+        Returns:
+            float: Seconds the second run took.
+        """
+        _ = probe()
+        start = time.perf_counter()
+        _ = probe()
+        return time.perf_counter() - start
+
+    def _files(self):
+        """Return the cache files of the quantized submodules and their report.
+
+        Returns:
+            tuple[Path, Path]: The module file and the report file.
+
+        Raises:
+            OSError: If creating the cache folder fails.
+        """
+        folder = from_data_dir(self.FOLDER)
+        folder.mkdir(exist_ok=True)
+        stem = f"{self.name}-{self._key}"
+        return folder / f"{stem}.pt", folder / f"{stem}.json"
+
+    def _load(self, model: nn.Module, modules_file: Path, report_file: Path):
+        """Replace the submodules with cached quantized ones.
+
+        Args:
+            model (nn.Module): The model.
+            modules_file (Path): The cached modules.
+            report_file (Path): The cached report.
+
+        Returns:
+            QuantizationReport | None: The report, or None if nothing usable was cached.
+        """
+        if not modules_file.is_file() or not report_file.is_file():
+            return None
+
+        try:
+            report = QuantizationReport(**json.loads(report_file.read_text("utf-8")))
+            modules = torch.load(modules_file, map_location="cpu", weights_only=False)
+            assert set(modules) == set(self.submodules), "Cache should match modules."
+        except Exception:
+            _logger.error("Loading quantized model failed. Converting.", exc_info=True)
+            return None
+
+        for name, module in modules.items():
+            setattr(model, name, module.eval())
+
+        _logger.info("Loaded quantized model. Model: %s", self.name)
+        return report
+
+    def _save(
+        self,
+        model: nn.Module,
+        report: QuantizationReport,
+        modules_file: Path,
+        report_file: Path,
+    ):
+        """Cache the quantized submodules and their report.
+
+        Args:
+            model (nn.Module): The quantized model.
+            report (QuantizationReport): The report.
+            modules_file (Path): The file to cache the modules in.
+            report_file (Path): The file to cache the report in.
+        """
+        temp = modules_file.with_name(f"{modules_file.name}.tmp")
+
+        try:
+            torch.save({name: getattr(model, name) for name in self.submodules}, temp)
+            _ = temp.replace(modules_file)
+            _ = report_file.write_text(json.dumps(asdict(report)), "utf-8")
+        except Exception:
+            _logger.error("Saving quantized model failed", exc_info=True)
+            temp.unlink(missing_ok=True)
+
+    def apply(self, model: nn.Module, probe: Callable[[], object]):
+        """Quantize the submodules of a model in place, from the cache if possible.
+
+        Args:
+            model (nn.Module): The float model.
+            probe (Callable[[], object]): Synthesises a short text with the model, to compare
+                the speed of the float and quantized models.
+
+        Returns:
+            QuantizationReport | None: The report, or None if quantization is unavailable.
+        """
+        if not self.is_supported():
+            _logger.error("Quantization is not supported on this CPU. Using float.")
+            return None
+
+        try:
+            modules_file, report_file = self._files()
+        except OSError as e:
+            _logger.error(
+                "Creating quantized model directory failed. Error: %s",
+                e.strerror,
+                exc_info=e,
+            )
+            modules_file = report_file = None
+
+        if modules_file is not None and report_file is not None:
+            report = self._load(model, modules_file, report_file)
+
+            if report is not None:
+                return report
+
+        _logger.info("Quantizing model. Model: %s", self.name)
+        float_bytes = self._size(model)
+        float_seconds = self._time(probe)
+        _ = quantize_dynamic(
+            model,
+            {name: default_dynamic_qconfig for name in self.submodules},
+            mapping={nn.Linear: nnqd.Linear},
+            inplace=True,
+        )
+        report = QuantizationReport(
+            float_bytes, self._size(model), float_seconds, self._time(probe)
+        )
+        _logger.info("Quantized model. Model: %s, %s", self.name, report.describe())
+
+        if modules_file is not None and report_file is not None:
+            self._save(model, report, modules_file, report_file)
+
+        return report
@@ -0,0 +1,237 @@
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+_logger = logging.getLogger(__name__)
+
+
+def _write_durably(file: Path, data: bytes):
+    """Write a file so that after a crash it either holds the data completely or does not exist.
+
+    Args:
+        file (Path): The file to write.
+        data (bytes): The content of the file.
+
+    Raises:
+        OSError: If writing fails.
+    """
+    temp = file.with_name(f"{file.name}.tmp")
+
+    with temp.open("wb") as f:
+        _ = f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    _ = temp.replace(file)
+
+
+@dataclass
+class RenderJob:
+    """A document rendered segment by segment, with each rendered segment checkpointed to disk.
+
+    The manifest is written once when the job is created. Progress is recorded only by the
+    segment files, which appear atomically once a segment has been rendered completely.
+    """
+
+    key: str
+    """The synthesis cache key of the whole document."""
+    identity: str
+    """Hash of the service, voice and settings the job renders with."""
+    mode: str
+    input: str
+    segments: list[str]
+    target: str | None = None
+    """The file to save to, or None for a timestamped file in the saved folder."""
+    created: float = field(default_factory=time.time)
+    folder: Path = field(default=Path(), compare=False)
+
+    MANIFEST = "job.json"
+
+    def _segment_file(self, index: int):
+        return self.folder / f"{index}.bin"
+
+    def is_rendered(self, index: int):
+        """Whether a segment has been rendered and checkpointed.
+
+        Args:
+            index (int): The index of the segment.
+
+        Returns:
+            bool: True if the audio of the segment is on disk.
+        """
+        return self._segment_file(index).is_file()
+
+    @property
+    def rendered(self):
+        """The number of segments rendered so far."""
+        return sum(self.is_rendered(index) for index in range(len(self.segments)))
+
+    def checkpoint(self, index: int, data: bytes):
+        """Store the rendered audio of a segment durably.
+
+        Args:
+            index (int): The index of the segment.
+            data (bytes): The serialised audio of the segment.
+
+        Raises:
+            OSError: If writing the checkpoint fails.
+        """
+        _write_durably(self._segment_file(index), data)
+
+    def load(self, index: int):
+        """Read the checkpointed audio of a segment.
+
+        Args:
+            index (int): The index of the segment.
+
+        Returns:
+            bytes: The serialised audio of the segment.
+
+        Raises:
+            OSError: If reading the checkpoint fails.
+        """
+        return self._segment_file(index).read_bytes()
+
+
+class RenderJobStore:
+    """Folder of render jobs in the data directory, one subfolder per document."""
+
+    FOLDER: str = "render_jobs"
+
+    def __init__(self, folder: Path):
+        """Initialise the store.
+
+        Args:
+            folder (Path): The folder holding the jobs. Must exist.
+        """
+        self._folder: Path = folder
+
+    def open(
+        self,
+        key: str,
+        identity: str,
+        mode: str,
+        input_str: str,
+        segments: list[str],
+        target: Path | None,
+    ):
+        """Return the stored job for a document, or create it.
+
+        A stored job is only resumed if it was split into the same segments.
+
+        Args:
+            key (str): The synthesis cache key of the whole document.
+            identity (str): Hash of the service, voice and settings rendering the job.
+            mode (str): The input mode of the document.
+            input_str (str): The document.
+            segments (list[str]): The segments of the document, in order.
+            target (Path | None): The file to save to, or None for a timestamped file.
+
+        Returns:
+            RenderJob: The job.
+
+        Raises:
+            OSError: If creating the job fails.
+        """
+        folder = self._folder / key
+        job = self._read(folder)
+
+        if job is not None and job.segments == segments:
+            _logger.info(
+                "Resuming render job. Job: %s, rendered: %d/%d",
+                key,
+                job.rendered,
+                len(segments),
+            )
+            return job
+
+        if job is not None:
+            self.remove(job)
+
+        job = RenderJob(
+            key,
+            identity,
+            mode,
+            input_str,
+            segments,
+            str(target) if target is not None else None,
+            folder=folder,
+        )
+        folder.mkdir()
+        manifest = asdict(job)
+        del manifest["folder"]
+        _write_durably(
+            folder / RenderJob.MANIFEST, json.dumps(manifest).encode("utf-8")
+        )
+        _logger.info("Created render job. Job: %s, segments: %d", key, len(segments))
+        return job
+
+    def _read(self, folder: Path):
+        """Read the manifest of a job folder.
+
+        Args:
+            folder (Path): The job folder.
+
+        Returns:
+            RenderJob | None: The job, or None if the folder holds no readable job.
+        """
+        manifest = folder / RenderJob.MANIFEST
+
+        if not manifest.is_file():
+            if folder.is_dir():
+                # A job whose manifest never reached the disk has no usable checkpoints.
+                shutil.rmtree(folder, ignore_errors=True)
+
+            return None
+
+        try:
+            return RenderJob(
+                **json.loads(manifest.read_text(encoding="utf-8")), folder=folder
+            )
+        except (OSError, ValueError, TypeError):
+            _logger.error(
+                "Reading render job failed. Job: %s", folder.name, exc_info=True
+            )
+            shutil.rmtree(folder, ignore_errors=True)
+            return None
+
+    def unfinished(self):
+        """Return the stored jobs, oldest first.
+
+        Returns:
+            list[RenderJob]: The jobs that have not been assembled yet.
+        """
+        try:
+            folders = [folder for folder in self._folder.iterdir() if folder.is_dir()]
+        except OSError as e:
+            _logger.error(
+                "Listing render jobs failed. Error: %s", e.strerror, exc_info=e
+            )
+            return []
+
+        jobs = [job for folder in folders if (job := self._read(folder)) is not None]
+        return sorted(jobs, key=lambda job: job.created)
+
+    def remove(self, job: RenderJob):
+        """Delete a job and its checkpoints.
+
+        Args:
+            job (RenderJob): The job.
+        """
+        self.discard(job.key)
+
+    def discard(self, key: str):
+        """Delete the job of a document and its checkpoints, if there is one.
+
+        Args:
+            key (str): The synthesis cache key of the document.
+        """
+        folder = self._folder / key
+
+        if folder.is_dir():
+            shutil.rmtree(folder, ignore_errors=True)
+            _logger.info("Removed render job. Job: %s", key)
@@ -0,0 +1,318 @@
+import logging
+import re
+import threading
+import zlib
+from typing import Iterator
+
+from settings import settings
+
+_logger = logging.getLogger(__name__)
+
+
+class Segmenter:
+    """Sentence segmentation shared by every service.
+
+    Sentences are found by rules in a single pass over the text, so segmentation stays linear on
+    very long inputs. The rules skip abbreviations, initials and decimal numbers, and split after
+    CJK full stops, which are not followed by whitespace. When enabled in the settings, a spaCy
+    model is used instead for the languages it is listed for. Models are loaded on first use.
+    Sentences are grouped into segments no longer than a maximum length, and sentences longer
+    than that are split at clauses, then at words.
+    """
+
+    USE_NLP_KEY: str = "segmentation/use_nlp"
+    SPACY_MODELS: dict[str, str] = {"en": "en_core_web_sm"}
+    ABBREVIATIONS: frozenset[str] = frozenset(
+        (
+            "mr mrs ms dr prof sr jr st mt ft rev col lt sgt capt gov sen vs eg e.g ie "
+            "i.e cf al approx dept inc ltd corp pp tue thu fri u.s u.k a.m p.m"
+        ).split()
+    )
+    """Lowercase words that do not end a sentence when followed by a full stop."""
+    NUMBER_ABBREVIATIONS: frozenset[str] = frozenset(
+        (
+            "no nos p vol vols ch sec fig est jan feb mar apr jun jul aug sep sept oct "
+            "nov dec"
+        ).split()
+    )
+    """Lowercase abbreviations that are also words, so they only continue a sentence when
+    followed by a full stop and a number, as in "No. 5"."""
+    NLP_BLOCK_LENGTH: int = 100_000
+    """Maximum characters passed to spaCy at once, to bound its memory use."""
+    ANCHOR_LENGTH: int = 200
+    """Characters of the maximum segment length per anchor sentence in stable segmentation."""
+
+    _BOUNDARY: re.Pattern[str] = re.compile(
+        r"[.!?…]+[\"'”’)\]]*(?=\s)|[。！？]+[」』）”’]*|\n\s*\n"
+    )
+    _WORD_BEFORE: re.Pattern[str] = re.compile(r"[\w.]{1,12}$")
+    _CLAUSE: re.Pattern[str] = re.compile(r"[,;:、，；：]\s*|\s+")
+    _nlp_lock: threading.Lock = threading.Lock()
+    _nlp: dict[str, object | None] = {}
+
+    def __init__(self, language: str | None = None, use_nlp: bool = False):
+        """Initialise the segmenter.
+
+        Args:
+            language (str | None): ISO 639-1 code of the text language, if known.
+            use_nlp (bool): Whether to use the spaCy model of the language, if it has one.
+        """
+        self.language: str | None = language
+        self.use_nlp: bool = use_nlp
+
+    @classmethod
+    def from_settings(cls, language: str | None = None):
+        """Create a segmenter for a language with the saved settings.
+
+        Args:
+            language (str | None): ISO 639-1 code of the text language, if known.
+
+        Returns:
+            Segmenter: The segmenter.
+        """
+        return cls(language, settings.value(cls.USE_NLP_KEY, False, bool))
+
+    @classmethod
+    def _load_nlp(cls, language: str):
+        """Load the spaCy sentence segmenter of a language once.
+
+        Args:
+            language (str): ISO 639-1 code of the language.
+
+        Returns:
+            object | None: The spaCy pipeline, or None if the language has no usable model.
+        """
+        with cls._nlp_lock:
+            if language in cls._nlp:
+                return cls._nlp[language]
+
+            model = cls.SPACY_MODELS.get(language)
+            nlp = None
+
+            if model is not None:
+                _logger.info("Loading sentence model. Model: %s", model)
+
+                try:
+                    import spacy
+
+                    # Only the statistical sentence segmenter is needed, not the parser.
+                    nlp = spacy.load(
+                        model,
+                        exclude=["parser", "ner", "lemmatizer", "attribute_ruler", "tagger"],
+                    )
+                    nlp.enable_pipe("senter")
+                    nlp.max_length = cls.NLP_BLOCK_LENGTH + 1
+                except (ImportError, OSError, ValueError):
+                    _logger.error(
+                        "Loading sentence model failed. Using rules. Model: %s",
+                        model,
+                        exc_info=True,
+                    )
+                    nlp = None
+
+            cls._nlp[language] = nlp
+            return nlp
+
+    def _rule_spans(self, text: str) -> Iterator[tuple[int, int]]:
+        """Find sentences with punctuation rules.
+
+        Args:
+            text (str): The text.
+
+        Yields:
+            tuple[int, int]: The start and end of the next sentence in the text.
+        """
+        start = 0
+
+        for match in self._BOUNDARY.finditer(text):
+            end = match.end()
+
+            if match.group().rstrip("\"')]”’") == ".":
+                word = self._WORD_BEFORE.search(
+                    text, max(0, match.start() - 12), match.start()
+                )
+                following = text[end : end + 2].lstrip()[:1]
+                abbreviation = word.group().lower().rstrip(".") if word else ""
+
+                if word is not None and (
+                    abbreviation in self.ABBREVIATIONS
+                    or (
+                        abbreviation in self.NUMBER_ABBREVIATIONS
+                        and following.isdigit()
+                    )
+                    or (word.group().isupper() and len(word.group()) == 1)
+                    and word.group() not in ("A", "I")
+                ):
+                    continue
+
+                # A full stop followed by a lowercase word rarely ends a sentence.
+                if following.islower():
+                    continue
+
+            yield start, end
+            start = end
+
+        if start < len(text):
+            yield start, len(text)
+
+    def _nlp_spans(self, nlp: object, text: str) -> Iterator[tuple[int, int]]:
+        """Find sentences with a spaCy pipeline, in blocks of paragraphs.
+
+        Args:
+            nlp (object): The spaCy pipeline.
+            text (str): The text.
+
+        Yields:
+            tuple[int, int]: The start and end of the next sentence in the text.
+        """
+        blocks: list[tuple[int, str]] = []
+        start = 0
+
+        while start < len(text):
+            end = min(start + self.NLP_BLOCK_LENGTH, len(text))
+
+            if end < len(text):
+                # Prefer a paragraph break, then any whitespace, so no sentence is cut.
+                cut = text.rfind("\n\n", start, end)
+                cut = cut if cut > start else text.rfind(" ", start, end)
+                end = cut + 1 if cut > start else end
+
+            blocks.append((start, text[start:end]))
+            start = end
+
+        docs = getattr(nlp, "pipe")(block for _, block in blocks)
+
+        for (offset, _), doc in zip(blocks, docs):
+            for sentence in doc.sents:
+                yield offset + sentence.start_char, offset + sentence.end_char
+
+    def sentences(self, text: str) -> Iterator[str]:
+        """Split text into sentences.
+
+        Args:
+            text (str): The text.
+
+        Yields:
+            str: The next sentence, without surrounding whitespace.
+        """
+        for start, end in self._spans(text):
+            sentence = text[start:end].strip()
+
+            if sentence:
+                yield sentence
+
+    def _spans(self, text: str) -> Iterator[tuple[int, int]]:
+        """Find sentences with the spaCy model of the language if enabled, otherwise with rules.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            Iterator[tuple[int, int]]: The start and end of each sentence in the text.
+        """
+        nlp = (
+            self._load_nlp(self.language)
+            if self.use_nlp and self.language is not None
+            else None
+        )
+        return self._nlp_spans(nlp, text) if nlp is not None else self._rule_spans(text)
+
+    def _split_long(self, text: str, max_length: int) -> Iterator[str]:
+        """Split a sentence longer than the maximum length at clauses, then at words.
+
+        Args:
+            text (str): The sentence.
+            max_length (int): The maximum length of a part.
+
+        Yields:
+            str: The next part.
+        """
+        start = 0
+
+        while len(text) - start > max_length:
+            clause: int | None = None
+            space: int | None = None
+
+            for match in self._CLAUSE.finditer(text, start + 1, start + max_length):
+                if match.group().isspace():
+                    space = match.start()
+                else:
+                    clause = match.end()
+
+            # Prefer the last clause break unless it leaves a short part, then the last word.
+            if clause is not None and clause - start >= max_length // 2:
+                end = clause
+            else:
+                end = space or clause or start + max_length
+
+            part = text[start:end].strip()
+
+            if part:
+                yield part
+
+            start = end
+
+        if text[start:].strip():
+            yield text[start:].strip()
+
+    def _is_anchor(self, sentence: str, modulus: int):
+        """Whether a segment ends after a sentence in stable segmentation.
+
+        Args:
+            sentence (str): The sentence.
+            modulus (int): One in this many sentences is an anchor on average.
+
+        Returns:
+            bool: True if the sentence ends its segment.
+        """
+        normalised = " ".join(sentence.split()).encode("utf-8")
+        return zlib.crc32(normalised) % modulus == 0
+
+    def segments(
+        self, text: str, max_length: int, stable: bool = False
+    ) -> Iterator[str]:
+        """Group the sentences of a text into segments no longer than a maximum length.
+
+        In stable segmentation, segments also end after anchor sentences, chosen by a hash of
+        their content. Editing a sentence then only changes the segments up to the next anchor,
+        instead of shifting every later segment.
+
+        Args:
+            text (str): The text.
+            max_length (int): The maximum length of a segment in characters.
+            stable (bool): Whether to end segments after anchor sentences.
+
+        Yields:
+            str: The next segment, keeping the original spacing between its sentences.
+        """
+        modulus = max(1, max_length // self.ANCHOR_LENGTH)
+        segment_start: int | None = None
+        segment_end = 0
+
+        for start, end in self._spans(text):
+            sentence = text[start:end]
+
+            if not sentence.strip():
+                continue
+
+            start += len(sentence) - len(sentence.lstrip())
+
+            if segment_start is not None and end - segment_start > max_length:
+                yield text[segment_start:segment_end].strip()
+                segment_start = None
+
+            if end - start > max_length:
+                yield from self._split_long(text[start:end], max_length)
+                continue
+
+            if segment_start is None:
+                segment_start = start
+
+            segment_end = end
+
+            if stable and self._is_anchor(text[start:end], modulus):
+                yield text[segment_start:segment_end].strip()
+                segment_start = None
+
+        if segment_start is not None:
+            yield text[segment_start:segment_end].strip()
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
 import logging
-from typing import Callable, TypeVar
-from services.tts_service import TtsService
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar, override
+from services.cancellation import CancellationToken
+from services.tts_service import InputMode, TtsService
 
 T = TypeVar("T")
 
@@ -10,34 +12,89 @@ _logger = logging.getLogger(__name__)
 
 class SsmlService(TtsService[T], ABC):
     @abstractmethod
-    def _synthesise_ssml_implementation(self, ssml: str) -> T:
+    def _stream_ssml_implementation(
+        self, ssml: str, cancel: CancellationToken
+    ) -> Iterator[T]:
+        """Synthesises SSML to audio data chunk by chunk.
+
+        Args:
+            ssml (str): The SSML to be converted to speech.
+            cancel (CancellationToken): Checked before each chunk is synthesised.
+
+        Yields:
+            T: The next chunk of audio data, in playback order.
+
+        Raises:
+            SynthesisCancelledException: If synthesis was cancelled.
+            SynthesisException: If there is an error during synthesis.
+        """
+        pass
+
+    def _synthesise_ssml_implementation(
+        self, ssml: str, cancel: CancellationToken
+    ) -> T:
         """Synthesises SSML to audio data.
 
         Args:
             text (str): The SSML to be converted to speech.
+            cancel (CancellationToken): Checked before each chunk is synthesised.
 
         Returns:
             data: The audio data synthesised from the SSML.
 
         Raises:
+            SynthesisCancelledException: If synthesis was cancelled.
             SynthesisException: If there is an error during synthesis.
         """
-        pass
+        return self._collect_stream(self._stream_ssml_implementation(ssml, cancel))
+
+    @override
+    def _synthesiser(self, mode: InputMode):
+        if mode == InputMode.SSML:
+            return self._synthesise_ssml_implementation
 
-    def save_ssml_to_file(self, ssml: str, show_status: Callable[[str], None]):
+        return super()._synthesiser(mode)
+
+    def save_ssml_to_file(
+        self,
+        ssml: str,
+        show_status: Callable[[str], None],
+        file: Path | None = None,
+        cancel: CancellationToken | None = None,
+    ):
         """Saves the SSML to a file.
 
         Args:
             ssml (str): The SSML to be converted to speech.
             show_status (Callable[[str], None]): A callback function to show status updates.
+            file (Path | None): The file to save to. Defaults to a timestamped file in the saved folder.
+            cancel (CancellationToken | None): Stops synthesis at the next chunk once cancelled.
+
+        Returns:
+            Path | None: The saved file, or None if synthesis or saving failed.
         """
-        self._synth_and_save(ssml, self._synthesise_ssml_implementation, show_status)
+        return self._synth_and_save(
+            ssml,
+            self._synthesise_ssml_implementation,
+            InputMode.SSML,
+            show_status,
+            file,
+            cancel,
+        )
 
-    def play_ssml(self, ssml: str, show_status: Callable[[str], None]):
+    def play_ssml(
+        self,
+        ssml: str,
+        show_status: Callable[[str], None],
+        cancel: CancellationToken | None = None,
+    ):
         """Plays the SSML as audio.
 
         Args:
             ssml (str): The SSML to be converted to speech.
             show_status (Callable[[str], None]): A callback function to show status updates.
+            cancel (CancellationToken | None): Stops playback and synthesis once cancelled.
         """
-        self._synth_and_play(ssml, self._synthesise_ssml_implementation, show_status)
+        self._synth_and_play(
+            ssml, self._stream_ssml_implementation, InputMode.SSML, show_status, cancel
+        )
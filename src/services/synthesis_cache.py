@@ -0,0 +1,189 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+_logger = logging.getLogger(__name__)
+
+
+class SynthesisCache:
+    """Two tier, size bounded LRU cache of synthesised audio.
+
+    Entries are kept in memory and in a folder on disk. Each tier evicts its least recently used
+    entries once its byte limit is exceeded. Disk entries are touched on access so the LRU order
+    survives restarts.
+    """
+
+    SUFFIX: str = ".bin"
+
+    def __init__(self, folder: Path | None, memory_limit: int, disk_limit: int):
+        """Initialise the cache, indexing entries already on disk.
+
+        Args:
+            folder (Path | None): Folder for the disk tier. The disk tier is disabled if None.
+            memory_limit (int): Maximum bytes held in memory.
+            disk_limit (int): Maximum bytes held on disk.
+        """
+        self._lock: threading.Lock = threading.Lock()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_size: int = 0
+        self._memory_limit: int = memory_limit
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_size: int = 0
+        self._disk_limit: int = disk_limit
+        self._folder: Path | None = folder
+        self.hits: int = 0
+        self.misses: int = 0
+
+        if self._folder is None:
+            return
+
+        try:
+            entries = sorted(
+                (entry.stat().st_mtime, entry.stem, entry.stat().st_size)
+                for entry in self._folder.glob(f"*{self.SUFFIX}")
+            )
+        except OSError as e:
+            _logger.error(
+                "Indexing synthesis cache failed. Disabling disk cache. Error: %s",
+                e.strerror,
+                exc_info=e,
+            )
+            self._folder = None
+            return
+
+        for _, key, size in entries:
+            self._disk[key] = size
+            self._disk_size += size
+
+        self._evict_disk()
+        _logger.info(
+            "Synthesis cache indexed. Entries: %d, bytes: %d",
+            len(self._disk),
+            self._disk_size,
+        )
+
+    def _path(self, key: str):
+        assert self._folder is not None
+        return self._folder / f"{key}{self.SUFFIX}"
+
+    def _evict_memory(self):
+        while self._memory_size > self._memory_limit and self._memory:
+            _, data = self._memory.popitem(last=False)
+            self._memory_size -= len(data)
+
+    def _evict_disk(self):
+        while self._disk_size > self._disk_limit and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+
+            try:
+                self._path(key).unlink(missing_ok=True)
+            except OSError as e:
+                _logger.error(
+                    "Evicting synthesis cache entry failed. Error: %s",
+                    e.strerror,
+                    exc_info=e,
+                )
+
+    def _remember(self, key: str, data: bytes):
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+
+        if len(data) > self._memory_limit:
+            return
+
+        self._memory[key] = data
+        self._memory_size += len(data)
+        self._evict_memory()
+
+    def get(self, key: str) -> bytes | None:
+        """Look up an entry, promoting it to most recently used in both tiers.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            bytes | None: The cached data, or None on a miss.
+        """
+        with self._lock:
+            data = self._memory.get(key)
+
+            if data is not None:
+                self._memory.move_to_end(key)
+            elif self._folder is not None and key in self._disk:
+                path = self._path(key)
+
+                try:
+                    data = path.read_bytes()
+                    os.utime(path)
+                except OSError as e:
+                    _logger.error(
+                        "Reading synthesis cache entry failed. Error: %s",
+                        e.strerror,
+                        exc_info=e,
+                    )
+                    self._disk_size -= self._disk.pop(key)
+                else:
+                    self._disk.move_to_end(key)
+                    self._remember(key, data)
+
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+            _logger.info(
+                "Synthesis cache %s. Hits: %d, misses: %d",
+                "miss" if data is None else "hit",
+                self.hits,
+                self.misses,
+            )
+            return data
+
+    def put(self, key: str, data: bytes):
+        """Store an entry in both tiers, evicting least recently used entries as needed.
+
+        Args:
+            key (str): The key of the entry.
+            data (bytes): The data to store.
+        """
+        with self._lock:
+            self._remember(key, data)
+
+            if self._folder is None or len(data) > self._disk_limit:
+                return
+
+            path = self._path(key)
+            temp = path.with_suffix(".tmp")
+
+            try:
+                _ = temp.write_bytes(data)
+                _ = temp.replace(path)
+            except OSError as e:
+                _logger.error(
+                    "Writing synthesis cache entry failed. Error: %s",
+                    e.strerror,
+                    exc_info=e,
+                )
+                return
+
+            if key in self._disk:
+                self._disk_size -= self._disk.pop(key)
+
+            self._disk[key] = len(data)
+            self._disk_size += len(data)
+            self._evict_disk()
+
+    def stats(self) -> dict[str, int]:
+        """Returns hit and miss counts and the size of each tier."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size,
+            }
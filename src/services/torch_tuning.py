@@ -0,0 +1,282 @@
+import contextlib
+import logging
+import os
+from typing import Callable, Iterator, TypeVar
+
+import torch
+from torch import nn
+
+from services.compilation import Bucketing, GraphCompiler
+from services.quantization import DynamicQuantizer, QuantizationReport
+from services.tts_service import Services, Setting, TtsService
+from utils import parse_threads
+
+T = TypeVar("T")
+_logger = logging.getLogger(__name__)
+
+
+class TorchTuning:
+    """CPU inference settings shared by the torch engines.
+
+    Mixed into a service, it exposes the settings as properties that the engine registry
+    re-applies in place, and applies them around every model call of the engine:
+
+    * Intra-op threads: threads one operation runs on. Auto uses every core but one, so
+      synthesis does not starve the interface.
+    * Inter-op threads: threads independent operations run on. Can only be set before torch
+      first runs operations in parallel, so changes take effect after a restart.
+    * Core affinity: the cores the synthesis thread and the threads it starts run on, such as
+      0-3,6. Supported on Linux only.
+    * Inference mode: disables autograd tracking during synthesis.
+    * bfloat16 autocast: runs eligible operations in bfloat16 on CPUs that support it.
+      Ignored when the model is quantized.
+
+    Quantization and graph compilation are applied once when the engine is created, so
+    changing them loads the engine again. Compilation is skipped when the model is quantized.
+    """
+
+    TRUE_VALUES: tuple[str, ...] = ("true", "1", "yes", "on")
+    quantization_report: QuantizationReport | None = None
+    """The speedup and memory savings of quantization, or None if the model is float."""
+    _bf16_supported: bool | None = None
+
+    @classmethod
+    def tuning_fields(cls, service: Services) -> list[Setting]:
+        """Returns the setting fields of the tuning settings of a service.
+
+        Args:
+            service (Services): The service the settings belong to.
+
+        Returns:
+            list[Setting]: The setting fields, in constructor argument order.
+        """
+        return [
+            Setting(
+                "intra_op_threads", f"{service.value}/intra_op_threads", "auto", False
+            ),
+            Setting(
+                "inter_op_threads", f"{service.value}/inter_op_threads", "auto", False
+            ),
+            Setting("cpu_affinity", f"{service.value}/cpu_affinity", "", False),
+            Setting("inference_mode", f"{service.value}/inference_mode", "true", False),
+            Setting("bf16_autocast", f"{service.value}/bf16_autocast", "false"),
+            Setting("quantize", f"{service.value}/quantize", "false"),
+            Setting(
+                "compile_graphs", f"{service.value}/compile_graphs", "false", False
+            ),
+        ]
+
+    @classmethod
+    def _parse_cores(cls, value: str):
+        """Parse a core affinity setting such as 0-3,6.
+
+        Args:
+            value (str): The value of the setting.
+
+        Returns:
+            set[int] | None: The cores, or None for every core.
+        """
+        cores: set[int] = set()
+
+        try:
+            for part in filter(None, (part.strip() for part in value.split(","))):
+                first, _, last = part.partition("-")
+                cores.update(range(int(first), int(last or first) + 1))
+        except ValueError:
+            _logger.error("Invalid core affinity %r. Using every core.", value)
+            return None
+
+        if cores and not hasattr(os, "sched_setaffinity"):
+            _logger.error("Core affinity is not supported on this platform")
+            return None
+
+        if not cores <= set(range(os.cpu_count() or 1)):
+            _logger.error("Invalid core affinity %r. Using every core.", value)
+            return None
+
+        return cores or None
+
+    @classmethod
+    def _is_bf16_supported(cls):
+        """Check once whether the CPU runs bfloat16 operations natively.
+
+        Returns:
+            bool: True if bfloat16 autocast can speed up inference.
+        """
+        if TorchTuning._bf16_supported is None:
+            try:
+                TorchTuning._bf16_supported = bool(
+                    torch.backends.mkldnn.is_available()
+                    and torch.ops.mkldnn._is_mkldnn_bf16_supported()
+                )
+            except (AttributeError, RuntimeError):
+                TorchTuning._bf16_supported = False
+
+        return TorchTuning._bf16_supported
+
+    @property
+    def intra_op_threads(self) -> str:
+        """Threads one operation runs on, or auto for every core but one."""
+        return self._intra_op_threads
+
+    @intra_op_threads.setter
+    def intra_op_threads(self, value: str):
+        self._intra_op_threads: str = value
+        self._threads: int | None = parse_threads(value, "intra-op threads")
+
+    @property
+    def inter_op_threads(self) -> str:
+        """Threads independent operations run on, or auto for the torch default."""
+        return self._inter_op_threads
+
+    @inter_op_threads.setter
+    def inter_op_threads(self, value: str):
+        self._inter_op_threads: str = value
+        threads = parse_threads(value, "inter-op threads")
+
+        if threads is None or threads == torch.get_num_interop_threads():
+            return
+
+        try:
+            torch.set_num_interop_threads(threads)
+            _logger.info("Setting inter-op threads. Threads: %d", threads)
+        except RuntimeError:
+            _logger.warning(
+                "Inter-op threads can only be set before torch starts. "
+                "Restart to apply."
+            )
+
+    @property
+    def cpu_affinity(self) -> str:
+        """The cores synthesis runs on, or empty for every core."""
+        return self._cpu_affinity
+
+    @cpu_affinity.setter
+    def cpu_affinity(self, value: str):
+        self._cpu_affinity: str = value
+        self._cores: set[int] | None = self._parse_cores(value)
+
+    @property
+    def inference_mode(self) -> str:
+        """Whether autograd tracking is disabled during synthesis."""
+        return self._inference_mode
+
+    @inference_mode.setter
+    def inference_mode(self, value: str):
+        self._inference_mode: str = value
+        self._use_inference_mode: bool = value.strip().lower() in self.TRUE_VALUES
+
+    @property
+    def bf16_autocast(self) -> str:
+        """Whether eligible operations run in bfloat16."""
+        return self._bf16_autocast
+
+    @bf16_autocast.setter
+    def bf16_autocast(self, value: str):
+        self._bf16_autocast: str = value
+        self._use_bf16: bool = value.strip().lower() in self.TRUE_VALUES
+
+        if self._use_bf16 and not self._is_bf16_supported():
+            _logger.warning("CPU does not support bfloat16. Using float32.")
+            self._use_bf16 = False
+
+    @contextlib.contextmanager
+    def _tuned(self):
+        """Apply the tuning settings to the model calls in the block.
+
+        The block must not yield from a generator, since inference mode and affinity apply to
+        the current thread.
+        """
+        threads = (
+            self._threads
+            or TtsService.auto_threads
+            or max(1, (os.cpu_count() or 1) - 1)
+        )
+
+        if torch.get_num_threads() != threads:
+            _logger.info("Setting intra-op threads. Threads: %d", threads)
+            torch.set_num_threads(threads)
+
+        previous_cores = None
+
+        if self._cores is not None:
+            previous_cores = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, self._cores)
+
+        try:
+            with contextlib.ExitStack() as stack:
+                if self._use_inference_mode:
+                    _ = stack.enter_context(torch.inference_mode())
+
+                if self._use_bf16 and self.quantization_report is None:
+                    _ = stack.enter_context(
+                        torch.autocast("cpu", dtype=torch.bfloat16)
+                    )
+
+                yield
+        finally:
+            if previous_cores is not None:
+                os.sched_setaffinity(0, previous_cores)
+
+    def _quantize(
+        self,
+        value: str,
+        quantizer: DynamicQuantizer,
+        model: nn.Module,
+        probe: Callable[[], object],
+    ):
+        """Quantize a model if enabled by the quantize setting.
+
+        Args:
+            value (str): The value of the quantize setting.
+            quantizer (DynamicQuantizer): The quantizer of the model.
+            model (nn.Module): The model, quantized in place.
+            probe (Callable[[], object]): Synthesises a short text with the model.
+        """
+        if value.strip().lower() in self.TRUE_VALUES:
+            self.quantization_report = quantizer.apply(model, probe)
+
+    def _compile(
+        self,
+        value: str,
+        compiler: GraphCompiler,
+        model: nn.Module,
+        dynamic: list[str],
+        bucketed: dict[str, Bucketing],
+    ):
+        """Compile submodules of a model if enabled by the compile graphs setting.
+
+        Args:
+            value (str): The value of the compile graphs setting.
+            compiler (GraphCompiler): The compiler of the model.
+            model (nn.Module): The model, compiled in place.
+            dynamic (list[str]): Paths of the submodules to compile with dynamic shapes.
+            bucketed (dict[str, Bucketing]): How to pad the inputs of the submodules to compile
+                for bucket lengths, by submodule path.
+        """
+        if value.strip().lower() not in self.TRUE_VALUES:
+            return
+
+        if self.quantization_report is not None:
+            _logger.warning("Quantized models are not compiled. Running uncompiled.")
+            return
+
+        _ = compiler.apply(model, dynamic, bucketed)
+
+    def _tuned_iter(self, items: Iterator[T]) -> Iterator[T]:
+        """Advance an iterator of lazily synthesised chunks with the tuning settings applied.
+
+        Args:
+            items (Iterator[T]): The iterator, which runs the model when advanced.
+
+        Yields:
+            T: The next item.
+        """
+        while True:
+            with self._tuned():
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+
+            yield item
@@ -1,21 +1,30 @@
+import hashlib
 import importlib
 import logging
+import queue
+import threading
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Callable, Generic, TypeVar
+from typing import Callable, Generic, Iterator, TypeVar
 
-from PySide6.QtCore import (
-    QBuffer,
-    QByteArray,
-    QEventLoop,
-    QIODevice,
-)
-from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
+import numpy
 
-from exceptions import SynthesisException
+from exceptions import (
+    EncodingException,
+    SynthesisCancelledException,
+    SynthesisException,
+)
+from services.audio_encoder import AudioEncoder
+from services.cancellation import CancellationToken
+from services.engine_registry import EngineRegistry
+from services.pcm_buffer import PcmBuffer
+from services.render_jobs import RenderJob, RenderJobStore
+from services.segmentation import Segmenter
+from services.synthesis_cache import SynthesisCache
 from settings import settings
 from utils import from_data_dir
 
@@ -26,20 +35,47 @@ T = TypeVar("T")
 class Services(Enum):
     AZURE = "azure"
     KOKORO = "kokoro"
+    KOKORO_ONNX = "kokoro_onnx"
     CHATTERBOX = "chatterbox"
 
 
+class InputMode(Enum):
+    TEXT = "text"
+    SSML = "ssml"
+    CLONE = "clone"
+
+
 @dataclass
 class Setting:
     name: str
     key: str
     default_value: str
+    affects_audio: bool = True
+    """Whether the setting changes the synthesised audio, so cached audio depends on it."""
 
 
 class TtsService(Generic[T], ABC):
     _current_service: "TtsService[object] | None" = None
+    _cache: SynthesisCache | None = None
+    _registry: EngineRegistry | None = None
+    _render_jobs: RenderJobStore | None = None
+    _voices_listener: Callable[[list[tuple[str, str]]], None] | None = None
     DEFAULT_SERVICE: Services = Services.AZURE
     VOICE_NAME: str = "voice"
+    CACHE_MEMORY_LIMIT_KEY: str = "cache/memory_limit_mb"
+    CACHE_DISK_LIMIT_KEY: str = "cache/disk_limit_mb"
+    ENGINE_IDLE_TIMEOUT_KEY: str = "engines/idle_timeout_s"
+    ENGINE_MEMORY_BUDGET_KEY: str = "engines/memory_budget_mb"
+    WARM_UP_KEY: str = "engines/warm_up"
+    WARM_UP_TEXT: str = "Hello, this is a warm-up."
+    RENDER_SEGMENT_LENGTH: int = 1000
+    PLAYBACK_AHEAD_CHUNKS: int = 32
+    """Chunks synthesis may run ahead of playback before it waits."""
+    QUEUE_POLL_INTERVAL: float = 0.1
+    auto_threads: int | None = None
+    """Threads local engines run on when their thread setting is auto, or None for every core
+    but one."""
+    _warm_voice: str | None = None
 
     def __init__(self, *args: str):
         """Initialize the TTS service by setting up the media player and audio output.
@@ -66,6 +102,10 @@ class TtsService(Generic[T], ABC):
                 return getattr(importlib.import_module("services.azure"), "Azure")
             case Services.KOKORO:
                 return getattr(importlib.import_module("services.kokoro"), "Kokoro")
+            case Services.KOKORO_ONNX:
+                return getattr(
+                    importlib.import_module("services.kokoro_onnx"), "KokoroOnnx"
+                )
             case Services.CHATTERBOX:
                 return getattr(
                     importlib.import_module("services.chatterbox"), "Chatterbox"
@@ -73,7 +113,10 @@ class TtsService(Generic[T], ABC):
 
     @classmethod
     def switch(cls, service: Services):
-        """Switches to a new TtsService instance for the given type.
+        """Switches to a TtsService instance for the given type.
+
+        A loaded instance is reused from the engine registry when possible, with changed
+        settings re-applied in place.
 
         Args:
             service (Services): The enum value representing the desired service.
@@ -83,19 +126,27 @@ class TtsService(Generic[T], ABC):
         """
         _logger.info("Switching TTS service to %s", service.name)
         Class = cls.get_service_class(service)
-        args = [str(settings.value(Class.voice_key(), Class._default_voice()))]
+        args = {
+            cls.VOICE_NAME: str(
+                settings.value(Class.voice_key(), Class._default_voice())
+            )
+        }
 
         if issubclass(
             Class,
             getattr(importlib.import_module("services.clone_service"), "CloneService"),
         ):
-            args.append(str(settings.value(getattr(Class, "sample_voice_key")(), "")))
+            args["sample_voice"] = str(
+                settings.value(getattr(Class, "sample_voice_key")(), "")
+            )
 
-        args.extend(
-            str(settings.value(setting.key, setting.default_value))
+        args.update(
+            (setting.name, str(settings.value(setting.key, setting.default_value)))
             for setting in Class.setting_fields()
         )
-        cls._current_service = Class(*args)
+        engine = cls.registry().acquire(Class, args)
+        assert isinstance(engine, Class), "Registry should return the requested class."
+        TtsService._current_service = engine
 
     @classmethod
     def get_service(cls) -> "TtsService[object]":
@@ -114,6 +165,58 @@ class TtsService(Generic[T], ABC):
 
         return cls._current_service
 
+    @classmethod
+    def registry(cls) -> EngineRegistry:
+        """Returns the registry of loaded engines, creating it from settings on first use."""
+        if TtsService._registry is None:
+            TtsService._registry = EngineRegistry(
+                float(settings.value(cls.ENGINE_IDLE_TIMEOUT_KEY, 600)),
+                int(settings.value(cls.ENGINE_MEMORY_BUDGET_KEY, 0)) << 20,
+            )
+
+        return TtsService._registry
+
+    @classmethod
+    def cache(cls) -> SynthesisCache:
+        """Returns the synthesis cache shared by all services, creating it from settings on first use."""
+        if TtsService._cache is None:
+            memory_limit = int(settings.value(cls.CACHE_MEMORY_LIMIT_KEY, 256)) << 20
+            disk_limit = int(settings.value(cls.CACHE_DISK_LIMIT_KEY, 2048)) << 20
+
+            try:
+                folder = from_data_dir("cache")
+                folder.mkdir(exist_ok=True)
+            except OSError as e:
+                _logger.error(
+                    "Creating cache directory failed. Using memory cache only. Error: %s",
+                    e.strerror,
+                    exc_info=e,
+                )
+                folder = None
+
+            TtsService._cache = SynthesisCache(folder, memory_limit, disk_limit)
+
+        return TtsService._cache
+
+    @classmethod
+    def render_jobs(cls) -> RenderJobStore | None:
+        """Returns the store of resumable render jobs, or None if its folder cannot be created."""
+        if TtsService._render_jobs is None:
+            try:
+                folder = from_data_dir(RenderJobStore.FOLDER)
+                folder.mkdir(exist_ok=True)
+            except OSError as e:
+                _logger.error(
+                    "Creating render job directory failed. Renders will not be resumable. Error: %s",
+                    e.strerror,
+                    exc_info=e,
+                )
+                return None
+
+            TtsService._render_jobs = RenderJobStore(folder)
+
+        return TtsService._render_jobs
+
     @classmethod
     def voice_key(cls):
         """Returns the key for the voice setting in the TTS service."""
@@ -143,6 +246,36 @@ class TtsService(Generic[T], ABC):
         """Returns a list of available voices for the TTS service and the string the service recognises it by. External data may need to be fetched."""
         pass
 
+    @classmethod
+    def set_voices_listener(
+        cls, listener: Callable[[list[tuple[str, str]]], None] | None
+    ):
+        """Sets the callback that receives the voices of the current service when they are refreshed in the background.
+
+        Args:
+            listener (Callable[[list[tuple[str, str]]], None] | None): The callback, called from a background thread.
+        """
+        TtsService._voices_listener = listener
+
+    def _voices_refreshed(self, voices: list[tuple[str, str]]):
+        """Reports voices refreshed in the background to the listener if this is the current service.
+
+        Args:
+            voices (list[tuple[str, str]]): The refreshed voices.
+        """
+        listener = TtsService._voices_listener
+
+        if TtsService._current_service is self and listener is not None:
+            listener(voices)
+
+    def refresh_voices(self) -> list[tuple[str, str]]:
+        """Fetches the available voices again, bypassing any stored voice list.
+
+        Returns:
+            list[tuple[str, str]]: The available voices and the strings the service recognises them by.
+        """
+        return self.voices
+
     @property
     @abstractmethod
     def voice(self) -> str:
@@ -159,49 +292,265 @@ class TtsService(Generic[T], ABC):
         """Sets the currently selected voice for the TTS service."""
         pass
 
+    @property
+    @abstractmethod
+    def sample_rate(self) -> int:
+        """Returns the sample rate of the audio produced by the TTS service."""
+        pass
+
+    @property
+    def max_concurrent_jobs(self) -> int:
+        """Returns how many synthesis jobs may run on the service at once.
+
+        Local engines share the CPU threads and model state, so by default jobs run one at a time.
+        """
+        return 1
+
+    @property
+    def needs_warm_up(self) -> bool:
+        """Returns whether the first synthesis is slower than later ones until warmed up.
+
+        Local engines page in weights, select kernels and initialise grapheme to phoneme
+        conversion on their first synthesis.
+        """
+        return False
+
+    @property
+    def render_segment_length(self) -> int:
+        """Returns the maximum length of the segments saved documents are checkpointed in."""
+        return self.RENDER_SEGMENT_LENGTH
+
+    @property
+    def file_extension(self) -> str:
+        """Returns the extension of the audio files saved with the current save settings."""
+        return AudioEncoder.from_settings().extension
+
+    @property
+    def language(self) -> str | None:
+        """Returns the ISO 639-1 code of the language the current voice speaks, if known."""
+        return None
+
+    def _split_sentences(
+        self, text: str, max_length: int, stable: bool = False
+    ) -> Iterator[str]:
+        """Group sentences of a text into segments no longer than a maximum length.
+
+        Args:
+            text (str): The text to be split.
+            max_length (int): The maximum length of a segment in characters.
+            stable (bool): Whether segment boundaries should survive edits elsewhere in the
+                text, so unchanged segments can be reused.
+
+        Yields:
+            str: The next segment of sentences.
+        """
+        return Segmenter.from_settings(self.language).segments(
+            text, max_length, stable
+        )
+
+    @abstractmethod
+    def _stream_text_implementation(
+        self, text: str, cancel: CancellationToken
+    ) -> Iterator[T]:
+        """Synthesises plain text to audio data chunk by chunk.
+
+        Args:
+            text (str): The text to be converted to speech.
+            cancel (CancellationToken): Checked before each chunk is synthesised.
+
+        Yields:
+            T: The next chunk of audio data, in playback order.
+
+        Raises:
+            SynthesisCancelledException: If synthesis was cancelled.
+            SynthesisException: If there is an error during synthesis.
+        """
+        pass
+
     @abstractmethod
-    def _synthesise_text_implementation(self, text: str) -> T:
+    def _join_chunks(self, chunks: list[T]) -> T:
+        """Concatenates chunks of audio data into a single piece of audio data.
+
+        Args:
+            chunks (list[T]): The non-empty list of chunks, in playback order.
+
+        Returns:
+            T: The concatenated audio data.
+        """
+        pass
+
+    def _collect_stream(self, chunks: Iterator[T]) -> T:
+        """Consumes a stream of audio data chunks and joins them.
+
+        Args:
+            chunks (Iterator[T]): The stream of audio data chunks.
+
+        Returns:
+            T: The joined audio data.
+
+        Raises:
+            SynthesisException: If there is an error during synthesis or no audio was produced.
+        """
+        collected = list(chunks)
+
+        if not collected:
+            _logger.error("Synthesis failed. No audio produced.")
+            raise SynthesisException("No audio produced")
+
+        return self._join_chunks(collected)
+
+    def _synthesise_text_implementation(
+        self, text: str, cancel: CancellationToken
+    ) -> T:
         """Synthesises plain text to audio data.
 
         Args:
             text (str): The text to be converted to speech.
+            cancel (CancellationToken): Checked before each chunk is synthesised.
 
         Returns:
             T: The audio data resulting from synthesis.
 
         Raises:
+            SynthesisCancelledException: If synthesis was cancelled.
             SynthesisException: If there is an error during synthesis.
         """
-        pass
+        return self._collect_stream(self._stream_text_implementation(text, cancel))
 
     @abstractmethod
-    def _save_implementation(self, file: Path, data: T):
-        """Saves audio data to a file.
+    def _get_samples(self, data: T) -> numpy.ndarray:
+        """Convert synthesized audio data to samples for encoding.
+
+        Args:
+            data (T): The audio data returned by the synthesis implementation.
+
+        Returns:
+            numpy.ndarray: Mono float32 samples in [-1, 1] or int16 samples at the service sample rate.
+        """
+        pass
+
+    def _get_encoded_bytes(self, data: T, format_name: str) -> bytes | None:
+        """Get audio data that is already encoded in a format, so it can be saved as is.
+
+        Args:
+            data (T): The audio data returned by the synthesis implementation.
+            format_name (str): The name of the format in AudioEncoder.FORMATS.
+
+        Returns:
+            bytes | None: The encoded audio, or None if the data is not encoded in the format.
+        """
+        return None
+
+    def _save_implementation(self, file: Path, data: T, encoder: AudioEncoder):
+        """Saves audio data to a file through the encoder stage.
 
         Args:
             file (Path): The file path where the audio will be saved.
             data (T): The audio data to be saved.
+            encoder (AudioEncoder): The encoder for the saved format.
 
         Raises:
+            EncodingException: If the audio cannot be encoded in the format.
             FileExistsError: If a file already exists at the target path.
             IsADirectoryError: If the target path is a directory.
             PermissionError: If lacking permissions to create or write the file.
             OSError: For other filesystem errors.
         """
+        encoded = self._get_encoded_bytes(data, encoder.format_name)
+
+        if encoded is None:
+            encoder.write(file, self._get_samples(data), self.sample_rate)
+            return
+
+        _logger.info("Saving encoded audio as is. File: %s", file.name)
+
+        with file.open("xb") as f:
+            _ = f.write(encoded)
+
+    @abstractmethod
+    def _get_pcm(self, data: T) -> PcmBuffer:
+        """Convert synthesized audio data to PCM for playback.
+
+        Args:
+            data (T): The audio data returned by the synthesis implementation.
+
+        Returns:
+            PcmBuffer: The audio as mono int16 PCM at the service sample rate.
+        """
         pass
 
     @abstractmethod
-    def _get_wav_bytes(self, data: T) -> bytes:
-        """Convert synthesized audio data to WAV byte format for playback.
+    def _to_bytes(self, data: T) -> bytes:
+        """Serialise audio data for the synthesis cache.
 
         Args:
-            data (T): The raw audio data returned by the synthesis implementation.
+            data (T): The audio data to serialise.
 
         Returns:
-            bytes: The synthesized audio encoded in WAV format.
+            bytes: The serialised audio data.
         """
         pass
 
+    @abstractmethod
+    def _from_bytes(self, data: bytes) -> T:
+        """Deserialise audio data from the synthesis cache.
+
+        Args:
+            data (bytes): Audio data serialised by _to_bytes.
+
+        Returns:
+            T: The audio data.
+        """
+        pass
+
+    def _cache_identity(self, mode: InputMode) -> list[str]:
+        """Returns the service state that affects the audio synthesised in a mode.
+
+        Args:
+            mode (InputMode): The input mode of the synthesis.
+
+        Returns:
+            list[str]: Values identifying the service, voice and engine settings.
+        """
+        return [
+            self.type().value,
+            self.voice,
+            *(
+                f"{setting.key}={settings.value(setting.key, setting.default_value)}"
+                for setting in self.setting_fields()
+                if setting.affects_audio
+            ),
+        ]
+
+    def _identity_hash(self, mode: InputMode):
+        """Hash the service state that affects the audio synthesised in a mode.
+
+        Args:
+            mode (InputMode): The input mode of the synthesis.
+
+        Returns:
+            str: The hexadecimal hash of the cache identity.
+        """
+        identity = "\0".join(self._cache_identity(mode))
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def _cache_key(self, input_str: str, mode: InputMode):
+        """Build the synthesis cache key of an input.
+
+        Args:
+            input_str (str): The string to synthesise.
+            mode (InputMode): The input mode of the synthesis.
+
+        Returns:
+            str: The hexadecimal cache key.
+        """
+        parts = [
+            *self._cache_identity(mode),
+            mode.value,
+            " ".join(input_str.split()),
+        ]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
     @abstractmethod
     def _has_information(self) -> bool:
         """Checks if the service has the necessary information to function.
@@ -211,21 +560,201 @@ class TtsService(Generic[T], ABC):
         """
         pass
 
+    def _segment_input(self, input_str: str, mode: InputMode) -> list[str]:
+        """Split input into the segments documents are rendered, checkpointed and cached in.
+
+        Text is split at stable boundaries, so after an edit the unchanged segments are found in
+        the cache and only the edited ones are synthesised again.
+
+        Args:
+            input_str (str): The string to synthesise.
+            mode (InputMode): The input mode of the synthesis.
+
+        Returns:
+            list[str]: The segments, in order. SSML is not split by default.
+        """
+        if mode == InputMode.SSML:
+            return [input_str]
+
+        return list(
+            self._split_sentences(input_str, self.render_segment_length, stable=True)
+        )
+
+    def _synthesiser(self, mode: InputMode) -> Callable[[str, CancellationToken], T]:
+        """Returns the low-level synthesis function of an input mode.
+
+        Args:
+            mode (InputMode): The input mode of the synthesis.
+
+        Returns:
+            Callable[[str, CancellationToken], T]: The synthesis function.
+        """
+        assert mode == InputMode.TEXT, "Service should support the input mode."
+        return self._synthesise_text_implementation
+
+    def _open_render_job(
+        self,
+        input_str: str,
+        mode: InputMode,
+        segments: list[str],
+        target: Path | None,
+    ):
+        """Open the resumable render job of an input, if render jobs are available.
+
+        Args:
+            input_str (str): The string to synthesise.
+            mode (InputMode): The input mode of the synthesis.
+            segments (list[str]): The segments of the input, in order.
+            target (Path | None): The file the audio will be saved to, recorded in the job.
+
+        Returns:
+            RenderJob | None: The job, or None if rendering without checkpoints.
+        """
+        store = self.render_jobs()
+
+        if store is None:
+            return None
+
+        try:
+            return store.open(
+                self._cache_key(input_str, mode),
+                self._identity_hash(mode),
+                mode.value,
+                input_str,
+                segments,
+                target,
+            )
+        except OSError as e:
+            _logger.error(
+                "Creating render job failed. Rendering without checkpoints. Error: %s",
+                e.strerror,
+                exc_info=e,
+            )
+            return None
+
+    def _load_segment(
+        self, job: RenderJob | None, index: int, segment: str, mode: InputMode
+    ) -> T | None:
+        """Load the audio of a segment rendered before, from its checkpoint or the cache.
+
+        Args:
+            job (RenderJob | None): The render job of the input, if any.
+            index (int): The index of the segment.
+            segment (str): The segment.
+            mode (InputMode): The input mode of the synthesis.
+
+        Returns:
+            T | None: The audio of the segment, or None if it has to be synthesised.
+        """
+        if job is not None and job.is_rendered(index):
+            try:
+                return self._from_bytes(job.load(index))
+            except OSError as e:
+                _logger.error(
+                    "Reading checkpoint failed. Rendering segment again. Error: %s",
+                    e.strerror,
+                    exc_info=e,
+                )
+
+        cached = self.cache().get(self._cache_key(segment, mode))
+        return self._from_bytes(cached) if cached is not None else None
+
+    def _render_segments(
+        self,
+        input_str: str,
+        synth: Callable[[str, CancellationToken], T],
+        mode: InputMode,
+        show_status: Callable[[str], None],
+        cancel: CancellationToken,
+        target: Path | None,
+    ) -> T:
+        """Synthesise input segment by segment, reusing segments rendered before.
+
+        Each rendered segment is cached and checkpointed to a resumable render job. A render
+        interrupted by a crash or a cancellation continues from the last finished segment, and
+        after an edit only the changed segments are synthesised again.
+
+        Args:
+            input_str (str): The string to synthesise.
+            synth (Callable[[str, CancellationToken], T]): The low-level synthesis function to call.
+            mode (InputMode): The input mode of the synthesis.
+            show_status (Callable[[str], None]): Callback to report status messages.
+            cancel (CancellationToken): Passed to the synthesis function to stop it early.
+            target (Path | None): The file the audio will be saved to, recorded in the job.
+
+        Returns:
+            T: The synthesised audio of the whole input.
+
+        Raises:
+            SynthesisCancelledException: If synthesis was cancelled.
+            SynthesisException: If there is an error during synthesis.
+        """
+        segments = self._segment_input(input_str, mode)
+
+        if len(segments) <= 1:
+            return synth(input_str, cancel)
+
+        job = self._open_render_job(input_str, mode, segments, target)
+        chunks: list[T] = []
+        synthesised = 0
+
+        for index, segment in enumerate(segments):
+            data = self._load_segment(job, index, segment, mode)
+
+            if data is not None:
+                chunks.append(data)
+                continue
+
+            cancel.raise_if_cancelled()
+            show_status(f"Synthesising. Segment {index + 1} of {len(segments)}.")
+            data = synth(segment, cancel)
+            chunks.append(data)
+            synthesised += 1
+            serialised = self._to_bytes(data)
+            self.cache().put(self._cache_key(segment, mode), serialised)
+
+            if job is None:
+                continue
+
+            try:
+                job.checkpoint(index, serialised)
+            except OSError as e:
+                _logger.error(
+                    "Saving checkpoint failed. Error: %s", e.strerror, exc_info=e
+                )
+
+        _logger.info(
+            "Rendered segments. Synthesised: %d, reused: %d",
+            synthesised,
+            len(segments) - synthesised,
+        )
+        return self._join_chunks(chunks)
+
     def _perform_synthesis(
         self,
         input_str: str,
-        synth: Callable[[str], T],
+        synth: Callable[[str, CancellationToken], T],
+        mode: InputMode,
         show_status: Callable[[str], None],
+        cancel: CancellationToken,
+        target: Path | None = None,
     ) -> T | None:
         """Perform synthesis of input, checking configuration and handling synthesis errors.
 
+        The synthesis cache is consulted first and updated with newly synthesised audio. Input
+        longer than one render segment is rendered segment by segment through a resumable render
+        job, reusing segments rendered before.
+
         Args:
             input_str (str): The string to synthesise.
-            synth (Callable[[str], T]): The low-level synthesis function to call.
+            synth (Callable[[str, CancellationToken], T]): The low-level synthesis function to call.
+            mode (InputMode): The input mode of the synthesis.
             show_status (Callable[[str], None]): Callback to report status messages.
+            cancel (CancellationToken): Passed to the synthesis function to stop it early.
+            target (Path | None): The file the audio will be saved to, recorded in render jobs.
 
         Returns:
-            Optional[T]: The synthesized audio data, or None if synthesis failed or configuration is missing.
+            Optional[T]: The synthesized audio data, or None if synthesis failed or was cancelled or configuration is missing.
         """
         _logger.info("Synthesising. Input: %s", input_str)
 
@@ -233,40 +762,73 @@ class TtsService(Generic[T], ABC):
             show_status("Service information required to generate audio.")
             return None
 
+        key = self._cache_key(input_str, mode)
+        cached = self.cache().get(key)
+
+        if cached is not None:
+            return self._from_bytes(cached)
+
         show_status("Synthesising.")
 
         try:
-            return synth(input_str)
+            data = self._render_segments(
+                input_str, synth, mode, show_status, cancel, target
+            )
+        except SynthesisCancelledException:
+            _logger.info("Synthesis stopped")
+            show_status("Synthesis stopped.")
+            return None
         except SynthesisException as e:
             show_status(f"Synthesis failed. {e}.")
             return None
 
+        self.cache().put(key, self._to_bytes(data))
+        return data
+
     def _synth_and_save(
         self,
         input_str: str,
-        synth: Callable[[str], T],
+        synth: Callable[[str, CancellationToken], T],
+        mode: InputMode,
         show_status: Callable[[str], None],
-    ):
-        """Generic helper to synthesise input and save the result to a WAV file.
+        file: Path | None = None,
+        cancel: CancellationToken | None = None,
+    ) -> Path | None:
+        """Generic helper to synthesise input and save the result to an audio file.
 
         Args:
             input_str (str): The string to synthesise.
-            synth (Callable[[str], T]): The low-level synthesis function to call.
+            synth (Callable[[str, CancellationToken], T]): The low-level synthesis function to call.
+            mode (InputMode): The input mode of the synthesis.
             show_status (Callable[[str], None]): Callback to report status messages.
+            file (Path | None): The file to save to. Defaults to a timestamped file in the saved folder.
+            cancel (CancellationToken | None): Stops synthesis at the next chunk once cancelled.
+
+        Returns:
+            Path | None: The saved file, or None if synthesis or saving failed or was cancelled.
         """
-        data = self._perform_synthesis(input_str, synth, show_status)
+        data = self._perform_synthesis(
+            input_str, synth, mode, show_status, cancel or CancellationToken(), file
+        )
         if data is None:
-            return
-        save_dir = "saved"
-        file = None
+            return None
+        save_dir = "saved" if file is None else str(file.parent)
+        encoder = AudioEncoder.from_settings()
         show_status("Saving.")
 
         try:
-            folder = from_data_dir(save_dir)
-            _logger.info("Creating save directory. Directory: %s", save_dir)
-            folder.mkdir(exist_ok=True)
-            file = folder / (datetime.now().strftime("%Y%m%d_%H%M%S%f")[:-3] + ".wav")
-            self._save_implementation(file, data)
+            if file is None:
+                folder = from_data_dir(save_dir)
+                _logger.info("Creating save directory. Directory: %s", save_dir)
+                folder.mkdir(exist_ok=True)
+                file = folder / (
+                    datetime.now().strftime("%Y%m%d_%H%M%S%f")[:-3]
+                    + f".{encoder.extension}"
+                )
+
+            self._save_implementation(file, data, encoder)
+        except EncodingException as e:
+            msg = f"Saving failed. {e}."
         except FileExistsError as e:
             _logger.error("Saving failed. Error: %s", e.strerror, exc_info=e)
             target = f"File {file.name}" if file else f"Folder {save_dir}"
@@ -285,83 +847,308 @@ class TtsService(Generic[T], ABC):
             msg = "Saving failed. Filesystem error."
         else:
             _logger.info("Saving completed")
-            msg = "Saving completed."
+            show_status("Saving completed.")
+
+            if (store := self.render_jobs()) is not None:
+                store.discard(self._cache_key(input_str, mode))
+
+            return file
 
         show_status(msg)
+        return None
 
     def _synth_and_play(
         self,
         input_str: str,
-        synth: Callable[[str], T],
+        stream: Callable[[str, CancellationToken], Iterator[T]],
+        mode: InputMode,
         show_status: Callable[[str], None],
+        cancel: CancellationToken | None = None,
     ):
-        """Generic helper to synthesise input and play the resulting audio.
+        """Generic helper to synthesise input and play the audio as it is produced.
+
+        Synthesis runs on a separate thread so playback starts with the first chunk while later
+        chunks are still being synthesised, at most a bounded number of chunks ahead of
+        playback. Long input is streamed segment by segment, and
+        segments found in the cache are played without synthesis, so replaying edited text only
+        synthesises the changed segments. Newly synthesised audio is added to the cache. Cancelling
+        stops both playback and synthesis, and synthesis also stops when playback ends early.
 
         Args:
             input_str (str): The string to synthesise.
-            synth (Callable[[str], T]): The low-level synthesis function to call.
+            stream (Callable[[str, CancellationToken], Iterator[T]]): The low-level streaming synthesis function to call.
+            mode (InputMode): The input mode of the synthesis.
             show_status (Callable[[str], None]): Callback to report status messages.
+            cancel (CancellationToken | None): Stops playback and synthesis once cancelled.
         """
-        data = self._perform_synthesis(input_str, synth, show_status)
-        if data is None:
+        cancel = cancel or CancellationToken()
+        _logger.info("Synthesising. Input: %s", input_str)
+
+        if not self._has_information():
+            show_status("Service information required to generate audio.")
             return
-        _logger.info("Playing audio.")
 
-        player: QMediaPlayer = QMediaPlayer()
-        audio_output: QAudioOutput = QAudioOutput()
-        player.setAudioOutput(audio_output)
+        key = self._cache_key(input_str, mode)
+        cached = self.cache().get(key)
+        chunks: queue.Queue[PcmBuffer | Exception | None] = queue.Queue(
+            self.PLAYBACK_AHEAD_CHUNKS
+        )
 
-        buffer: QBuffer = QBuffer()
-        buffer.setData(QByteArray(self._get_wav_bytes(data)))
+        if cached is None:
+            show_status("Synthesising.")
 
-        if not buffer.open(QIODevice.OpenModeFlag.ReadOnly):
-            _logger.error("Playback failed. Failed to open audio buffer.")
-            show_status("Playback failed. Failed to open audio buffer.")
-            return
+        def put(item: PcmBuffer):
+            if not self._put_chunk(chunks, item, cancel):
+                cancel.raise_if_cancelled()
 
-        player.setSourceDevice(buffer)
+        def produce():
+            try:
+                if cached is not None:
+                    put(self._get_pcm(self._from_bytes(cached)))
+                    return
 
-        if player.mediaStatus() == QMediaPlayer.MediaStatus.NoMedia:
-            _logger.error("Playback failed. No media to play.")
-            show_status("Playback failed. No media to play.")
-            return
+                segments = self._segment_input(input_str, mode)
+                produced: list[T] = []
+
+                if len(segments) <= 1:
+                    segments = [input_str]
+
+                for segment in segments:
+                    cancel.raise_if_cancelled()
+                    segment_key = self._cache_key(segment, mode)
+                    stored = self.cache().get(segment_key) if segment_key != key else None
+
+                    if stored is not None:
+                        produced.append(self._from_bytes(stored))
+                        put(self._get_pcm(produced[-1]))
+                        continue
+
+                    segment_chunks: list[T] = []
+
+                    for chunk in stream(segment, cancel):
+                        segment_chunks.append(chunk)
+                        put(self._get_pcm(chunk))
+
+                    if segment_chunks and segment_key != key:
+                        self.cache().put(
+                            segment_key,
+                            self._to_bytes(self._join_chunks(segment_chunks)),
+                        )
+
+                    produced.extend(segment_chunks)
+
+                if produced:
+                    self.cache().put(key, self._to_bytes(self._join_chunks(produced)))
+            except Exception as e:
+                _ = self._put_chunk(chunks, e, cancel)
+            finally:
+                _ = self._put_chunk(chunks, None, cancel)
+
+        producer = threading.Thread(target=produce, name="synthesis", daemon=True)
+        producer.start()
+
+        try:
+            self._play_pcm(chunks, show_status, cancel)
+        finally:
+            # Playback ends early when it fails or another utterance stops it, and synthesis
+            # must not go on without it, outside the job limits of the engine.
+            if producer.is_alive():
+                cancel.cancel()
+
+            producer.join()
+
+    def _put_chunk(
+        self,
+        chunks: "queue.Queue[PcmBuffer | Exception | None]",
+        item: PcmBuffer | Exception | None,
+        cancel: CancellationToken,
+    ):
+        """Queue an item for playback, waiting while the queue is full.
 
-        loop = QEventLoop()
+        Args:
+            chunks (queue.Queue[PcmBuffer | Exception | None]): The queue of PCM chunks.
+            item (PcmBuffer | Exception | None): The item to queue.
+            cancel (CancellationToken): Stops waiting once cancelled.
+
+        Returns:
+            bool: True if the item was queued, False if cancelled while the queue was full.
+        """
+        while True:
+            try:
+                chunks.put(item, timeout=self.QUEUE_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                if cancel.cancelled:
+                    return False
+
+    def _play_pcm(
+        self,
+        chunks: "queue.Queue[PcmBuffer | Exception | None]",
+        show_status: Callable[[str], None],
+        cancel: CancellationToken,
+    ):
+        """Play PCM chunks from a queue on the playback engine until the stream ends.
+
+        Args:
+            chunks (queue.Queue[PcmBuffer | Exception | None]): Queue of PCM chunks. An exception
+                aborts playback and None marks the end of the stream.
+            show_status (Callable[[str], None]): Callback to report status messages.
+            cancel (CancellationToken): Stops playback once cancelled.
+
+        Raises:
+            Exception: Any non synthesis exception raised while producing the chunks.
+        """
+        # Imported on first playback, to keep it off the startup path.
+        from services.playback_engine import PlaybackEngine
+
+        engine = PlaybackEngine.instance()
+        utterance = engine.play(
+            self.sample_rate, chunks, lambda: show_status("Playing.")
+        )
+        unregister = cancel.on_cancel(engine.stop)
+        utterance.wait()
+        unregister()
+
+        if utterance.stopped or isinstance(
+            utterance.error, SynthesisCancelledException
+        ):
+            _logger.info("Playback stopped")
+            show_status("Playback stopped.")
+        elif isinstance(utterance.error, SynthesisException):
+            show_status(f"Synthesis failed. {utterance.error}.")
+        elif utterance.error is not None:
+            raise utterance.error
+        elif utterance.playback_error is not None:
+            show_status(f"Playback failed. {utterance.playback_error}.")
+        else:
+            _logger.info("Playback completed")
 
-        def on_status(status):
-            if status == QMediaPlayer.MediaStatus.EndOfMedia:
-                loop.quit()
-            elif (
-                status == QMediaPlayer.MediaStatus.InvalidMedia
-                or status == QMediaPlayer.MediaStatus.StalledMedia
+    def warm_up(self, cancel: CancellationToken | None = None) -> float | None:
+        """Runs a short synthesis through the whole engine, if enabled and not done yet.
+
+        The audio bypasses the cache and is discarded. Afterwards the first real request of the
+        current voice runs at steady-state latency.
+
+        Args:
+            cancel (CancellationToken | None): Stops the warm-up once cancelled.
+
+        Returns:
+            float | None: Seconds the warm-up took, or None if it was skipped or failed.
+        """
+        voice = self.voice
+
+        if (
+            not self.needs_warm_up
+            or self._warm_voice == voice
+            or not settings.value(self.WARM_UP_KEY, True, bool)
+            or not self._has_information()
+        ):
+            return None
+
+        _logger.info("Warming up engine. Voice: %s", voice)
+        start = time.perf_counter()
+
+        try:
+            for _ in self._stream_text_implementation(
+                self.WARM_UP_TEXT, cancel or CancellationToken()
             ):
-                _logger.error("Playback failed. Error: %s", player.errorString())
-                show_status(f"Playback failed. {player.errorString()}")
-                loop.quit()
+                pass
+        except SynthesisCancelledException:
+            _logger.info("Warm-up stopped")
+            return None
+        except SynthesisException:
+            _logger.error("Warm-up failed", exc_info=True)
+            return None
+
+        elapsed = time.perf_counter() - start
+        self._warm_voice = voice
+        _logger.info("Warmed up engine. Voice: %s, took: %.3fs", voice, elapsed)
+        return elapsed
 
-        player.mediaStatusChanged.connect(on_status)
-        player.play()
+    def unfinished_renders(self) -> list[RenderJob]:
+        """Returns the interrupted render jobs that can be resumed with the current voice and settings.
 
-        if player.mediaStatus() != QMediaPlayer.MediaStatus.EndOfMedia:
-            loop.exec()
+        Returns:
+            list[RenderJob]: The jobs, oldest first.
+        """
+        store = self.render_jobs()
+
+        if store is None:
+            return []
 
-        player.stop()
-        buffer.close()
+        return [
+            job
+            for job in store.unfinished()
+            if job.mode in (mode.value for mode in InputMode)
+            and job.identity == self._identity_hash(InputMode(job.mode))
+        ]
 
-    def save_text_to_file(self, text: str, show_status: Callable[[str], None]):
+    def resume_render(
+        self,
+        job: RenderJob,
+        show_status: Callable[[str], None],
+        cancel: CancellationToken | None = None,
+    ):
+        """Resumes an interrupted render job and saves its audio.
+
+        Args:
+            job (RenderJob): The job, from unfinished_renders.
+            show_status (Callable[[str], None]): A callback function to show status updates.
+            cancel (CancellationToken | None): Stops synthesis at the next chunk once cancelled.
+
+        Returns:
+            Path | None: The saved file, or None if synthesis or saving failed.
+        """
+        mode = InputMode(job.mode)
+        return self._synth_and_save(
+            job.input,
+            self._synthesiser(mode),
+            mode,
+            show_status,
+            Path(job.target) if job.target is not None else None,
+            cancel,
+        )
+
+    def save_text_to_file(
+        self,
+        text: str,
+        show_status: Callable[[str], None],
+        file: Path | None = None,
+        cancel: CancellationToken | None = None,
+    ):
         """Saves the text to a file asynchronously.
 
         Args:
             text (str): The text to be converted to speech.
             show_status (Callable[[str], None]): A callback function to show status updates.
+            file (Path | None): The file to save to. Defaults to a timestamped file in the saved folder.
+            cancel (CancellationToken | None): Stops synthesis at the next chunk once cancelled.
+
+        Returns:
+            Path | None: The saved file, or None if synthesis or saving failed.
         """
-        self._synth_and_save(text, self._synthesise_text_implementation, show_status)
+        return self._synth_and_save(
+            text,
+            self._synthesise_text_implementation,
+            InputMode.TEXT,
+            show_status,
+            file,
+            cancel,
+        )
 
-    def play_text(self, text: str, show_status: Callable[[str], None]):
+    def play_text(
+        self,
+        text: str,
+        show_status: Callable[[str], None],
+        cancel: CancellationToken | None = None,
+    ):
         """Plays the text asynchronously.
 
         Args:
             text (str): The text to be converted to speech.
             show_status (Callable[[str], None]): A callback function to show status updates.
+            cancel (CancellationToken | None): Stops playback and synthesis once cancelled.
         """
-        self._synth_and_play(text, self._synthesise_text_implementation, show_status)
+        self._synth_and_play(
+            text, self._stream_text_implementation, InputMode.TEXT, show_status, cancel
+        )
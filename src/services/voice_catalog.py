@@ -0,0 +1,178 @@
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from utils import from_data_dir
+
+_logger = logging.getLogger(__name__)
+
+
+class VoiceCatalog:
+    """Voice list persisted in the data directory and refreshed in the background.
+
+    Each voice is a dictionary with at least a "display" name and the "name" the service
+    recognises it by. The stored list is returned immediately. It is fetched again on a
+    background thread when it is older than the maximum age or when a refresh is requested.
+    """
+
+    FOLDER: str = "voice_catalogs"
+
+    def __init__(
+        self,
+        name: str,
+        max_age: float,
+        fetch: Callable[[], list[dict[str, str]]],
+        on_refresh: Callable[[list[dict[str, str]]], None],
+    ):
+        """Initialise the catalog and load the stored voices.
+
+        Args:
+            name (str): File name of the catalog in the catalog folder, without extension.
+            max_age (float): Seconds after which the stored voices are refreshed.
+            fetch (Callable[[], list[dict[str, str]]]): Fetches the current voices.
+                Raises on failure.
+            on_refresh (Callable[[list[dict[str, str]]], None]): Called from the background
+                thread with the voices after a background refresh changed them.
+        """
+        self._name: str = name
+        self._max_age: float = max_age
+        self._fetch: Callable[[], list[dict[str, str]]] = fetch
+        self._on_refresh: Callable[[list[dict[str, str]]], None] = on_refresh
+        self._lock: threading.Lock = threading.Lock()
+        self._refreshing: bool = False
+        self._voices: list[dict[str, str]] | None = None
+        self._updated: float = 0
+        self._file: Path | None = None
+
+        try:
+            folder = from_data_dir(self.FOLDER)
+            folder.mkdir(exist_ok=True)
+            self._file = folder / f"{name}.json"
+        except OSError as e:
+            _logger.error(
+                "Creating voice catalog directory failed. Error: %s",
+                e.strerror,
+                exc_info=e,
+            )
+            return
+
+        if not self._file.is_file():
+            return
+
+        try:
+            stored = json.loads(self._file.read_text(encoding="utf-8"))
+            self._voices = list(stored["voices"])
+            self._updated = float(stored["updated"])
+        except (OSError, ValueError, KeyError, TypeError):
+            _logger.error(
+                "Reading voice catalog failed. Catalog: %s", name, exc_info=True
+            )
+
+    @property
+    def is_stale(self):
+        """Whether the stored voices are missing or older than the maximum age."""
+        return self._voices is None or time.time() - self._updated > self._max_age
+
+    def get(self, wait_if_missing: bool) -> list[dict[str, str]]:
+        """Return the stored voices, refreshing them in the background if stale.
+
+        Args:
+            wait_if_missing (bool): Fetch synchronously if no voices are stored. Otherwise an
+                empty list is returned and the voices are reported through on_refresh.
+
+        Returns:
+            list[dict[str, str]]: The stored voices.
+
+        Raises:
+            Exception: If voices are fetched synchronously and fetching fails.
+        """
+        if self._voices is None and wait_if_missing:
+            return self.refresh()
+
+        if self.is_stale:
+            self.refresh_in_background()
+
+        return self._voices or []
+
+    def find(self, name: str) -> dict[str, str] | None:
+        """Return a stored voice by name, refreshing the voices in the background if stale.
+
+        Args:
+            name (str): The name the service recognises the voice by.
+
+        Returns:
+            dict[str, str] | None: The voice, or None if it is not stored.
+        """
+        for voice in self.get(wait_if_missing=False):
+            if voice["name"] == name:
+                return voice
+
+        return None
+
+    def refresh(self) -> list[dict[str, str]]:
+        """Fetch the voices synchronously and store them.
+
+        Returns:
+            list[dict[str, str]]: The fetched voices.
+
+        Raises:
+            Exception: If fetching fails.
+        """
+        _logger.info("Refreshing voice catalog. Catalog: %s", self._name)
+        voices = self._fetch()
+
+        with self._lock:
+            self._voices = voices
+            self._updated = time.time()
+
+            if self._file is not None:
+                try:
+                    temp = self._file.with_suffix(".tmp")
+                    _ = temp.write_text(
+                        json.dumps({"updated": self._updated, "voices": voices}),
+                        encoding="utf-8",
+                    )
+                    _ = temp.replace(self._file)
+                except OSError as e:
+                    _logger.error(
+                        "Saving voice catalog failed. Error: %s",
+                        e.strerror,
+                        exc_info=e,
+                    )
+
+        _logger.info(
+            "Voice catalog refreshed. Catalog: %s, voices: %d", self._name, len(voices)
+        )
+        return voices
+
+    def refresh_in_background(self):
+        """Fetch the voices on a background thread, keeping the stored voices on failure."""
+        with self._lock:
+            if self._refreshing:
+                return
+
+            self._refreshing = True
+
+        def run():
+            previous = self._voices
+
+            try:
+                voices = self.refresh()
+            except Exception:
+                _logger.error(
+                    "Refreshing voice catalog failed. Catalog: %s",
+                    self._name,
+                    exc_info=True,
+                )
+                return
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+            if voices != previous:
+                self._on_refresh(voices)
+
+        threading.Thread(target=run, daemon=True).start()
@@ -0,0 +1,192 @@
+import importlib.abc
+import importlib.machinery
+import logging
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Callable, TypeVar, override
+
+from settings import settings
+
+T = TypeVar("T")
+_logger = logging.getLogger(__name__)
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Loader wrapper that records how long a module takes to load."""
+
+    def __init__(self, loader: importlib.abc.Loader, tracer: "ImportTracer"):
+        self._loader: importlib.abc.Loader = loader
+        self._tracer: ImportTracer = tracer
+
+    def __getattr__(self, name: str):
+        return getattr(self._loader, name)
+
+    @override
+    def create_module(self, spec: importlib.machinery.ModuleSpec):
+        return self._tracer.time(spec.name, lambda: self._loader.create_module(spec))
+
+    @override
+    def exec_module(self, module: ModuleType):
+        self._tracer.time(module.__name__, lambda: self._loader.exec_module(module))
+
+
+class ImportTracer(importlib.abc.MetaPathFinder):
+    """Records the load time of every module imported while it is installed.
+
+    Like python -X importtime, each module has a cumulative time including the modules it
+    imports, and a self time excluding them.
+    """
+
+    def __init__(self):
+        self._local: threading.local = threading.local()
+        self._lock: threading.Lock = threading.Lock()
+        self.times: dict[str, tuple[float, float]] = {}
+        """Cumulative and self seconds spent loading each module."""
+
+    def install(self):
+        """Start recording imports."""
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        """Stop recording imports."""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    @override
+    def find_spec(self, fullname: str, path, target: ModuleType | None = None):
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+
+            if finder is self or find_spec is None:
+                continue
+
+            spec = find_spec(fullname, path, target)
+
+            if spec is None:
+                continue
+
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self)
+
+            return spec
+
+        return None
+
+    def time(self, name: str, load: Callable[[], T]) -> T:
+        """Run a step of loading a module, adding its duration to the module's times.
+
+        Args:
+            name (str): The name of the module.
+            load (Callable[[], T]): The loading step.
+
+        Returns:
+            T: The result of the loading step.
+        """
+        stack: list[float] = self._local.__dict__.setdefault("stack", [])
+        stack.append(0)
+        start = time.perf_counter()
+
+        try:
+            return load()
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+
+            if stack:
+                stack[-1] += elapsed
+
+            with self._lock:
+                total, own = self.times.get(name, (0, 0))
+                self.times[name] = (total + elapsed, own + elapsed - children)
+
+
+class StartupTrace:
+    """Measures application startup and logs it.
+
+    The time until the main window is shown is always logged, with a warning if it exceeds
+    the startup budget. When tracing is enabled in the settings, the phases of startup and the
+    slowest imports are logged as well.
+    """
+
+    TRACE_KEY: str = "startup/trace"
+    BUDGET_KEY: str = "startup/budget_ms"
+    DEFAULT_BUDGET_MS: int = 2000
+    SLOWEST_IMPORTS: int = 20
+
+    def __init__(self, started: float, trace: bool, budget_ms: int):
+        """Initialise the trace, recording imports from now on if tracing.
+
+        Args:
+            started (float): The time.perf_counter value when the process started.
+            trace (bool): Whether to log startup phases and import times.
+            budget_ms (int): The expected maximum time until the window is shown.
+        """
+        self._started: float = started
+        self._budget_ms: int = budget_ms
+        self._tracer: ImportTracer | None = ImportTracer() if trace else None
+
+        if self._tracer is not None:
+            self._tracer.install()
+            self.mark("Started tracing")
+
+    @classmethod
+    def from_settings(cls, started: float):
+        """Create a trace with the saved settings.
+
+        Args:
+            started (float): The time.perf_counter value when the process started.
+
+        Returns:
+            StartupTrace: The trace.
+        """
+        try:
+            budget_ms = int(settings.value(cls.BUDGET_KEY, cls.DEFAULT_BUDGET_MS))
+        except ValueError:
+            _logger.error("Invalid startup budget. Using default.")
+            budget_ms = cls.DEFAULT_BUDGET_MS
+
+        return cls(started, settings.value(cls.TRACE_KEY, False, bool), budget_ms)
+
+    @property
+    def elapsed(self):
+        """Seconds since the process started."""
+        return time.perf_counter() - self._started
+
+    def mark(self, phase: str):
+        """Log that a phase of startup has been reached, if tracing.
+
+        Args:
+            phase (str): The phase.
+        """
+        if self._tracer is not None:
+            _logger.info("Startup. Phase: %s, elapsed: %.3fs", phase, self.elapsed)
+
+    def finish(self):
+        """Log the time until the window was shown and stop recording imports."""
+        elapsed_ms = self.elapsed * 1000
+        _logger.info("Window shown. Time to window: %.0fms", elapsed_ms)
+
+        if elapsed_ms > self._budget_ms:
+            _logger.warning(
+                "Startup exceeded budget. Time to window: %.0fms, budget: %dms",
+                elapsed_ms,
+                self._budget_ms,
+            )
+
+        if self._tracer is None:
+            return
+
+        self._tracer.uninstall()
+        slowest = sorted(
+            self._tracer.times.items(), key=lambda item: item[1][1], reverse=True
+        )
+
+        for name, (total, own) in slowest[: self.SLOWEST_IMPORTS]:
+            _logger.info(
+                "Import time. Module: %s, self: %.1fms, cumulative: %.1fms",
+                name,
+                own * 1000,
+                total * 1000,
+            )
@@ -1,8 +1,17 @@
+import ctypes
+import hashlib
+import logging
+import os
+from functools import lru_cache
 from pathlib import Path
 import sys
 
 from PySide6.QtCore import QStandardPaths
 
+_logger = logging.getLogger(__name__)
+DATA_DIR_VARIABLE: str = "VOCALSCRIPT_DATA_DIR"
+"""Environment variable that moves the data directory, such as for tests."""
+
 
 def is_compiled():
     """Return whether the application is running in compiled mode.
@@ -16,6 +25,8 @@ def is_compiled():
 def from_data_dir(path: str | None = None):
     """Get the application data directory path, optionally appending a subpath.
 
+    The directory can be moved with the VOCALSCRIPT_DATA_DIR environment variable.
+
     Args:
         path (str | None): Optional relative path or filename under the data directory.
 
@@ -27,7 +38,9 @@ def from_data_dir(path: str | None = None):
         FileExistsError: If a file exists where a directory needs to be created.
         OSError: For other filesystem-related errors when creating directories.
     """
-    if is_compiled():
+    if os.environ.get(DATA_DIR_VARIABLE):
+        location = Path(os.environ[DATA_DIR_VARIABLE])
+    elif is_compiled():
         folder = QStandardPaths.writableLocation(
             QStandardPaths.StandardLocation.AppDataLocation
         )
@@ -45,3 +58,107 @@ def from_data_dir(path: str | None = None):
         location = location / path
 
     return location
+
+
+def parse_threads(value: str, name: str):
+    """Parse a thread count setting.
+
+    Args:
+        value (str): The value of the setting.
+        name (str): The name of the setting, for logging.
+
+    Returns:
+        int | None: The thread count, or None for auto.
+    """
+    if value.strip().lower() in ("", "auto", "0"):
+        return None
+
+    try:
+        parsed = int(value)
+    except ValueError:
+        parsed = 0
+
+    if parsed < 1:
+        _logger.error("Invalid %s %r. Using auto.", name, value)
+        return None
+
+    return parsed
+
+
+@lru_cache(maxsize=32)
+def _hash_file(path: str, modified: int, size: int):
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def file_hash(path: Path):
+    """Get the SHA-256 hash of a file's content.
+
+    Hashes are memoised on the path, modification time and size of the file so unchanged
+    files are only read once.
+
+    Args:
+        path (Path): The file to hash.
+
+    Returns:
+        str: The hexadecimal digest of the file content.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    stat = path.stat()
+    return _hash_file(str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def resident_memory():
+    """Get the resident memory of the current process.
+
+    Returns:
+        int | None: The resident set size in bytes, or None if it cannot be determined on this platform.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+
+    if sys.platform == "win32":
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", ctypes.c_ulong),
+                ("PageFaultCount", ctypes.c_ulong),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        windll = getattr(ctypes, "windll")
+        get_current_process = windll.kernel32.GetCurrentProcess
+        get_current_process.restype = ctypes.c_void_p
+        get_memory_info = windll.psapi.GetProcessMemoryInfo
+        get_memory_info.argtypes = [
+            ctypes.c_void_p,
+            ctypes.POINTER(ProcessMemoryCounters),
+            ctypes.c_ulong,
+        ]
+
+        if get_memory_info(
+            get_current_process(), ctypes.byref(counters), counters.cb
+        ):
+            return int(counters.WorkingSetSize)
+
+    return None
@@ -13,11 +13,12 @@ from PySide6.QtWidgets import (
 )
 
 from services.clone_service import CloneService
+from services.cancellation import CancellationToken
 from services.ssml_service import SsmlService
 from services.tts_service import TtsService
 from settings import settings
 from utils import is_compiled
-from widgets.task_worker import dispatch
+from widgets.job_scheduler import Priority, dispatch
 
 
 class Input(QWidget):
@@ -54,6 +55,12 @@ class Input(QWidget):
         self._play_button.setIcon(QIcon(self._get_resource("play.svg")))
         _ = self._play_button.clicked.connect(self._on_play)
 
+        self._cancel: CancellationToken | None = None
+
+        self._stop_button = QPushButton("Stop", self)
+        self._stop_button.setEnabled(False)
+        _ = self._stop_button.clicked.connect(self._on_stop)
+
         self._save_button = QPushButton("Save", self)
         self._save_button.setIcon(QIcon(self._get_resource("download.svg")))
         _ = self._save_button.clicked.connect(self._on_save)
@@ -63,6 +70,7 @@ class Input(QWidget):
         bottom_layout.addStretch()
         bottom_layout.addWidget(self._use_ssml)
         bottom_layout.addWidget(self._play_button)
+        bottom_layout.addWidget(self._stop_button)
         bottom_layout.addWidget(self._save_button)
 
         layout = QVBoxLayout(self)
@@ -94,6 +102,13 @@ class Input(QWidget):
         self._play_button.setEnabled(not current_play)
         self._save_button.setEnabled(not current_save)
 
+    @Slot()
+    def _on_task_finished(self):
+        """Re-enable the Play and Save buttons and disable the Stop button."""
+        self._toggle_buttons()
+        self._stop_button.setEnabled(False)
+        self._cancel = None
+
     def _on_save(self):
         """Handle the submit button click by synthesizing speech or emitting error status."""
         service = TtsService.get_service()
@@ -108,11 +123,21 @@ class Input(QWidget):
         else:
             fn = service.save_text_to_file
 
+        cancel = CancellationToken()
+        self._cancel = cancel
         self._toggle_buttons()
+        self._stop_button.setEnabled(True)
         dispatch(
             self,
-            lambda: fn(self._input_field.toPlainText().strip(), self.status.emit),
-            finished_slot=self._toggle_buttons,
+            lambda: fn(
+                self._input_field.toPlainText().strip(),
+                self.status.emit,
+                cancel=cancel,
+            ),
+            finished_slot=self._on_task_finished,
+            priority=Priority.BULK,
+            resource=(type(service).__name__, service.max_concurrent_jobs),
+            name=fn.__name__,
         )
 
     def _on_play(self):
@@ -129,13 +154,82 @@ class Input(QWidget):
         else:
             fn = service.play_text
 
+        cancel = CancellationToken()
+        self._cancel = cancel
+        self._toggle_buttons()
+        self._stop_button.setEnabled(True)
+        dispatch(
+            self,
+            lambda: fn(
+                self._input_field.toPlainText().strip(),
+                self.status.emit,
+                cancel=cancel,
+            ),
+            finished_slot=self._on_task_finished,
+            priority=Priority.INTERACTIVE,
+            resource=(type(service).__name__, service.max_concurrent_jobs),
+            name=fn.__name__,
+        )
+
+    def resume_renders(self):
+        """Resume the interrupted render jobs of the current service one after another."""
+        if self._cancel is not None:
+            self.status.emit("Please wait for the current synthesis to finish.")
+            return
+
+        service = TtsService.get_service()
+        cancel = CancellationToken()
+
+        def resume_renders():
+            jobs = service.unfinished_renders()
+
+            if not jobs:
+                self.status.emit("No unfinished renders for the current voice.")
+                return
+
+            for index, job in enumerate(jobs):
+                if cancel.cancelled:
+                    break
+
+                self.status.emit(f"Resuming render {index + 1} of {len(jobs)}.")
+                _ = service.resume_render(job, self.status.emit, cancel)
+
+        self._cancel = cancel
         self._toggle_buttons()
+        self._stop_button.setEnabled(True)
         dispatch(
             self,
-            lambda: fn(self._input_field.toPlainText().strip(), self.status.emit),
-            finished_slot=self._toggle_buttons,
+            resume_renders,
+            finished_slot=self._on_task_finished,
+            priority=Priority.BULK,
+            resource=(type(service).__name__, service.max_concurrent_jobs),
         )
 
+    def check_unfinished_renders(self):
+        """Report interrupted render jobs of the current service that can be resumed."""
+        service = TtsService.get_service()
+
+        def check_unfinished_renders():
+            count = len(service.unfinished_renders())
+
+            if count:
+                self.status.emit(
+                    f"{count} unfinished render(s). "
+                    "Click Application -> Resume renders to continue."
+                )
+
+        dispatch(self, check_unfinished_renders, key="check_unfinished_renders")
+
+    def stop(self):
+        """Cancel the running synthesis and playback, if any."""
+        if self._cancel is not None:
+            self.status.emit("Stopping.")
+            self._cancel.cancel()
+
+    def _on_stop(self):
+        """Handle the stop button click by cancelling the running synthesis and playback."""
+        self.stop()
+
     def check_ssml(self):
         """Enable or disable SSML checkbox based on service support."""
         if isinstance(TtsService.get_service(), SsmlService):
@@ -0,0 +1,335 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Callable, TypeVar
+
+from PySide6.QtCore import QObject, Signal
+
+T = TypeVar("T")
+_logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Job priorities. Lower values run first."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+class Job(QObject):
+    """A queued function whose outcome is reported through signals on the main thread."""
+
+    success: Signal = Signal(object)
+    error: Signal = Signal(Exception)
+    finished: Signal = Signal()
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[], object],
+        priority: Priority,
+        resource: str | None,
+        key: str | None,
+        exclusive: bool,
+    ):
+        """Initialise the job.
+
+        Args:
+            name (str): Name of the job, for logging.
+            fn (Callable[[], object]): The function to run on a worker thread.
+            priority (Priority): The priority of the job.
+            resource (str | None): The engine the job uses, to limit concurrent jobs on it.
+            key (str | None): Jobs with the same key are coalesced while pending.
+            exclusive (bool): Whether the job must run alone, with no other job running.
+        """
+        super().__init__()
+        self.name: str = name
+        self.fn: Callable[[], object] = fn
+        self.priority: Priority = priority
+        self.resource: str | None = resource
+        self.key: str | None = key
+        self.exclusive: bool = exclusive
+        self.submitted: float = time.monotonic()
+
+
+@dataclass
+class SchedulerStats:
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    coalesced: int = 0
+    total_wait: float = 0
+    max_wait: float = 0
+    last_wait_by_priority: dict[str, float] = field(default_factory=dict)
+    """Seconds the last started job of each priority waited in the queue."""
+
+    @property
+    def mean_wait(self):
+        """Mean seconds jobs waited in the queue before starting."""
+        return self.total_wait / self.completed if self.completed else 0
+
+
+class JobScheduler:
+    """Runs jobs on a fixed pool of worker threads.
+
+    Pending jobs start in priority order, then submission order. A job using a resource only
+    starts while fewer jobs than the resource's limit are running on it, so torch engines can be
+    serialised while remote engines run several jobs at once. An exclusive job, such as
+    switching services, waits for running jobs to finish and holds back the jobs queued after
+    it. A job submitted with the key of a pending job is coalesced into it, and its callbacks
+    receive the outcome of that job.
+    """
+
+    WORKERS: int = max(2, min(4, os.cpu_count() or 1))
+    _instance: "JobScheduler | None" = None
+    _instance_lock: threading.Lock = threading.Lock()
+
+    def __init__(self, workers: int):
+        """Initialise the scheduler and start its worker threads.
+
+        Args:
+            workers (int): The number of worker threads.
+        """
+        self._condition: threading.Condition = threading.Condition()
+        self._pending: list[tuple[int, int, Job]] = []
+        self._sequence: itertools.count[int] = itertools.count()
+        self._keys: dict[str, Job] = {}
+        self._active: set[Job] = set()
+        self._limits: dict[str, int] = {}
+        self._running: dict[str, int] = {}
+        self._running_count: int = 0
+        self._exclusive_running: bool = False
+        self._stats: SchedulerStats = SchedulerStats()
+
+        for index in range(workers):
+            threading.Thread(
+                target=self._work, name=f"job-worker-{index}", daemon=True
+            ).start()
+
+    @classmethod
+    def instance(cls):
+        """Return the shared scheduler, starting it on first use.
+
+        Returns:
+            JobScheduler: The scheduler.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = JobScheduler(cls.WORKERS)
+
+            return cls._instance
+
+    def submit(
+        self,
+        job: Job,
+        connect: Callable[[Job], None],
+        limit: int | None = None,
+    ):
+        """Queue a job, or coalesce it into a pending job with the same key.
+
+        Args:
+            job (Job): The job to queue.
+            connect (Callable[[Job], None]): Connects the caller's slots to the job that will
+                run, before it can start.
+            limit (int | None): The maximum number of concurrent jobs on the job's resource.
+                Keeps the previous limit of the resource if None.
+        """
+        with self._condition:
+            if job.resource is not None and limit is not None:
+                self._limits[job.resource] = max(1, limit)
+
+            pending = self._keys.get(job.key) if job.key is not None else None
+
+            if pending is not None:
+                self._stats.coalesced += 1
+                _logger.info("Coalescing job. Job: %s", job.name)
+                connect(pending)
+                return
+
+            connect(job)
+            # Keep the job alive until its queued signals have been delivered.
+            self._active.add(job)
+            _ = job.finished.connect(job.deleteLater)
+            _ = job.destroyed.connect(lambda: self._active.discard(job))
+
+            if job.key is not None:
+                self._keys[job.key] = job
+
+            self._pending.append((job.priority, next(self._sequence), job))
+            self._stats.queued = len(self._pending)
+            _logger.info(
+                "Queued job. Job: %s, priority: %s, queue depth: %d, running: %d",
+                job.name,
+                job.priority.name,
+                len(self._pending),
+                self._running_count,
+            )
+            self._condition.notify_all()
+
+    def stats(self):
+        """Return a snapshot of the queue depth and wait time metrics.
+
+        Returns:
+            SchedulerStats: The metrics.
+        """
+        with self._condition:
+            return SchedulerStats(
+                len(self._pending),
+                self._running_count,
+                self._stats.completed,
+                self._stats.coalesced,
+                self._stats.total_wait,
+                self._stats.max_wait,
+                dict(self._stats.last_wait_by_priority),
+            )
+
+    def _next_job(self):
+        """Remove and return the first pending job that may start now.
+
+        Returns:
+            Job | None: The job, or None if no pending job may start.
+        """
+        if self._exclusive_running:
+            return None
+
+        # Jobs queued after an exclusive job wait for it, whatever their priority.
+        barrier = min(
+            (seq for _, seq, job in self._pending if job.exclusive), default=None
+        )
+
+        for entry in sorted(self._pending):
+            _, seq, job = entry
+
+            if barrier is not None and seq > barrier:
+                continue
+
+            if job.exclusive:
+                if self._running_count:
+                    # Hold back later jobs so the exclusive job is not starved.
+                    return None
+            elif job.resource is not None and self._running.get(
+                job.resource, 0
+            ) >= self._limits.get(job.resource, 1):
+                continue
+
+            self._pending.remove(entry)
+            return job
+
+        return None
+
+    def _work(self):
+        """Run jobs for the life of the process."""
+        while True:
+            with self._condition:
+                while (job := self._next_job()) is None:
+                    _ = self._condition.wait()
+
+                if job.key is not None and self._keys.get(job.key) is job:
+                    del self._keys[job.key]
+
+                if job.resource is not None:
+                    self._running[job.resource] = self._running.get(job.resource, 0) + 1
+
+                self._running_count += 1
+                self._exclusive_running = job.exclusive
+                wait = time.monotonic() - job.submitted
+                self._stats.total_wait += wait
+                self._stats.max_wait = max(self._stats.max_wait, wait)
+                self._stats.last_wait_by_priority[job.priority.name] = wait
+                self._stats.queued = len(self._pending)
+                _logger.info(
+                    "Starting job. Job: %s, waited: %.3fs, queue depth: %d, running: %d",
+                    job.name,
+                    wait,
+                    len(self._pending),
+                    self._running_count,
+                )
+
+            start = time.monotonic()
+
+            try:
+                job.success.emit(job.fn())
+            except Exception as e:
+                job.error.emit(e)
+            finally:
+                with self._condition:
+                    if job.resource is not None:
+                        self._running[job.resource] -= 1
+
+                    self._running_count -= 1
+                    self._exclusive_running = False
+                    self._stats.completed += 1
+                    self._condition.notify_all()
+
+                stats = self.stats()
+                _logger.info(
+                    "Finished job. Job: %s, ran: %.3fs, completed: %d, coalesced: %d, "
+                    "mean wait: %.3fs, max wait: %.3fs",
+                    job.name,
+                    time.monotonic() - start,
+                    stats.completed,
+                    stats.coalesced,
+                    stats.mean_wait,
+                    stats.max_wait,
+                )
+                job.finished.emit()
+
+
+def dispatch(
+    parent: QObject,
+    fn: Callable[[], T],
+    success_slot: Callable[[T], None] | None = None,
+    error_slot: Callable[[Exception], None] | None = None,
+    finished_slot: Callable[[], None] | None = None,
+    priority: Priority = Priority.NORMAL,
+    resource: tuple[str, int] | None = None,
+    key: str | None = None,
+    exclusive: bool = False,
+    name: str | None = None,
+):
+    """Helper to run a function on the shared job scheduler.
+
+    Parameters:
+        parent (QObject): The object the job is reported to. Its name is used for logging.
+        fn (callable): The function to execute on a worker thread.
+        success_slot (callable, optional): Slot to connect to the job's success signal.
+        error_slot (callable, optional): Slot to connect to the job's error signal.
+        finished_slot (callable, optional): Slot to connect to the job's finished signal.
+        priority (Priority): The priority of the job.
+        resource (tuple[str, int], optional): The engine the job uses and the maximum number of
+            concurrent jobs on it.
+        key (str, optional): Coalesces the job into a pending job with the same key.
+        exclusive (bool): Whether the job must run with no other job running.
+        name (str, optional): Name of the job for logging. Defaults to the function name.
+    """
+    job = Job(
+        f"{type(parent).__name__}.{name or getattr(fn, '__name__', 'job')}",
+        fn,
+        priority,
+        resource[0] if resource else None,
+        key,
+        exclusive,
+    )
+
+    def connect(target: Job):
+        if error_slot:
+            _ = target.error.connect(error_slot)
+        else:
+
+            def raise_error(e: Exception):
+                raise e
+
+            _ = target.error.connect(raise_error)
+
+        if success_slot:
+            _ = target.success.connect(success_slot)
+
+        if finished_slot:
+            _ = target.finished.connect(finished_slot)
+
+    JobScheduler.instance().submit(job, connect, resource[1] if resource else None)
@@ -1,4 +1,4 @@
-from PySide6.QtCore import Slot
+from PySide6.QtCore import Signal, Slot
 from PySide6.QtGui import QAction
 from PySide6.QtWidgets import (
     QMainWindow,
@@ -12,13 +12,15 @@ from exceptions import ServiceCreationException
 from services.tts_service import TtsService
 from widgets.input import Input
 from widgets.settings import Settings
-from widgets.task_worker import dispatch
+from widgets.job_scheduler import Priority, dispatch
 from widgets.voice_selector import VoiceSelector
 
 
 class MainWindow(QMainWindow):
     """Main application window."""
 
+    _voices_refreshed: Signal = Signal(list)
+
     def __init__(self):
         super().__init__()
 
@@ -36,11 +38,16 @@ class MainWindow(QMainWindow):
         self._settings: Settings = Settings(self)
         _ = self._settings.accepted.connect(self.on_settings_accept)
         _ = self._settings.status.connect(self.statusBar().showMessage)
-        _ = (
-            self.menuBar()
-            .addMenu("&Application")
-            .addAction("&Settings")
-            .triggered.connect(self._settings.open)
+        application_menu = self.menuBar().addMenu("&Application")
+        _ = application_menu.addAction("&Settings").triggered.connect(
+            self._settings.open
+        )
+        _ = application_menu.addAction("&Refresh voices").triggered.connect(
+            self._on_refresh_voices
+        )
+        resume_renders = application_menu.addAction("Resume re&nders")
+        _ = application_menu.addAction("Cache s&tatistics").triggered.connect(
+            self._on_cache_statistics
         )
 
         self._voice_selector: VoiceSelector = VoiceSelector(self.centralWidget())
@@ -50,6 +57,10 @@ class MainWindow(QMainWindow):
 
         self._input: Input = Input(self.centralWidget())
         _ = self._input.status.connect(lambda msg: self.statusBar().showMessage(msg))
+        _ = resume_renders.triggered.connect(self._input.resume_renders)
+
+        _ = self._voices_refreshed.connect(self._voice_selector.load_voices)
+        TtsService.set_voices_listener(self._voices_refreshed.emit)
 
         self._main_layout: QVBoxLayout = QVBoxLayout(self.centralWidget())
         self._main_layout.addWidget(self._voice_selector)
@@ -58,7 +69,12 @@ class MainWindow(QMainWindow):
 
     @Slot()
     def on_settings_accept(self):
-        """Block UI then switch services and get voices asynchronously."""
+        """Stop running synthesis, block UI, then switch services and get voices.
+
+        The switch waits for running jobs to finish, and the blocked UI cannot stop them, so
+        they are stopped first.
+        """
+        self._input.stop()
 
         def switch_service():
             TtsService.switch(self._settings.selected_service)
@@ -69,6 +85,8 @@ class MainWindow(QMainWindow):
             switch_service,
             success_slot=self._on_services_switched,
             error_slot=self._on_services_switch_error,
+            key="switch_service",
+            exclusive=True,
         )
         _ = self._msg_box.exec()
 
@@ -82,6 +100,24 @@ class MainWindow(QMainWindow):
         self._input.check_ssml()
         self._voice_selector.load_voices(voices)
         self._msg_box.accept()
+        self._input.check_unfinished_renders()
+        self._warm_up_service()
+
+    def _warm_up_service(self):
+        """Warm up the engine of the current service in the background, after other work."""
+        service = TtsService.get_service()
+
+        if not service.needs_warm_up:
+            return
+
+        dispatch(
+            self,
+            service.warm_up,
+            priority=Priority.BULK,
+            resource=(type(service).__name__, service.max_concurrent_jobs),
+            key="warm_up",
+            name="warm_up",
+        )
 
     @Slot(Exception)
     def _on_services_switch_error(self, e: Exception):
@@ -92,3 +128,47 @@ class MainWindow(QMainWindow):
             )
         else:
             raise e
+
+    @Slot()
+    def _on_refresh_voices(self):
+        """Fetch the voices of the current service again asynchronously."""
+        self.statusBar().showMessage("Refreshing voices.")
+
+        def refresh_voices():
+            return TtsService.get_service().refresh_voices()
+
+        dispatch(
+            self,
+            refresh_voices,
+            success_slot=self._on_voices_refreshed,
+            error_slot=self._on_refresh_voices_error,
+            key="refresh_voices",
+        )
+
+    @Slot(list)
+    def _on_voices_refreshed(self, voices: list[tuple[str, str]]):
+        """Load refreshed voices into the voice selector.
+
+        Args:
+            voices (list[tuple[str, str]]): List of available voices.
+        """
+        self._voice_selector.load_voices(voices)
+        self.statusBar().showMessage("Voices refreshed.")
+
+    @Slot(Exception)
+    def _on_refresh_voices_error(self, e: Exception):
+        self.statusBar().showMessage(f"Refreshing voices failed. {e}")
+
+    @Slot()
+    def _on_cache_statistics(self):
+        """Show the hit rate and size of the synthesis cache in the status bar."""
+        stats = TtsService.cache().stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups if lookups else 0
+        self.statusBar().showMessage(
+            f"Synthesis cache. Hits: {stats['hits']}, misses: {stats['misses']} "
+            f"({hit_rate:.0%} hit rate). "
+            f"Memory: {stats['memory_entries']} entries, "
+            f"{stats['memory_bytes'] >> 20} MB. "
+            f"Disk: {stats['disk_entries']} entries, {stats['disk_bytes'] >> 20} MB."
+        )
@@ -7,11 +7,14 @@ from PySide6.QtWidgets import (
     QDialog,
     QDialogButtonBox,
     QFormLayout,
+    QGroupBox,
     QLineEdit,
+    QSpinBox,
     QVBoxLayout,
     QWidget,
 )
 
+from services.audio_encoder import AudioEncoder
 from services.tts_service import Services, TtsService
 from settings import settings
 
@@ -25,22 +28,59 @@ class Settings(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Settings")
 
-        self.selected_service: Services
+        self.selected_service: Services = self._saved_service()
         self._inputs: dict[str, QLineEdit] = {}
         self._field_keys: dict[str, str] = {}
 
         self._service_selector: QComboBox = QComboBox(self)
 
         for service in Services:
-            self._service_selector.addItem(service.name.capitalize(), service)
+            self._service_selector.addItem(
+                service.name.replace("_", " ").capitalize(), service
+            )
 
+        self._service_selector.setCurrentIndex(
+            self._service_selector.findData(self.selected_service)
+        )
         _ = self._service_selector.currentIndexChanged.connect(self.on_service_changed)
 
         form: QWidget = QWidget(self)
         self._form_layout: QFormLayout = QFormLayout()
         self._form_layout.addRow("&Service", self._service_selector)
         form.setLayout(self._form_layout)
-        self.reset_form()
+
+        self._format_selector: QComboBox = QComboBox(self)
+
+        for name, audio_format in AudioEncoder.FORMATS.items():
+            self._format_selector.addItem(audio_format.name, name)
+
+        self._compression: QSpinBox = QSpinBox(self)
+        self._compression.setRange(0, 100)
+        self._compression.setToolTip(
+            "0 is the largest and best quality, 100 the smallest. Ignored by WAV."
+        )
+        self._sample_format_selector: QComboBox = QComboBox(self)
+
+        for sample_format in AudioEncoder.SAMPLE_FORMATS:
+            self._sample_format_selector.addItem(sample_format, sample_format)
+
+        saving = QGroupBox("Saving", self)
+        saving_layout = QFormLayout(saving)
+        saving_layout.addRow("&Format", self._format_selector)
+        saving_layout.addRow("&Compression", self._compression)
+        saving_layout.addRow("Sample f&ormat", self._sample_format_selector)
+
+        self._playback_buffer: QSpinBox = QSpinBox(self)
+        self._playback_buffer.setSuffix(" ms")
+        self._playback_buffer.setToolTip(
+            "Shorter buffers start playing sooner but may stutter on a busy system."
+        )
+        playback = QGroupBox("Playback", self)
+        playback_layout = QFormLayout(playback)
+        playback_layout.addRow("&Buffer", self._playback_buffer)
+        # The fields are filled when the dialog is shown, since building the service fields
+        # imports the service module and its engine, and the playback fields import the
+        # playback engine.
 
         buttons = QDialogButtonBox(
             (
@@ -54,6 +94,8 @@ class Settings(QDialog):
 
         layout = QVBoxLayout(self)
         layout.addWidget(form)
+        layout.addWidget(saving)
+        layout.addWidget(playback)
         layout.addWidget(buttons)
         self.setLayout(layout)
 
@@ -75,7 +117,9 @@ class Settings(QDialog):
             editor.setText(str(settings.value(key, "")))
             self._inputs[name] = editor
             self._field_keys[name] = key
-            self._form_layout.addRow(f"&{name.capitalize()}", editor)
+            self._form_layout.addRow(
+                f"&{name.replace('_', ' ').capitalize()}", editor
+            )
 
     @Slot(int)
     def on_service_changed(self, index: int):
@@ -83,24 +127,39 @@ class Settings(QDialog):
         self.selected_service = self._service_selector.itemData(index)
         self.build_form()
 
-    def reset_form(self):
-        """
-        Reset form fields based on saved service in QSettings. Uses default for new users.
-        """
+    def _saved_service(self):
+        """Returns the saved service in QSettings. Uses default for new users."""
         try:
-            service = Services(settings.value("service"))
+            return Services(settings.value("service"))
         except ValueError:
             self.status.emit(
                 "Loading saved service failed. Invalid service. Using default service."
             )
-            service = TtsService.DEFAULT_SERVICE
+            return TtsService.DEFAULT_SERVICE
 
-        self.selected_service = service
+    def reset_form(self):
+        """
+        Reset form fields based on saved service in QSettings. Uses default for new users.
+        """
+        self.selected_service = self._saved_service()
         self._service_selector.setCurrentIndex(
             self._service_selector.findData(self.selected_service)
         )
         self.build_form()
 
+        encoder = AudioEncoder.from_settings()
+        self._format_selector.setCurrentIndex(
+            self._format_selector.findData(encoder.format_name)
+        )
+        self._compression.setValue(encoder.compression)
+        self._sample_format_selector.setCurrentIndex(
+            self._sample_format_selector.findData(encoder.sample_format)
+        )
+        from services.playback_engine import PlaybackEngine
+
+        self._playback_buffer.setRange(PlaybackEngine.FEED_INTERVAL_MS, 2000)
+        self._playback_buffer.setValue(PlaybackEngine.buffer_ms())
+
     @override
     def showEvent(self, event: QShowEvent):
         """Reset form to saved settings when dialog is shown"""
@@ -109,9 +168,17 @@ class Settings(QDialog):
 
     @override
     def accept(self):
+        from services.playback_engine import PlaybackEngine
+
         for field, editor in self._inputs.items():
             value = editor.text()
             settings.setValue(self._field_keys[field], value)
 
         settings.setValue("service", self.selected_service.value)
+        settings.setValue(AudioEncoder.FORMAT_KEY, self._format_selector.currentData())
+        settings.setValue(AudioEncoder.COMPRESSION_KEY, self._compression.value())
+        settings.setValue(
+            AudioEncoder.SAMPLE_FORMAT_KEY, self._sample_format_selector.currentData()
+        )
+        settings.setValue(PlaybackEngine.BUFFER_KEY, self._playback_buffer.value())
         super().accept()
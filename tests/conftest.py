@@ -0,0 +1,30 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Settings, caches, logs and renders of the code under test go to a temporary data directory
+# instead of the data folder of the repository.
+DATA_DIR = tempfile.mkdtemp(prefix="vocalscript-tests-")
+os.environ["VOCALSCRIPT_DATA_DIR"] = DATA_DIR
+_ = os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def pytest_sessionfinish():
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def cache(tmp_path: Path):
+    """Give every service a fresh synthesis cache on disk for the test."""
+    from services.synthesis_cache import SynthesisCache
+    from services.tts_service import TtsService
+
+    folder = tmp_path / "cache"
+    folder.mkdir()
+    previous = TtsService._cache
+    TtsService._cache = SynthesisCache(folder, 1 << 20, 1 << 20)
+    yield TtsService._cache
+    TtsService._cache = previous
@@ -0,0 +1,100 @@
+import time
+from typing import Iterator, override
+
+import numpy
+
+from services.cancellation import CancellationToken
+from services.pcm_buffer import PcmBuffer
+from services.tts_service import Services, Setting, TtsService
+
+CHUNK_SAMPLES = 160
+
+
+class StubService(TtsService[numpy.ndarray]):
+    """Service synthesising a fixed number of float chunks per text, recording each text."""
+
+    def __init__(self, voice: str = "stub", chunks: int = 1, delay: float = 0):
+        """Initialise the service.
+
+        Args:
+            voice (str): The voice to use, as passed when switching services.
+            chunks (int): Chunks synthesised per text.
+            delay (float): Seconds each chunk takes to synthesise.
+        """
+        super().__init__()
+        self._voice: str = voice
+        self.chunks: int = chunks
+        self.delay: float = delay
+        self.synthesised: list[str] = []
+        self.produced: int = 0
+
+    @classmethod
+    @override
+    def type(cls):
+        return Services.KOKORO
+
+    @classmethod
+    @override
+    def setting_fields(cls) -> list[Setting]:
+        return []
+
+    @classmethod
+    @override
+    def _default_voice(cls):
+        return "stub"
+
+    @property
+    @override
+    def voices(self):
+        return [("Stub", "stub")]
+
+    @property
+    @override
+    def voice(self):
+        return self._voice
+
+    @voice.setter
+    @override
+    def voice(self, voice: str):
+        self._voice = voice
+
+    @property
+    @override
+    def sample_rate(self):
+        return 16000
+
+    @override
+    def _stream_text_implementation(
+        self, text: str, cancel: CancellationToken
+    ) -> Iterator[numpy.ndarray]:
+        self.synthesised.append(text)
+
+        for index in range(self.chunks):
+            cancel.raise_if_cancelled()
+            time.sleep(self.delay)
+            self.produced += 1
+            yield numpy.full(CHUNK_SAMPLES, (index % 100) / 100, dtype=numpy.float32)
+
+    @override
+    def _join_chunks(self, chunks: list[numpy.ndarray]):
+        return numpy.concatenate(chunks)
+
+    @override
+    def _get_samples(self, data: numpy.ndarray):
+        return data
+
+    @override
+    def _get_pcm(self, data: numpy.ndarray):
+        return PcmBuffer.from_float(data)
+
+    @override
+    def _to_bytes(self, data: numpy.ndarray):
+        return data.astype(numpy.float32).tobytes()
+
+    @override
+    def _from_bytes(self, data: bytes):
+        return numpy.frombuffer(data, dtype=numpy.float32).copy()
+
+    @override
+    def _has_information(self):
+        return True
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import numpy
+import pytest
+
+_ = pytest.importorskip("PySide6")
+soundfile = pytest.importorskip("soundfile")
+
+from exceptions import EncodingException  # noqa: E402
+from services.audio_encoder import AudioEncoder  # noqa: E402
+
+SAMPLE_RATE = 24000
+
+
+def _tone(seconds: float = 0.5):
+    time = numpy.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (0.5 * numpy.sin(2 * numpy.pi * 440 * time)).astype(numpy.float32)
+
+
+@pytest.mark.parametrize("format_name", list(AudioEncoder.FORMATS))
+def test_every_format_encodes_readable_audio(tmp_path: Path, format_name: str):
+    encoder = AudioEncoder(format_name, 50, "int16")
+    file = tmp_path / f"tone.{encoder.extension}"
+    encoder.write(file, _tone(), SAMPLE_RATE)
+
+    info = soundfile.info(str(file))
+
+    assert info.samplerate == SAMPLE_RATE
+    assert info.channels == 1
+    assert info.duration == pytest.approx(0.5, abs=0.1)
+
+
+def test_lossless_formats_keep_the_sample_format(tmp_path: Path):
+    samples = _tone()
+
+    for sample_format, subtype in [("int16", "PCM_16"), ("float32", "FLOAT")]:
+        file = tmp_path / f"{sample_format}.wav"
+        AudioEncoder("wav", 50, sample_format).write(file, samples, SAMPLE_RATE)
+        data, _ = soundfile.read(str(file), dtype="float32")
+
+        assert soundfile.info(str(file)).subtype == subtype
+        assert numpy.allclose(data, samples, atol=1e-4)
+
+
+def test_compression_shrinks_lossy_files(tmp_path: Path):
+    sizes: list[int] = []
+
+    for compression in (0, 100):
+        file = tmp_path / f"{compression}.ogg"
+        AudioEncoder("vorbis", compression, "int16").write(
+            file, _tone(2), SAMPLE_RATE
+        )
+        sizes.append(file.stat().st_size)
+
+    assert sizes[1] < sizes[0]
+
+
+def test_invalid_settings_fall_back_to_the_defaults():
+    encoder = AudioEncoder("aiff", 150, "int8")
+
+    assert encoder.format_name == AudioEncoder.DEFAULT_FORMAT
+    assert encoder.sample_format == AudioEncoder.DEFAULT_SAMPLE_FORMAT
+    assert encoder.compression == 100
+    assert encoder.extension == "wav"
+
+
+def test_existing_files_are_not_overwritten(tmp_path: Path):
+    file = tmp_path / "tone.wav"
+    _ = file.write_bytes(b"keep")
+
+    with pytest.raises(FileExistsError):
+        AudioEncoder("wav", 50, "int16").write(file, _tone(), SAMPLE_RATE)
+
+    assert file.read_bytes() == b"keep"
+
+
+def test_failed_encoding_leaves_no_file(tmp_path: Path):
+    file = tmp_path / "tone.opus"
+
+    with pytest.raises(EncodingException):
+        AudioEncoder("opus", 50, "int16").write(file, _tone(), 44100)
+
+    assert not file.exists()
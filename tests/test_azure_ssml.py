@@ -0,0 +1,43 @@
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+_ = pytest.importorskip("azure.cognitiveservices.speech")
+
+from services.azure import SSML_NAMESPACES, Azure  # noqa: E402
+
+SSML = (
+    '<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" '
+    'xmlns:mstts="http://www.w3.org/2001/mstts" xml:lang="en-US">'
+    '<voice name="en-US-AvaNeural">'
+    "<p>First paragraph, long enough to fill a segment.</p>"
+    '<p><mstts:express-as style="cheerful">Second paragraph.</mstts:express-as></p>'
+    "</voice></speak>"
+)
+
+
+def test_split_keeps_the_namespace_prefixes():
+    segments = Azure._split_ssml(SSML, 50)
+
+    assert len(segments) == 2
+    assert all(segment.startswith('<speak xmlns="') for segment in segments)
+    assert "<mstts:express-as" in segments[1]
+    assert "ns0" not in "".join(segments)
+
+
+def test_split_keeps_the_voice_and_text_of_every_paragraph():
+    segments = Azure._split_ssml(SSML, 50)
+    voices = [
+        ElementTree.fromstring(segment).find("voice", {"": SSML_NAMESPACES[""]})
+        for segment in segments
+    ]
+
+    assert [voice.get("name") for voice in voices] == ["en-US-AvaNeural"] * 2
+    assert "".join("".join(voice.itertext()) for voice in voices) == (
+        "First paragraph, long enough to fill a segment.Second paragraph."
+    )
+
+
+def test_documents_that_cannot_be_parsed_are_not_split():
+    assert Azure._split_ssml("<speak>unclosed", 5) == ["<speak>unclosed"]
@@ -0,0 +1,219 @@
+import ctypes
+import os
+import queue
+import threading
+import time
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+speech = pytest.importorskip("azure.cognitiveservices.speech")
+
+from exceptions import SynthesisCancelledException  # noqa: E402
+from services import azure  # noqa: E402
+from services.azure import Azure  # noqa: E402
+from services.cancellation import CancellationToken  # noqa: E402
+
+CHUNK_INTERVAL = 0.02
+
+
+class TimedStream:
+    """Audio data stream that emits chunks on a timer.
+
+    Like the SDK stream, it writes each chunk into the read buffer in place.
+    """
+
+    def __init__(self, chunks: list[bytes]):
+        self._chunks: queue.SimpleQueue[bytes | None] = queue.SimpleQueue()
+        self.finished: float | None = None
+        self.status = speech.StreamStatus.AllData
+        self.cancellation_details = None
+        self.stopped = threading.Event()
+        self.stop_waited = False
+        threading.Thread(target=self._emit, args=(chunks,), daemon=True).start()
+
+    def _emit(self, chunks: list[bytes]):
+        for chunk in chunks:
+            if self.stopped.is_set():
+                break
+
+            time.sleep(CHUNK_INTERVAL)
+            self._chunks.put(chunk)
+
+        self.finished = time.perf_counter()
+        self._chunks.put(None)
+
+    def read_data(self, buffer: bytes):
+        chunk = self._chunks.get()
+
+        if chunk is None:
+            return 0
+
+        _ = ctypes.memmove(buffer, chunk, len(chunk))
+        return len(chunk)
+
+
+class StubResult:
+    reason = speech.ResultReason.SynthesizingAudioStarted
+    cancellation_details = None
+
+    def __init__(self, stream: TimedStream):
+        self.stream: TimedStream = stream
+
+
+class StubFuture:
+    def __init__(self, result: object = None):
+        self._result: object = result
+
+    def get(self):
+        return self._result
+
+
+class StopFuture:
+    def __init__(self, stream: TimedStream):
+        self._stream: TimedStream = stream
+
+    def get(self):
+        self._stream.stop_waited = True
+
+
+class StubProperties:
+    def __init__(self):
+        self._values: dict[speech.PropertyId, str] = {}
+
+    def get_property(self, property_id: speech.PropertyId):
+        return self._values.get(property_id, "")
+
+    def set_property(self, property_id: speech.PropertyId, value: str):
+        self._values[property_id] = value
+
+
+class StubSynthesizer:
+    """Synthesizer whose syntheses emit the next of a list of streams."""
+
+    def __init__(self, speech_config, streams: list[TimedStream]):
+        self._streams: list[TimedStream] = streams
+        self.stream: TimedStream | None = None
+        self.properties = StubProperties()
+
+        for property_id in (
+            speech.PropertyId.SpeechServiceConnection_Key,
+            speech.PropertyId.SpeechServiceConnection_Endpoint,
+            speech.PropertyId.SpeechServiceConnection_SynthVoice,
+        ):
+            self.properties.set_property(
+                property_id, speech_config.get_property(property_id)
+            )
+
+    def start_speaking_text_async(self, text: str):
+        self.stream = self._streams.pop(0)
+        return StubFuture(StubResult(self.stream))
+
+    def stop_speaking_async(self):
+        assert self.stream is not None, "Synthesis should have started."
+        self.stream.stopped.set()
+        return StopFuture(self.stream)
+
+
+@pytest.fixture
+def streams(monkeypatch: pytest.MonkeyPatch):
+    """Streams emitted by the syntheses of Azure services, in order."""
+    streams: list[TimedStream] = []
+    monkeypatch.setattr(
+        azure,
+        "SpeechSynthesizer",
+        lambda speech_config, audio_config: StubSynthesizer(speech_config, streams),
+    )
+    monkeypatch.setattr(azure, "AudioDataStream", lambda result: result.stream)
+    return streams
+
+
+def _create_azure(concurrency: int = 4):
+    return Azure(
+        "en-US-AvaNeural",
+        "key",
+        "https://localhost/tts",
+        str(concurrency),
+        str(Azure.DEFAULT_SEGMENT_LENGTH),
+        Azure.DEFAULT_OUTPUT_FORMAT,
+    )
+
+
+def _chunks(count: int):
+    return [os.urandom(Azure.STREAM_BUFFER_SIZE) for _ in range(count)]
+
+
+def test_stream_yields_every_chunk_unchanged(streams: list[TimedStream]):
+    chunks = _chunks(5)
+    streams.append(TimedStream(chunks))
+    service = _create_azure()
+
+    streamed = list(service._stream_text_implementation("Hello", CancellationToken()))
+
+    assert streamed == chunks
+    assert len({id(chunk) for chunk in streamed}) == len(chunks)
+
+
+def test_first_chunk_is_yielded_before_synthesis_finishes(
+    streams: list[TimedStream],
+):
+    stream = TimedStream(_chunks(10))
+    streams.append(stream)
+    service = _create_azure()
+
+    first = next(service._stream_text_implementation("Hello", CancellationToken()))
+    received = time.perf_counter()
+
+    assert first
+    assert stream.finished is None or received < stream.finished
+
+
+def test_cancelling_stops_the_synthesizer(streams: list[TimedStream]):
+    stream = TimedStream(_chunks(10))
+    streams.append(stream)
+    service = _create_azure()
+    cancel = CancellationToken()
+    streamed = service._stream_text_implementation("Hello", cancel)
+    _ = next(streamed)
+
+    cancel.cancel()
+
+    with pytest.raises(SynthesisCancelledException):
+        _ = list(streamed)
+
+    assert stream.stopped.is_set()
+
+
+def test_cancelling_one_synthesis_leaves_concurrent_ones_running(
+    streams: list[TimedStream],
+):
+    cancelled_stream = TimedStream(_chunks(10))
+    chunks = _chunks(10)
+    running_stream = TimedStream(chunks)
+    streams.extend([cancelled_stream, running_stream])
+    service = _create_azure()
+    cancel = CancellationToken()
+    cancelled = service._stream_text_implementation("Hello", cancel)
+    running = service._stream_text_implementation("World", CancellationToken())
+    _ = next(cancelled)
+    first = next(running)
+
+    cancel.cancel()
+
+    assert [first, *running] == chunks
+    assert cancelled_stream.stopped.is_set()
+    assert not running_stream.stopped.is_set()
+
+
+def test_closing_the_stream_waits_for_the_synthesis_to_stop(
+    streams: list[TimedStream],
+):
+    stream = TimedStream(_chunks(10))
+    streams.append(stream)
+    service = _create_azure()
+    streamed = service._stream_text_implementation("Hello", CancellationToken())
+    _ = next(streamed)
+
+    streamed.close()
+
+    assert stream.stop_waited
@@ -0,0 +1,71 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+
+from exceptions import SynthesisCancelledException  # noqa: E402
+from services.cancellation import CancellationToken  # noqa: E402
+from stub_service import StubService  # noqa: E402
+
+
+def test_callbacks_run_once_on_cancel():
+    cancel = CancellationToken()
+    calls: list[str] = []
+    _ = cancel.on_cancel(lambda: calls.append("first"))
+    unregister = cancel.on_cancel(lambda: calls.append("unregistered"))
+    unregister()
+
+    cancel.cancel()
+    cancel.cancel()
+
+    assert calls == ["first"]
+    assert cancel.cancelled
+
+
+def test_callbacks_registered_after_cancel_run_immediately():
+    cancel = CancellationToken()
+    cancel.cancel()
+    calls: list[str] = []
+
+    _ = cancel.on_cancel(lambda: calls.append("late"))
+
+    assert calls == ["late"]
+
+    with pytest.raises(SynthesisCancelledException):
+        cancel.raise_if_cancelled()
+
+
+def test_failing_callbacks_do_not_stop_the_others():
+    cancel = CancellationToken()
+    calls: list[str] = []
+
+    def fail():
+        raise RuntimeError("callback failed")
+
+    _ = cancel.on_cancel(fail)
+    _ = cancel.on_cancel(lambda: calls.append("second"))
+    cancel.cancel()
+
+    assert calls == ["second"]
+
+
+def test_cancelled_save_stops_synthesis_and_caches_nothing(cache, tmp_path: Path):
+    service = StubService(chunks=10_000, delay=0.001)
+    cancel = CancellationToken()
+    statuses: list[str] = []
+    timer = threading.Timer(0.05, cancel.cancel)
+    timer.start()
+
+    saved = service.save_text_to_file(
+        "Hello there.", statuses.append, tmp_path / "hello.wav", cancel
+    )
+    timer.join()
+
+    assert saved is None
+    assert statuses[-1] == "Synthesis stopped."
+    assert 0 < service.produced < service.chunks
+    assert not (tmp_path / "hello.wav").exists()
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["memory_entries"] == 0
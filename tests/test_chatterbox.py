@@ -0,0 +1,114 @@
+from pathlib import Path
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+torch = pytest.importorskip("torch")
+_ = pytest.importorskip("chatterbox")
+
+from services import chatterbox  # noqa: E402
+from services.cancellation import CancellationToken  # noqa: E402
+from services.chatterbox import Chatterbox  # noqa: E402
+
+
+class StubConditionals:
+    """Conditionals naming the sample they were prepared from."""
+
+    def __init__(self, sample: str):
+        self.sample: str = sample
+
+    def save(self, file: Path):
+        _ = file.write_text(self.sample, encoding="utf-8")
+
+    @classmethod
+    def load(cls, file: Path, map_location: str):
+        return cls(file.read_text(encoding="utf-8"))
+
+
+class StubModel:
+    """Model recording the models loaded, the samples embedded and the voices spoken."""
+
+    loaded: int = 0
+    prepared: list[str] = []
+
+    def __init__(self):
+        self.conds: StubConditionals | None = StubConditionals("default")
+        self.spoken: list[str] = []
+        self.t3: object = object()
+        self.s3gen: object = object()
+
+    @classmethod
+    def from_pretrained(cls, device: str):
+        cls.loaded += 1
+        return cls()
+
+    def prepare_conditionals(self, sample: str):
+        StubModel.prepared.append(sample)
+        self.conds = StubConditionals(sample)
+
+    def generate(self, text: str):
+        assert self.conds is not None
+        self.spoken.append(self.conds.sample)
+        return torch.zeros(1, 10)
+
+
+@pytest.fixture
+def sample(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Load the stub model in a fresh data directory, returning a sample voice file."""
+    monkeypatch.setenv("VOCALSCRIPT_DATA_DIR", str(tmp_path / "data"))
+    (tmp_path / "data").mkdir()
+    monkeypatch.setattr(chatterbox, "ChatterboxTTS", StubModel)
+    monkeypatch.setattr(chatterbox, "Conditionals", StubConditionals)
+    monkeypatch.setattr(StubModel, "loaded", 0)
+    monkeypatch.setattr(StubModel, "prepared", [])
+    sample = tmp_path / "sample.wav"
+    _ = sample.write_bytes(b"sample")
+    return sample
+
+
+def _create_chatterbox(sample: Path):
+    return Chatterbox(
+        Chatterbox.CLONE_VOICE,
+        str(sample),
+        "1",
+        "auto",
+        "",
+        "true",
+        "false",
+        "false",
+        "false",
+    )
+
+
+def test_sample_voice_is_embedded_once_and_shares_the_model(sample: Path):
+    service = _create_chatterbox(sample)
+
+    _ = list(service._stream_clone_implementation("Hello.", CancellationToken()))
+    _ = list(service._stream_text_implementation("Hello.", CancellationToken()))
+    _ = list(service._stream_clone_implementation("Again.", CancellationToken()))
+
+    assert StubModel.loaded == 1
+    assert StubModel.prepared == [str(sample)]
+    assert service._chatterbox.spoken == [str(sample), "default", str(sample)]
+
+
+def test_conditionals_are_loaded_from_disk_by_a_new_engine(sample: Path):
+    _ = list(
+        _create_chatterbox(sample)._stream_clone_implementation(
+            "Hello.", CancellationToken()
+        )
+    )
+    service = _create_chatterbox(sample)
+    _ = list(service._stream_clone_implementation("Hello.", CancellationToken()))
+
+    assert StubModel.prepared == [str(sample)]
+    assert service._chatterbox.spoken == [str(sample)]
+
+
+def test_changing_the_sample_content_embeds_it_again(sample: Path):
+    service = _create_chatterbox(sample)
+    _ = list(service._stream_clone_implementation("Hello.", CancellationToken()))
+    _ = sample.write_bytes(b"other sample")
+    _ = list(service._stream_clone_implementation("Hello.", CancellationToken()))
+
+    assert StubModel.prepared == [str(sample), str(sample)]
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+_ = pytest.importorskip("soundfile")
+
+import cli  # noqa: E402
+from services.tts_service import TtsService  # noqa: E402
+from stub_service import StubService  # noqa: E402
+
+
+def _write(path: Path, text: str = "Hello."):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _ = path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_files_in_directories_are_named_by_their_relative_path(tmp_path: Path):
+    first = _write(tmp_path / "book" / "a" / "ch1.txt")
+    second = _write(tmp_path / "book" / "b" / "ch1.txt")
+    single = _write(tmp_path / "notes.v2.txt")
+
+    inputs = cli._collect_inputs([tmp_path / "book", single], "**/*.txt")
+
+    assert inputs == [
+        (first, Path("a/ch1")),
+        (second, Path("b/ch1")),
+        (single, Path("notes.v2")),
+    ]
+    assert cli._find_collision(inputs) is None
+
+
+def test_inputs_saved_under_the_same_name_are_refused(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
+    _ = pytest.importorskip("azure.cognitiveservices.speech")
+    first = _write(tmp_path / "a" / "ch1.txt")
+    second = _write(tmp_path / "b" / "ch1.txt")
+    output = tmp_path / "out"
+
+    code = cli.synth(
+        [str(first), str(second), "--service", "azure", "--output", str(output)]
+    )
+
+    assert code == 2
+    assert "would both be saved as ch1" in capsys.readouterr().err
+    assert not output.exists()
+
+
+def test_workers_render_with_their_share_of_threads(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, cache: object
+):
+    monkeypatch.setattr(TtsService, "auto_threads", None)
+    monkeypatch.setattr(TtsService, "_current_service", None)
+    monkeypatch.setattr(TtsService, "_registry", None)
+    monkeypatch.setattr(
+        TtsService, "get_service_class", classmethod(lambda cls, service: StubService)
+    )
+    source = _write(tmp_path / "ch1.txt", "Hello there.")
+    output = tmp_path / "out" / "a" / "ch1"
+    output.parent.mkdir(parents=True)
+
+    cli._init_worker("kokoro", None, False, None, 3)
+    result = cli._render(source, output)
+
+    assert TtsService.auto_threads == 3
+    assert result.status == "Saved."
+    assert result.output is not None
+    assert result.output.parent == output.parent
+    assert result.output.name.startswith("ch1.")
+    assert result.audio_seconds > 0
@@ -0,0 +1,102 @@
+from pathlib import Path
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+torch = pytest.importorskip("torch")
+
+from torch import Tensor, nn  # noqa: E402
+
+from services.compilation import BucketedModule, Bucketing, GraphCompiler  # noqa: E402
+from services.quantization import QuantizationReport  # noqa: E402
+from services.torch_tuning import TorchTuning  # noqa: E402
+
+
+class Masked(nn.Module):
+    """Scales the valid positions of its input, recording the lengths it gets."""
+
+    def __init__(self):
+        super().__init__()
+        self.lengths: list[int] = []
+        self.scale: float = 2
+
+    def forward(self, x: Tensor, mask: Tensor):
+        self.lengths.append(x.shape[-1])
+        return x * mask * self.scale
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.decoder: nn.Module = nn.Sequential(nn.Linear(4, 4))
+        self.estimator: Masked = Masked()
+
+
+@pytest.mark.parametrize(
+    "length, bucket", [(1, 16), (16, 16), (17, 32), (100, 112), (1000, 1024)]
+)
+def test_lengths_round_up_to_their_bucket(length: int, bucket: int):
+    assert BucketedModule.bucket(length) == bucket
+
+
+def test_buckets_add_at_most_a_quarter_of_padding():
+    buckets = {BucketedModule.bucket(length) for length in range(1, 4097)}
+
+    for length in range(BucketedModule.MIN_BUCKET * 4, 4097):
+        assert length <= BucketedModule.bucket(length) <= length * 1.25
+
+    assert len(buckets) <= 32
+
+
+def test_bucketed_modules_pad_their_inputs_and_cut_the_output():
+    masked = Masked()
+    wrapper = BucketedModule(masked, Bucketing({0: -1, "mask": -1}, -1))
+    x = torch.arange(20, dtype=torch.float32).reshape(1, 20)
+
+    output = wrapper(x, mask=torch.ones(1, 20))
+
+    assert masked.lengths == [32]
+    assert torch.equal(output, x * 2)
+    assert wrapper.scale == 2
+
+
+def test_compiling_replaces_bucketed_submodules(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv("VOCALSCRIPT_DATA_DIR", str(tmp_path))
+    monkeypatch.delenv("TORCHINDUCTOR_CACHE_DIR", raising=False)
+    monkeypatch.setattr(GraphCompiler, "is_supported", classmethod(lambda cls: True))
+    model = Model()
+
+    assert GraphCompiler("model").apply(
+        model, ["decoder"], {"estimator": Bucketing({0: -1, 1: -1}, -1)}
+    )
+    assert isinstance(model.estimator, BucketedModule)
+    assert (tmp_path / GraphCompiler.FOLDER).is_dir()
+
+
+def test_unsupported_platforms_run_uncompiled(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(GraphCompiler, "is_supported", classmethod(lambda cls: False))
+    model = Model()
+    tuning = TorchTuning()
+    tuning._compile(
+        "true",
+        GraphCompiler("model"),
+        model,
+        [],
+        {"estimator": Bucketing({0: -1, 1: -1}, -1)},
+    )
+
+    assert isinstance(model.estimator, Masked)
+
+
+def test_quantized_models_are_not_compiled(monkeypatch: pytest.MonkeyPatch):
+    applied: list[str] = []
+    monkeypatch.setattr(
+        GraphCompiler, "apply", lambda self, *args: applied.append(self.name)
+    )
+    tuning = TorchTuning()
+    tuning.quantization_report = QuantizationReport(2, 1, 2, 1)
+    tuning._compile("true", GraphCompiler("model"), Model(), ["decoder"], {})
+
+    assert applied == []
@@ -0,0 +1,85 @@
+import time
+import weakref
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+
+from services import engine_registry  # noqa: E402
+from services.engine_registry import EngineRegistry  # noqa: E402
+
+
+class Engine:
+    """Engine with a voice that can be changed live and a model that cannot."""
+
+    created: int = 0
+
+    def __init__(self, voice: str, model: str):
+        Engine.created += 1
+        self._voice: str = voice
+        self.model: str = model
+
+    @property
+    def voice(self):
+        return self._voice
+
+    @voice.setter
+    def voice(self, voice: str):
+        self._voice = voice
+
+
+class OtherEngine(Engine):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def reset_count():
+    Engine.created = 0
+
+
+def test_switching_back_reuses_the_loaded_engine_and_reapplies_settings():
+    registry = EngineRegistry(0, 0)
+    first = registry.acquire(Engine, {"voice": "a", "model": "m"})
+    _ = registry.acquire(OtherEngine, {"voice": "a", "model": "m"})
+    second = registry.acquire(Engine, {"voice": "b", "model": "m"})
+
+    assert second is first
+    assert isinstance(second, Engine)
+    assert second.voice == "b"
+    assert Engine.created == 2
+
+
+def test_changing_an_argument_without_a_setter_loads_a_new_engine():
+    registry = EngineRegistry(0, 0)
+    first = registry.acquire(Engine, {"voice": "a", "model": "m"})
+    second = registry.acquire(Engine, {"voice": "a", "model": "n"})
+
+    assert second is not first
+    assert Engine.created == 2
+
+
+def test_idle_inactive_engines_are_unloaded():
+    registry = EngineRegistry(0.05, 0)
+    idle = weakref.ref(registry.acquire(Engine, {"voice": "a", "model": "m"}))
+    active = registry.acquire(OtherEngine, {"voice": "a", "model": "m"})
+    time.sleep(0.1)
+    registry.sweep()
+
+    assert idle() is None
+    assert registry.acquire(OtherEngine, {"voice": "a", "model": "m"}) is active
+
+
+def test_least_recently_used_engines_are_unloaded_over_the_memory_budget(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    registry = EngineRegistry(0, 100)
+    monkeypatch.setattr(engine_registry, "resident_memory", lambda: 50)
+    oldest = weakref.ref(registry.acquire(Engine, {"voice": "a", "model": "1"}))
+    newer = weakref.ref(registry.acquire(Engine, {"voice": "a", "model": "2"}))
+    _ = registry.acquire(Engine, {"voice": "a", "model": "3"})
+    readings = iter([150, 50])
+    monkeypatch.setattr(engine_registry, "resident_memory", lambda: next(readings))
+    registry.sweep()
+
+    assert oldest() is None
+    assert newer() is not None
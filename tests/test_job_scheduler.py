@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+
+from widgets.job_scheduler import Job, JobScheduler, Priority  # noqa: E402
+
+TIMEOUT = 5
+
+
+def _job(name: str, fn, priority: Priority, exclusive: bool = False):
+    return Job(name, fn, priority, None, None, exclusive)
+
+
+def test_jobs_queued_after_an_exclusive_job_wait_for_it():
+    scheduler = JobScheduler(1)
+    release = threading.Event()
+    done = threading.Event()
+    started: list[str] = []
+
+    def record(name: str):
+        def run():
+            started.append(name)
+
+            if len(started) == 3:
+                done.set()
+
+        return run
+
+    jobs = [
+        _job("blocking", release.wait, Priority.BULK),
+        _job("switch", record("switch"), Priority.NORMAL, exclusive=True),
+        _job("play", record("play"), Priority.INTERACTIVE),
+        _job("save", record("save"), Priority.BULK),
+    ]
+
+    for job in jobs:
+        scheduler.submit(job, lambda job: None)
+
+    release.set()
+
+    assert done.wait(TIMEOUT)
+    assert started == ["switch", "play", "save"]
+
+
+def test_concurrent_first_uses_share_one_scheduler(monkeypatch: pytest.MonkeyPatch):
+    created: list[JobScheduler] = []
+    init = JobScheduler.__init__
+
+    def slow_init(self: JobScheduler, workers: int):
+        created.append(self)
+        time.sleep(0.05)
+        init(self, workers)
+
+    monkeypatch.setattr(JobScheduler, "_instance", None)
+    monkeypatch.setattr(JobScheduler, "__init__", slow_init)
+    barrier = threading.Barrier(4)
+    instances: list[JobScheduler] = []
+
+    def first_use():
+        _ = barrier.wait()
+        instances.append(JobScheduler.instance())
+
+    threads = [threading.Thread(target=first_use) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join(TIMEOUT)
+
+    assert len(created) == 1
+    assert instances == created * 4
+
+
+def test_stats_count_completed_and_coalesced_jobs():
+    scheduler = JobScheduler(1)
+    started = threading.Event()
+    release = threading.Event()
+    done = threading.Event()
+
+    def block():
+        started.set()
+        _ = release.wait()
+
+    scheduler.submit(_job("blocking", block, Priority.BULK), lambda job: None)
+    assert started.wait(TIMEOUT)
+    jobs = [
+        Job("refresh", lambda: None, Priority.NORMAL, None, "refresh", False),
+        Job("refresh", lambda: None, Priority.NORMAL, None, "refresh", False),
+        _job("last", done.set, Priority.BULK),
+    ]
+
+    for job in jobs:
+        scheduler.submit(job, lambda job: None)
+
+    pending = scheduler.stats()
+    release.set()
+
+    assert done.wait(TIMEOUT)
+    assert pending.queued == 2
+    assert pending.coalesced == 1
+
+    deadline = time.monotonic() + TIMEOUT
+
+    while scheduler.stats().completed < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    stats = scheduler.stats()
+    assert stats.completed == 3
+    assert stats.running == 0
+    assert stats.max_wait >= stats.mean_wait > 0
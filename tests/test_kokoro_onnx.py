@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+_ = pytest.importorskip("onnxruntime")
+torch = pytest.importorskip("torch")
+_ = pytest.importorskip("kokoro")
+
+from services.kokoro_onnx import KokoroOnnx  # noqa: E402
+
+TIMEOUT = 5
+
+
+class StubPipeline:
+    def load_voice(self, voice: str):
+        return torch.zeros(510, 1, KokoroOnnx.STYLE_SIZE)
+
+
+@pytest.fixture
+def sessions(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Stub the model download, export and session, returning the thread counts used."""
+    threads: list[int | None] = []
+
+    def create_session(cls: type[KokoroOnnx], file: Path, count: int | None):
+        threads.append(count)
+        return object()
+
+    monkeypatch.setattr(KokoroOnnx, "_load_vocab", classmethod(lambda cls: {"a": 1}))
+    monkeypatch.setattr(
+        KokoroOnnx, "_export", classmethod(lambda cls: tmp_path / "kokoro.onnx")
+    )
+    monkeypatch.setattr(KokoroOnnx, "_create_session", classmethod(create_session))
+    monkeypatch.setattr(KokoroOnnx, "_fetch_voices", lambda self: [])
+    monkeypatch.setattr(
+        KokoroOnnx, "_create_pipeline", lambda self, lang_code: StubPipeline()
+    )
+    return threads
+
+
+@pytest.mark.parametrize("threads, expected", [("3", 3), ("auto", None)])
+def test_service_is_created_with_the_thread_setting(
+    sessions: list[int | None], threads: str, expected: int | None
+):
+    service = KokoroOnnx("af_heart", threads)
+
+    pipeline, pack = service._loaded_voice.result(TIMEOUT)
+
+    assert sessions == [expected]
+    assert service.voice == "af_heart"
+    assert isinstance(pipeline, StubPipeline)
+    assert pack.shape[-1] == KokoroOnnx.STYLE_SIZE
+
+
+def test_service_has_no_torch_tuning_settings(sessions: list[int | None]):
+    service = KokoroOnnx("af_heart", "auto")
+
+    assert not hasattr(service, "intra_op_threads")
+    assert not hasattr(service, "_tuned")
@@ -0,0 +1,45 @@
+import numpy
+
+from services.pcm_buffer import SAMPLE_MAX, PcmBuffer
+
+
+def test_float_samples_are_scaled_and_clipped_to_int16():
+    pcm = PcmBuffer.from_float(
+        numpy.array([0, 0.5, -0.5, 1, -1, 2, -2], dtype=numpy.float32)
+    )
+
+    assert pcm.samples.dtype == numpy.int16
+    assert pcm.samples.tolist() == [
+        0,
+        SAMPLE_MAX // 2,
+        -(SAMPLE_MAX // 2),
+        SAMPLE_MAX,
+        -SAMPLE_MAX,
+        SAMPLE_MAX,
+        -SAMPLE_MAX,
+    ]
+
+
+def test_float_samples_of_any_shape_become_mono():
+    pcm = PcmBuffer.from_float(numpy.zeros((1, 4), dtype=numpy.float32))
+
+    assert len(pcm) == 4
+    assert pcm.nbytes == 8
+
+
+def test_bytes_are_wrapped_without_copying():
+    data = bytearray(b"\x01\x00\xff\x7f")
+    pcm = PcmBuffer.from_bytes(data)
+    data[0] = 2
+
+    assert pcm.samples.tolist() == [2, SAMPLE_MAX]
+
+
+def test_views_share_memory_and_are_read_only():
+    pcm = PcmBuffer(numpy.array([1, -1], dtype=numpy.int16))
+    view = pcm.memoryview()
+    pcm.samples[0] = 3
+
+    assert view.readonly
+    assert view.format == "B"
+    assert view.tobytes() == b"\x03\x00\xff\xff"
@@ -0,0 +1,121 @@
+import queue
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+QtMultimedia = pytest.importorskip("PySide6.QtMultimedia", exc_type=ImportError)
+
+from PySide6.QtCore import QBuffer, QCoreApplication, QIODevice, QObject  # noqa: E402
+
+from services.pcm_buffer import PcmBuffer  # noqa: E402
+from services.playback_engine import PlaybackEngine, Utterance  # noqa: E402
+
+TIMEOUT = 5
+
+
+class StubSink(QObject):
+    """Audio output that accepts every byte at once, recording what was written to it."""
+
+    opened: list["StubSink"] = []
+
+    def __init__(self, audio_format, parent: QObject):
+        super().__init__(parent)
+        self.sample_rate: int = audio_format.sampleRate()
+        self.buffer: QBuffer = QBuffer(self)
+        self._buffer_size: int = 0
+        StubSink.opened.append(self)
+
+    def setBufferSize(self, size: int):
+        self._buffer_size = size
+
+    def bufferSize(self):
+        return self._buffer_size
+
+    def start(self):
+        _ = self.buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        return self.buffer
+
+    def stop(self):
+        self.buffer.close()
+
+    def bytesFree(self):
+        return 1 << 20
+
+    def state(self):
+        return QtMultimedia.QAudio.State.IdleState
+
+    def processedUSecs(self):
+        return 0
+
+    def error(self):
+        return QtMultimedia.QAudio.Error.NoError
+
+    @property
+    def written(self):
+        return bytes(self.buffer.data().data())
+
+
+@pytest.fixture
+def engine(monkeypatch: pytest.MonkeyPatch):
+    """Start a playback engine writing to stub audio outputs, and shut it down after."""
+    _ = QCoreApplication.instance() or QCoreApplication([])
+    monkeypatch.setattr(QtMultimedia, "QAudioSink", StubSink)
+    monkeypatch.setattr(StubSink, "opened", [])
+    monkeypatch.setattr(PlaybackEngine, "_instance", None)
+    yield PlaybackEngine.instance()
+    PlaybackEngine.shutdown()
+
+
+def _chunks(*items: bytes | Exception | None):
+    chunks: queue.Queue[PcmBuffer | Exception | None] = queue.Queue()
+
+    for item in items:
+        chunks.put(PcmBuffer.from_bytes(item) if isinstance(item, bytes) else item)
+
+    return chunks
+
+
+def _wait(utterance: Utterance):
+    assert utterance.done.wait(TIMEOUT)
+    return utterance
+
+
+def test_utterances_with_the_same_rate_play_back_to_back_on_one_output(
+    engine: PlaybackEngine,
+):
+    started: list[str] = []
+    first = engine.play(16000, _chunks(b"\x01\x00\x02\x00", None), lambda: None)
+    second = engine.play(
+        16000, _chunks(b"\x03\x00", None), lambda: started.append("second")
+    )
+
+    _ = _wait(first), _wait(second)
+
+    assert len(StubSink.opened) == 1
+    assert StubSink.opened[0].written == b"\x01\x00\x02\x00\x03\x00"
+    assert started == ["second"]
+    assert first.started and not first.stopped
+
+
+def test_a_new_sample_rate_reopens_the_output(engine: PlaybackEngine):
+    _ = _wait(engine.play(16000, _chunks(b"\x01\x00", None), lambda: None))
+    _ = _wait(engine.play(24000, _chunks(b"\x02\x00", None), lambda: None))
+
+    assert [sink.sample_rate for sink in StubSink.opened] == [16000, 24000]
+
+
+def test_synthesis_errors_end_the_utterance(engine: PlaybackEngine):
+    error = RuntimeError("synthesis failed")
+    utterance = _wait(engine.play(16000, _chunks(b"\x01\x00", error), lambda: None))
+
+    assert utterance.error is error
+
+
+def test_stopping_discards_queued_utterances(engine: PlaybackEngine):
+    waiting = engine.play(16000, _chunks(b"\x01\x00"), lambda: None)
+    queued = engine.play(16000, _chunks(b"\x02\x00", None), lambda: None)
+    engine.stop()
+
+    assert _wait(waiting).stopped
+    assert _wait(queued).stopped
+    assert not queued.started
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+torch = pytest.importorskip("torch")
+
+from torch import nn  # noqa: E402
+from torch.ao.nn.quantized import dynamic as nnqd  # noqa: E402
+
+from services.quantization import DynamicQuantizer  # noqa: E402
+from services.torch_tuning import TorchTuning  # noqa: E402
+
+pytestmark = pytest.mark.skipif(
+    not DynamicQuantizer.is_supported(), reason="No quantized engine on this CPU."
+)
+
+
+class Model(nn.Module):
+    def __init__(self):
+        super().__init__()
+        _ = torch.manual_seed(0)
+        self.tfmr: nn.Module = nn.Sequential(nn.Linear(64, 64), nn.Linear(64, 8))
+        self.head: nn.Linear = nn.Linear(8, 8)
+
+    def forward(self, x: torch.Tensor):
+        return self.head(self.tfmr(x))
+
+
+class Probe:
+    """Runs the model on a fixed input, counting the runs."""
+
+    def __init__(self, model: Model):
+        self.model: Model = model
+        self.runs: int = 0
+
+    def __call__(self):
+        self.runs += 1
+
+        with torch.inference_mode():
+            return self.model(torch.ones(1, 64))
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("VOCALSCRIPT_DATA_DIR", str(tmp_path))
+
+
+def _quantizer():
+    return DynamicQuantizer("model", "torch", ["tfmr"])
+
+
+def test_linear_layers_of_the_submodules_are_quantized():
+    model = Model()
+    expected = Probe(model)()
+    report = _quantizer().apply(model, Probe(model))
+
+    assert report is not None
+    assert isinstance(model.tfmr[0], nnqd.Linear)
+    assert isinstance(model.head, nn.Linear)
+    assert report.quantized_bytes < report.float_bytes
+    assert report.speedup > 0
+    assert torch.allclose(Probe(model)(), expected, atol=0.05)
+
+
+def test_quantized_modules_are_loaded_from_the_cache():
+    first = _quantizer().apply(Model(), Probe(Model()))
+    model = Model()
+    probe = Probe(model)
+
+    assert _quantizer().apply(model, probe) == first
+    assert probe.runs == 0
+    assert isinstance(model.tfmr[0], nnqd.Linear)
+
+
+def test_a_corrupt_cache_is_converted_again(tmp_path: Path):
+    _ = _quantizer().apply(Model(), Probe(Model()))
+
+    for file in (tmp_path / DynamicQuantizer.FOLDER).glob("*.pt"):
+        _ = file.write_bytes(b"corrupt")
+
+    model = Model()
+
+    assert _quantizer().apply(model, Probe(model)) is not None
+    assert isinstance(model.tfmr[0], nnqd.Linear)
+
+
+def test_unsupported_cpus_keep_the_float_model(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        DynamicQuantizer, "is_supported", classmethod(lambda cls: False)
+    )
+    model = Model()
+    tuning = TorchTuning()
+    tuning._quantize("true", _quantizer(), model, Probe(model))
+
+    assert tuning.quantization_report is None
+    assert isinstance(model.tfmr[0], nn.Linear)
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+
+from services.cancellation import CancellationToken  # noqa: E402
+from services.render_jobs import RenderJob, RenderJobStore  # noqa: E402
+from services.synthesis_cache import SynthesisCache  # noqa: E402
+from services.tts_service import TtsService  # noqa: E402
+from stub_service import StubService  # noqa: E402
+
+SENTENCES = [f"This is sentence number {index} of the document." for index in range(6)]
+
+
+@pytest.fixture
+def store(tmp_path: Path):
+    folder = tmp_path / "jobs"
+    folder.mkdir()
+    return RenderJobStore(folder)
+
+
+def _open(store: RenderJobStore, segments: list[str]):
+    return store.open("key", "identity", "text", " ".join(segments), segments, None)
+
+
+def test_reopening_a_job_resumes_its_checkpoints(store: RenderJobStore):
+    job = _open(store, ["a", "b", "c"])
+    job.checkpoint(0, b"audio")
+
+    resumed = _open(store, ["a", "b", "c"])
+
+    assert resumed.rendered == 1
+    assert resumed.is_rendered(0) and not resumed.is_rendered(1)
+    assert resumed.load(0) == b"audio"
+    assert [job.key for job in store.unfinished()] == ["key"]
+
+
+def test_a_job_split_differently_starts_over(store: RenderJobStore):
+    _open(store, ["a", "b"]).checkpoint(0, b"audio")
+
+    assert _open(store, ["a", "b", "c"]).rendered == 0
+
+
+def test_jobs_without_a_readable_manifest_are_removed(
+    store: RenderJobStore, tmp_path: Path
+):
+    job = _open(store, ["a", "b"])
+    _ = (job.folder / RenderJob.MANIFEST).write_text("{", encoding="utf-8")
+    (tmp_path / "jobs" / "crashed").mkdir()
+
+    assert store.unfinished() == []
+    assert list((tmp_path / "jobs").iterdir()) == []
+
+
+def test_an_interrupted_save_resumes_from_the_last_finished_segment(
+    store: RenderJobStore, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(TtsService, "_render_jobs", store)
+    monkeypatch.setattr(StubService, "RENDER_SEGMENT_LENGTH", 60)
+    monkeypatch.setattr(TtsService, "_cache", SynthesisCache(None, 0, 0))
+    text = " ".join(SENTENCES)
+    service = StubService()
+    cancel = CancellationToken()
+
+    def stop_at_third_segment(status: str):
+        if status.startswith("Synthesising. Segment 3 "):
+            cancel.cancel()
+
+    assert (
+        service.save_text_to_file(
+            text, stop_at_third_segment, tmp_path / "first.wav", cancel
+        )
+        is None
+    )
+    assert store.unfinished()[0].rendered == 2
+
+    service.synthesised.clear()
+    saved = service.save_text_to_file(text, lambda status: None, tmp_path / "doc.wav")
+
+    assert saved == tmp_path / "doc.wav"
+    assert service.synthesised == SENTENCES[2:]
+    assert store.unfinished() == []
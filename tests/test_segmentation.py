@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+
+from services.segmentation import Segmenter  # noqa: E402
+from stub_service import StubService  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        (
+            "Dr. Smith arrived. He sat down.",
+            ["Dr. Smith arrived.", "He sat down."],
+        ),
+        (
+            "See No. 5 and p. 12 for details. They moved in Mar. 2020.",
+            ["See No. 5 and p. 12 for details.", "They moved in Mar. 2020."],
+        ),
+        (
+            "We walked in the sun. Then it rained.",
+            ["We walked in the sun.", "Then it rained."],
+        ),
+        (
+            "The answer was no. Everyone left.",
+            ["The answer was no.", "Everyone left."],
+        ),
+        (
+            "She sat. Then she spoke to the co. It was late.",
+            ["She sat.", "Then she spoke to the co.", "It was late."],
+        ),
+    ],
+)
+def test_rules_split_after_ordinary_words(text: str, expected: list[str]):
+    assert list(Segmenter().sentences(text)) == expected
+
+
+SENTENCES = [
+    f"Sentence {index} talks about topic {index * 7 % 13} at length."
+    for index in range(200)
+]
+INSERTED = (
+    "A new sentence was inserted here, and it goes on for a while so that it no longer "
+    "fits."
+)
+
+
+def _inserted(position: int):
+    return " ".join([*SENTENCES[:position], INSERTED, *SENTENCES[position:]])
+
+
+@pytest.mark.parametrize("stable", [True, False])
+def test_segments_cover_the_text_within_the_maximum_length(stable: bool):
+    segments = list(Segmenter().segments(" ".join(SENTENCES), 1000, stable))
+
+    assert max(len(segment) for segment in segments) <= 1000
+    assert " ".join(segments) == " ".join(SENTENCES)
+
+
+def test_stable_segments_after_an_edit_are_unchanged():
+    before = list(Segmenter().segments(" ".join(SENTENCES), 1000, stable=True))
+    after = list(Segmenter().segments(_inserted(10), 1000, stable=True))
+
+    assert [segment for segment in after if segment not in before] == [
+        next(segment for segment in after if INSERTED in segment)
+    ]
+    assert len(after) == len(before)
+
+
+def test_edited_documents_only_synthesise_the_changed_segments(
+    cache, tmp_path: Path
+):
+    service = StubService()
+    _ = service.save_text_to_file(
+        " ".join(SENTENCES), lambda status: None, tmp_path / "before.wav"
+    )
+    service.synthesised.clear()
+
+    saved = service.save_text_to_file(
+        _inserted(10), lambda status: None, tmp_path / "after.wav"
+    )
+
+    assert saved == tmp_path / "after.wav"
+    assert len(service.synthesised) == 1
+    assert INSERTED in service.synthesised[0]
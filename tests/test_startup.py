@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+
+from startup_trace import StartupTrace  # noqa: E402
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+DEFERRED_MODULES = ("services.playback_engine", "PySide6.QtMultimedia", "torch")
+# Runs the application through main(), and reports once the window is shown and the saved
+# service is set up, instead of entering the event loop. The process exits right away, as
+# tearing Qt down under jobs still fetching voices is not part of startup.
+SCRIPT = f"""
+import json
+import os
+import sys
+import time
+
+import main
+from PySide6.QtWidgets import QApplication
+
+
+def report(app):
+    print(json.dumps({{
+        "elapsed_ms": (time.perf_counter() - main.started) * 1000,
+        "imported": [name for name in {DEFERRED_MODULES!r} if name in sys.modules],
+    }}), flush=True)
+    os._exit(0)
+
+
+QApplication.exec = report
+sys.exit(main.main(["vocalscript"]))
+"""
+
+
+@pytest.fixture(scope="module")
+def startup(tmp_path_factory: pytest.TempPathFactory):
+    """Start the application in a fresh interpreter with its own data directory."""
+    env = {
+        **os.environ,
+        "QT_QPA_PLATFORM": "offscreen",
+        "PYTHONPATH": str(SRC),
+        "VOCALSCRIPT_DATA_DIR": str(tmp_path_factory.mktemp("data")),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_application_starts_within_the_startup_budget(startup: dict[str, object]):
+    assert startup["elapsed_ms"] < StartupTrace.DEFAULT_BUDGET_MS
+
+
+def test_engines_and_playback_are_not_imported_at_startup(
+    startup: dict[str, object],
+):
+    assert startup["imported"] == []
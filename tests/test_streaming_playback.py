@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+
+from services.cancellation import CancellationToken  # noqa: E402
+from services.playback_engine import PlaybackEngine, Utterance  # noqa: E402
+from services.tts_service import TtsService  # noqa: E402
+from stub_service import StubService  # noqa: E402
+
+TIMEOUT = 5
+
+
+class FailingEngine:
+    """Playback engine whose output fails after a delay, without reading any audio."""
+
+    def __init__(self, delay: float):
+        self.delay: float = delay
+        self.queued: list[int] = []
+
+    def play(self, sample_rate: int, chunks, on_start):
+        utterance = Utterance(sample_rate, chunks, on_start)
+
+        def fail():
+            time.sleep(self.delay)
+            self.queued.append(chunks.qsize())
+            utterance.playback_error = "Opening audio output failed"
+            utterance.done.set()
+
+        threading.Thread(target=fail, daemon=True).start()
+        return utterance
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def engine(monkeypatch: pytest.MonkeyPatch):
+    engine = FailingEngine(0.3)
+    monkeypatch.setattr(PlaybackEngine, "instance", classmethod(lambda cls: engine))
+    return engine
+
+
+def test_synthesis_stops_when_playback_fails(cache, engine: FailingEngine):
+    service = StubService(chunks=10_000, delay=0.001)
+    statuses: list[str] = []
+    cancel = CancellationToken()
+
+    service.play_text("Hello there.", statuses.append, cancel)
+    produced = service.produced
+    time.sleep(0.2)
+
+    assert statuses[-1] == "Playback failed. Opening audio output failed."
+    assert cancel.cancelled
+    assert service.produced == produced < service.chunks
+    assert not any(thread.name == "synthesis" for thread in threading.enumerate())
+
+
+def test_synthesis_runs_at_most_a_bounded_number_of_chunks_ahead(
+    cache, engine: FailingEngine
+):
+    service = StubService(chunks=10_000)
+
+    service.play_text("Hello there.", lambda status: None)
+
+    assert engine.queued == [TtsService.PLAYBACK_AHEAD_CHUNKS]
+    assert service.produced <= TtsService.PLAYBACK_AHEAD_CHUNKS + 1
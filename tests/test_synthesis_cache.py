@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+
+from services.synthesis_cache import SynthesisCache  # noqa: E402
+
+
+def test_lookups_are_counted_as_hits_and_misses(tmp_path: Path):
+    cache = SynthesisCache(tmp_path, 100, 100)
+    cache.put("a", b"audio")
+
+    assert cache.get("a") == b"audio"
+    assert cache.get("b") is None
+    assert cache.get("a") == b"audio"
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 1,
+        "memory_entries": 1,
+        "memory_bytes": 5,
+        "disk_entries": 1,
+        "disk_bytes": 5,
+    }
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = SynthesisCache(None, 10, 0)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    _ = cache.get("a")
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.stats()["memory_bytes"] == 8
+
+
+def test_disk_entries_outlive_the_memory_tier(tmp_path: Path):
+    cache = SynthesisCache(tmp_path, 4, 100)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+
+    assert cache.stats()["memory_entries"] == 1
+    assert cache.get("a") == b"aaaa"
+    assert SynthesisCache(tmp_path, 4, 100).get("b") == b"bbbb"
+
+
+def test_disk_order_survives_restarts(tmp_path: Path):
+    cache = SynthesisCache(tmp_path, 0, 100)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    os.utime(tmp_path / f"a{SynthesisCache.SUFFIX}", (1, 1))
+    os.utime(tmp_path / f"b{SynthesisCache.SUFFIX}", (2, 2))
+
+    restarted = SynthesisCache(tmp_path, 0, 8)
+    restarted.put("c", b"cccc")
+
+    assert restarted.get("a") is None
+    assert restarted.get("b") == b"bbbb"
+    assert not (tmp_path / f"a{SynthesisCache.SUFFIX}").exists()
+
+
+def test_only_audio_settings_are_part_of_the_azure_cache_key():
+    _ = pytest.importorskip("azure.cognitiveservices.speech")
+    from services.azure import Azure
+
+    assert {
+        setting.name for setting in Azure.setting_fields() if setting.affects_audio
+    } == {"segment_length", "output_format"}
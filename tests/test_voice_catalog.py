@@ -0,0 +1,113 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+
+from services.voice_catalog import VoiceCatalog  # noqa: E402
+
+TIMEOUT = 5
+VOICES = [{"display": "Ava (en-US)", "name": "en-US-AvaNeural"}]
+NEW_VOICES = [*VOICES, {"display": "Emma (en-US)", "name": "en-US-EmmaNeural"}]
+
+
+class Fetcher:
+    """Fetch function returning set voices, or raising if there are none.
+
+    Fetching waits until released, so a background refresh cannot finish before the caller
+    has seen the stored voices.
+    """
+
+    def __init__(self, voices: list[dict[str, str]] | None, released: bool = True):
+        self.voices: list[dict[str, str]] | None = voices
+        self.calls: int = 0
+        self.release: threading.Event = threading.Event()
+        self.done: threading.Event = threading.Event()
+
+        if released:
+            self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        _ = self.release.wait(TIMEOUT)
+
+        try:
+            if self.voices is None:
+                raise ConnectionError("offline")
+
+            return self.voices
+        finally:
+            self.done.set()
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("VOCALSCRIPT_DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _store(data_dir: Path, name: str, updated: float):
+    folder = data_dir / VoiceCatalog.FOLDER
+    folder.mkdir()
+    _ = (folder / f"{name}.json").write_text(
+        json.dumps({"updated": updated, "voices": VOICES}), encoding="utf-8"
+    )
+
+
+def test_missing_voices_are_fetched_once_and_stored():
+    fetch = Fetcher(VOICES)
+
+    assert VoiceCatalog("azure", 60, fetch, lambda _: None).get(True) == VOICES
+    assert VoiceCatalog("azure", 60, fetch, lambda _: None).get(True) == VOICES
+    assert fetch.calls == 1
+
+
+def test_missing_voices_are_reported_in_the_background_when_not_waiting():
+    refreshed: list[list[dict[str, str]]] = []
+    fetch = Fetcher(VOICES, released=False)
+
+    assert VoiceCatalog("azure", 60, fetch, refreshed.append).get(False) == []
+    fetch.release.set()
+    assert fetch.done.wait(TIMEOUT)
+    assert _wait_for(lambda: refreshed == [VOICES])
+
+
+def test_stale_voices_are_returned_and_refreshed_in_the_background(data_dir: Path):
+    _store(data_dir, "azure", 0)
+    refreshed: list[list[dict[str, str]]] = []
+    fetch = Fetcher(NEW_VOICES, released=False)
+    catalog = VoiceCatalog("azure", 60, fetch, refreshed.append)
+
+    assert catalog.is_stale
+    assert catalog.get(True) == VOICES
+    fetch.release.set()
+    assert _wait_for(lambda: refreshed == [NEW_VOICES])
+    assert not catalog.is_stale
+    assert catalog.find("en-US-EmmaNeural") == NEW_VOICES[1]
+
+
+def test_failed_refresh_keeps_the_stored_voices(data_dir: Path):
+    _store(data_dir, "azure", 0)
+    fetch = Fetcher(None)
+    catalog = VoiceCatalog("azure", 60, fetch, lambda _: None)
+
+    assert catalog.get(True) == VOICES
+    assert fetch.done.wait(TIMEOUT)
+    assert catalog.get(True) == VOICES
+    assert catalog.is_stale
+
+
+def _wait_for(condition: Callable[[], bool]):
+    deadline = time.monotonic() + TIMEOUT
+
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+
+        time.sleep(0.01)
+
+    return True
@@ -0,0 +1,54 @@
+from typing import override
+
+import pytest
+
+_ = pytest.importorskip("PySide6")
+
+from services.tts_service import TtsService  # noqa: E402
+from settings import settings  # noqa: E402
+from stub_service import StubService  # noqa: E402
+
+
+class LocalService(StubService):
+    """Stub of a local engine, which needs warming up."""
+
+    @property
+    @override
+    def needs_warm_up(self):
+        return True
+
+
+@pytest.fixture
+def warm_up_setting():
+    """Restore the warm-up setting after the test."""
+    yield
+    settings.remove(TtsService.WARM_UP_KEY)
+
+
+def test_warm_up_runs_once_per_voice_and_bypasses_the_cache(cache):
+    service = LocalService()
+
+    assert service.warm_up() is not None
+    assert service.warm_up() is None
+
+    service.voice = "other"
+
+    assert service.warm_up() is not None
+    assert service.synthesised == [TtsService.WARM_UP_TEXT] * 2
+    assert cache.stats()["hits"] + cache.stats()["misses"] == 0
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_warm_up_is_skipped_for_remote_services():
+    service = StubService()
+
+    assert service.warm_up() is None
+    assert service.synthesised == []
+
+
+def test_warm_up_can_be_disabled(warm_up_setting: None):
+    settings.setValue(TtsService.WARM_UP_KEY, False)
+    service = LocalService()
+
+    assert service.warm_up() is None
+    assert service.synthesised == []
@@ -5,7 +5,7 @@ from PyInstaller.utils.hooks import collect_all
 
 datas = [('resources', 'resources')]
 binaries = []
-hiddenimports = ['services.azure', 'services.kokoro', 'services.chatterbox', 'sklearn._cyutility']
+hiddenimports = ['services.azure', 'services.kokoro', 'services.kokoro_onnx', 'services.chatterbox', 'sklearn._cyutility']
 datas += collect_data_files('language_tags')
 datas += collect_data_files('espeakng_loader')
 datas += collect_data_files('misaki')